@@ -0,0 +1,67 @@
+"""
+Benchmark JTL parsing throughput (rows/sec) for each parser engine
+
+Usage:
+    python benchmarks/bench_parsers.py --rows 20000000
+    python benchmarks/bench_parsers.py --file results.jtl
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import generate_jtl  # noqa: E402
+from jutix.core.data_loader import iter_jtl_chunks, read_jtl_file  # noqa: E402
+from jutix.core.parsers import PARSERS, pyarrow_available  # noqa: E402
+
+
+def bench(path: Path, rows: int, parser: str, batch_size: int) -> dict:
+    """Time a whole-file read and a chunked read with the given parser"""
+    start = time.perf_counter()
+    read_jtl_file(str(path), parser=parser)
+    whole = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in iter_jtl_chunks(str(path), batch_size, parser=parser):
+        pass
+    chunked = time.perf_counter() - start
+
+    return {
+        'parser': parser,
+        'whole_rows_per_sec': rows / whole,
+        'chunked_rows_per_sec': rows / chunked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Rows in the generated JTL")
+    parser.add_argument("--file", type=str, default=None, help="Benchmark an existing JTL instead")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="Rows per chunk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.file:
+            path = Path(args.file)
+            with open(path) as f:
+                rows = sum(1 for _ in f) - 1
+        else:
+            path = Path(tmp) / "bench.jtl"
+            rows = generate_jtl(path, args.rows)
+
+        size_mb = path.stat().st_size / 1024 / 1024
+        print(f"{path.name}: {rows:,} rows, {size_mb:,.0f} MB")
+        for engine in PARSERS:
+            if engine == 'pyarrow' and not pyarrow_available():
+                print("pyarrow: not installed, skipped")
+                continue
+            result = bench(path, rows, engine, args.batch_size)
+            print(f"{engine:>8}: {result['whole_rows_per_sec']:>12,.0f} rows/s whole file, "
+                  f"{result['chunked_rows_per_sec']:>12,.0f} rows/s chunked")
+
+
+if __name__ == "__main__":
+    main()
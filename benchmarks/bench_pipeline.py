@@ -0,0 +1,214 @@
+"""
+Benchmark each pipeline stage (wall time, peak memory, rows/sec) on synthetic JTL files
+
+Usage:
+    python benchmarks/bench_pipeline.py --scales 1m,10m,50m
+    python benchmarks/bench_pipeline.py --scales 1m --files 4 --latency bimodal --output results.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+
+from benchmarks.synthetic import LATENCY_DISTRIBUTIONS, generate_jtl_files  # noqa: E402
+from jutix.core.box_stats import QUARTILES, box_stats  # noqa: E402
+from jutix.core.data_loader import JTLDataLoader  # noqa: E402
+from jutix.core.percentiles import DEFAULT_PERCENTILES, compute_percentiles, percentile_columns  # noqa: E402
+from jutix.core.report_generator import ReportGenerator  # noqa: E402
+from jutix.core.rollup import TimeRollup  # noqa: E402
+from jutix.visualization.plotter import JMeterPlotter  # noqa: E402
+
+SCALES = {'1m': 1_000_000, '10m': 10_000_000, '50m': 50_000_000}
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def parse_scale(scale: str) -> int:
+    """Row count for a scale name ('10m') or a plain number ('250000')"""
+    return SCALES.get(scale.lower()) or int(scale.replace('_', ''))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def _read_peak_rss() -> int:
+    """Peak resident set size of this process in bytes (Linux VmHWM)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    raise OSError("VmHWM not reported")
+
+
+def _reset_peak_rss():
+    """Reset VmHWM to the current RSS so the next reading covers one stage only"""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def default_memory_mode() -> str:
+    """'rss' where the kernel lets us reset the peak, else 'tracemalloc'"""
+    try:
+        _reset_peak_rss()
+        _read_peak_rss()
+        return 'rss'
+    except OSError:
+        return 'tracemalloc'
+
+
+class StageTimer:
+    """Runs pipeline stages and records wall time, peak memory and throughput
+
+    ``memory`` is 'rss' (peak resident set size during the stage, cheap but
+    Linux only), 'tracemalloc' (peak Python allocations, slows numpy-heavy
+    stages noticeably) or 'none'. Worker processes are not included.
+    """
+
+    def __init__(self, rows: int, memory: str = 'rss'):
+        self.rows = rows
+        self.memory = memory
+        self.stages = []
+
+    def _start_memory(self):
+        if self.memory == 'rss':
+            _reset_peak_rss()
+        elif self.memory == 'tracemalloc':
+            tracemalloc.start()
+
+    def _peak_memory(self):
+        if self.memory == 'rss':
+            return _read_peak_rss()
+        if self.memory == 'tracemalloc':
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+        return None
+
+    def run(self, name: str, func, *args, **kwargs):
+        self._start_memory()
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            peak = self._peak_memory()
+            self.stages.append({
+                'stage': name,
+                'seconds': round(seconds, 4),
+                'peak_mb': round(peak / 1024 / 1024, 1) if peak is not None else None,
+                'rows_per_sec': round(self.rows / seconds) if seconds else None,
+            })
+            print(f"  {name:<32} {seconds:>9.2f}s"
+                  + (f" {peak / 1024 / 1024:>10,.0f} MB" if peak is not None else ""))
+
+
+def bench_scale(work_dir: Path, rows: int, args) -> dict:
+    """Generate ``rows`` samples and time every pipeline stage on them"""
+    data_dir = work_dir / f"rows_{rows}"
+    started = time.perf_counter()
+    paths = generate_jtl_files(data_dir, rows, files=args.files, labels=args.labels,
+                               error_rate=args.error_rate, latency=args.latency,
+                               duration_s=args.duration, seed=args.seed)
+    generate_seconds = time.perf_counter() - started
+    size_mb = sum(path.stat().st_size for path in paths) / 1024 / 1024
+    print(f"{rows:,} rows in {args.files} files, {size_mb:,.0f} MB (generated in {generate_seconds:.1f}s)")
+
+    plots_dir = work_dir / "plots"
+    plots_dir.mkdir(exist_ok=True)
+    loader = JTLDataLoader(str(data_dir), logger, max_workers=args.workers, parser=args.parser)
+    plotter = JMeterPlotter(plots_dir, logger, max_workers=args.workers)
+    report = ReportGenerator(work_dir, logger)
+    timer = StageTimer(rows, memory=args.memory)
+
+    df = timer.run('load_jtl_files', loader.load_jtl_files, ['*.jtl'])
+    all_percentiles = sorted(set(DEFAULT_PERCENTILES) | set(QUARTILES))
+    all_table = timer.run('compute_percentiles', compute_percentiles, df, all_percentiles)
+    percentile_table = all_table[percentile_columns(DEFAULT_PERCENTILES)]
+    rollup = timer.run('rollup', TimeRollup.from_frame, df)
+    timer.run('calculate_statistics', report.calculate_statistics, df, percentile_table, rollup)
+    boxplot_stats = timer.run('box_stats', box_stats, df, quartiles=all_table)
+    timer.run('plot_response_time_boxplot', plotter.plot_response_time_boxplot, df, boxplot_stats=boxplot_stats)
+    timer.run('plot_response_time_violin', plotter.plot_response_time_violin, df)
+    timer.run('plot_throughput_over_time', plotter.plot_throughput_over_time, df, rollup=rollup)
+    timer.run('plot_response_time_percentiles', plotter.plot_response_time_percentiles, df,
+              percentile_table=percentile_table)
+    timer.run('generate_all_plots', plotter.generate_all_plots, df, percentile_table, rollup, boxplot_stats)
+    del df
+    timer.run('aggregate_jtl_files', loader.aggregate_jtl_files, ['*.jtl'], batch_size=args.batch_size)
+
+    if not args.keep_data:
+        for path in paths:
+            path.unlink()
+    return {
+        'rows': rows,
+        'files': args.files,
+        'size_mb': round(size_mb, 1),
+        'generate_seconds': round(generate_seconds, 2),
+        'stages': timer.stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=str, default="1m,10m,50m",
+                        help=f"Comma separated row counts or names ({', '.join(SCALES)})")
+    parser.add_argument("--files", type=int, default=1, help="Number of JTL files to split rows across")
+    parser.add_argument("--labels", type=int, default=40, help="Distinct sampler labels")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of failed samples")
+    parser.add_argument("--latency", type=str, default="lognormal", choices=list(LATENCY_DISTRIBUTIONS),
+                        help="Response time distribution")
+    parser.add_argument("--duration", type=int, default=3600, help="Test duration in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for loading and plotting")
+    parser.add_argument("--parser", type=str, default="c", help="CSV parser engine")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="Rows per chunk in streaming mode")
+    parser.add_argument("--memory", type=str, default=default_memory_mode(), choices=['rss', 'tracemalloc', 'none'],
+                        help="How peak memory per stage is measured")
+    parser.add_argument("--work-dir", type=str, default=None, help="Directory for generated files")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the generated JTL files")
+    parser.add_argument("--output", type=str, default=None,
+                        help="JSON results file (default: benchmarks/results/<date>_<commit>.json)")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {key: value for key, value in vars(args).items() if key not in ('output', 'work_dir')},
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(args.work_dir or tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        for scale in args.scales.split(','):
+            results['runs'].append(bench_scale(work_dir, parse_scale(scale.strip()), args))
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
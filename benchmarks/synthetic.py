@@ -0,0 +1,130 @@
+"""
+Deterministic synthetic JTL files for benchmarks
+
+The same arguments always produce byte-identical files: every block of rows
+draws from its own generator seeded by ``(seed, file_index, block)``.
+"""
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+HEADER = ("timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success,"
+          "failureMessage,bytes,sentBytes,grpThreads,allThreads,URL,Latency,IdleTime,Connect\n")
+BLOCK_ROWS = 500_000
+START_MILLIS = 1_700_000_000_000
+ERROR_CODES = ['500', '503', '404']
+ERROR_MESSAGES = ['Internal Server Error', 'Service Unavailable', 'Not Found']
+
+
+def _lognormal(rng, n, median, spread):
+    return median * np.exp(spread * rng.standard_normal(n))
+
+
+def _exponential(rng, n, median, spread):
+    return rng.exponential(median / np.log(2), n)
+
+
+def _bimodal(rng, n, median, spread):
+    # Mostly fast responses plus a slow mode ten times the median (cache misses, GC pauses)
+    slow = rng.random(n) < 0.1
+    return np.where(slow, 10, 1) * _lognormal(rng, n, median, spread)
+
+
+LATENCY_DISTRIBUTIONS = {
+    'lognormal': _lognormal,
+    'exponential': _exponential,
+    'bimodal': _bimodal,
+}
+
+
+def _categorical(codes: np.ndarray, categories) -> pd.Categorical:
+    """Categorical column; code -1 is written as an empty field"""
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _block(rng, first_row: int, n: int, rows: int, labels: int, error_rate: float, latency: str,
+           median_ms: float, spread: float, duration_s: int, threads: int) -> pd.DataFrame:
+    """Generate rows ``first_row .. first_row + n`` of a file"""
+    label_ids = rng.integers(0, labels, n)
+    # Each label gets its own typical latency, from half to twice the median
+    label_scale = np.geomspace(0.5, 2.0, labels)[label_ids]
+    elapsed = np.maximum(LATENCY_DISTRIBUTIONS[latency](rng, n, median_ms, spread) * label_scale, 1)
+    elapsed = elapsed.astype(np.int64)
+
+    failed = rng.random(n) < error_rate
+    # Code 0 is success, 1.. index the error kinds
+    outcome = np.where(failed, rng.integers(1, len(ERROR_CODES) + 1, n), 0)
+    thread = rng.integers(0, threads, n)
+    row = np.arange(first_row, first_row + n, dtype=np.int64)
+
+    return pd.DataFrame({
+        'timeStamp': START_MILLIS + row * duration_s * 1000 // max(rows, 1),
+        'elapsed': elapsed,
+        'label': _categorical(label_ids, [f"Sampler {i:02d}" for i in range(labels)]),
+        'responseCode': _categorical(outcome, ['200', *ERROR_CODES]),
+        'responseMessage': _categorical(outcome, ['OK', *ERROR_MESSAGES]),
+        'threadName': _categorical(thread, [f"Thread Group 1-{i + 1}" for i in range(threads)]),
+        'dataType': _categorical(np.zeros(n, dtype=np.int8), ['text']),
+        'success': _categorical(failed.astype(np.int8), ['true', 'false']),
+        'failureMessage': _categorical(np.where(failed, 0, -1), ['Test failed: code expected to match /200/']),
+        'bytes': 1000 + elapsed * 3,
+        'sentBytes': 250,
+        'grpThreads': threads,
+        'allThreads': threads,
+        'URL': _categorical(label_ids, [f"http://example.com/api/{i}" for i in range(labels)]),
+        'Latency': np.maximum(elapsed - 2, 0),
+        'IdleTime': 0,
+        'Connect': elapsed % 30,
+    })
+
+
+def _write_block(f, df: pd.DataFrame):
+    """Append a block without header or quoting, with pyarrow's writer when installed"""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        df.to_csv(f, header=False, index=False)
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+
+
+def generate_jtl(path: Path, rows: int, labels: int = 40, error_rate: float = 0.02,
+                 latency: str = 'lognormal', median_ms: float = 150, spread: float = 0.8,
+                 duration_s: int = 3600, threads: int = 50, seed: int = 42, file_index: int = 0) -> int:
+    """Write a CSV JTL file of ``rows`` samples and return its row count
+
+    Samples are spread evenly over ``duration_s`` seconds, ``error_rate`` of
+    them fail, and response times follow ``latency`` (one of
+    ``LATENCY_DISTRIBUTIONS``) around ``median_ms`` with ``spread``.
+    """
+    if latency not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution '{latency}', expected one of {list(LATENCY_DISTRIBUTIONS)}")
+    with open(path, 'wb') as f:
+        f.write(HEADER.encode())
+        for block, first_row in enumerate(range(0, rows, BLOCK_ROWS)):
+            rng = np.random.default_rng([seed, file_index, block])
+            n = min(BLOCK_ROWS, rows - first_row)
+            df = _block(rng, first_row, n, rows, labels, error_rate, latency,
+                        median_ms, spread, duration_s, threads)
+            _write_block(f, df)
+    return rows
+
+
+def generate_jtl_files(directory: Path, rows: int, files: int = 1, **kwargs) -> List[Path]:
+    """Split ``rows`` samples across ``files`` JTL files in ``directory``
+
+    Remaining keyword arguments are passed to ``generate_jtl``.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(files):
+        path = directory / f"synthetic_{index:02d}.jtl"
+        file_rows = rows // files + (1 if index < rows % files else 0)
+        generate_jtl(path, file_rows, file_index=index, **kwargs)
+        paths.append(path)
+    return paths
@@ -23,6 +23,11 @@ class ConfigHandler:
         """Get output directory settings"""
         return self.settings.output_settings.to_dict()
 
+    def get_history_path(self) -> Path:
+        """Get the run history database path, resolved against the output base directory"""
+        history = self.settings.get('history', {})
+        return Path(self.settings.output_settings.base_dir) / history.get('path', 'history.sqlite')
+
     def get_log_settings(self) -> Dict[str, Any]:
         """Get logging settings"""
         return self.settings.log_settings.to_dict()
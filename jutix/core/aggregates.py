@@ -0,0 +1,184 @@
+"""
+Running aggregates folded from JTL chunks
+"""
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from jutix.core.concurrency import ConcurrencyRollup
+from jutix.core.errors import ErrorAggregator
+from jutix.core.folding import Folded
+from jutix.core.metrics import Metric, build_metrics, merge_aggregations
+from jutix.core.percentiles import PercentileSketch
+from jutix.core.rollup import TimeRollup
+
+GROUP_KEYS = ['file', 'label']
+AGGREGATE_COLUMNS = ['count', 'sum', 'sum_sq', 'min', 'max', 'success']
+
+
+class StreamingAggregator:
+    """Per-file/per-label aggregates that can be updated chunk by chunk.
+
+    Only the running aggregates are kept, so memory depends on the number of
+    (file, label) groups and time buckets rather than on the number of rows.
+    Aggregators built on different workers can be combined with ``merge``.
+    ``groups`` holds the partials of the enabled ``metrics`` (the core
+    response time and error counts by default).
+    Response time percentiles are tracked with a mergeable ``PercentileSketch``,
+    time-bucket counters with a ``TimeRollup``, requests in flight with a
+    ``ConcurrencyRollup`` and error signatures with an ``ErrorAggregator``.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, metrics: Optional[List[Metric]] = None):
+        self.metrics = metrics if metrics is not None else build_metrics()
+        self.sketch = PercentileSketch(relative_accuracy, keys=GROUP_KEYS)
+        self.rollup = TimeRollup()
+        self.concurrency = ConcurrencyRollup()
+        self.errors = ErrorAggregator()
+        self._groups = Folded(pd.DataFrame(
+            columns=AGGREGATE_COLUMNS,
+            index=pd.MultiIndex.from_arrays([[], []], names=GROUP_KEYS)
+        ), GROUP_KEYS, merge_aggregations)
+        self.rows = 0
+
+    @property
+    def groups(self) -> pd.DataFrame:
+        """Metric partials per (file, label)"""
+        return self._groups.value
+
+    @groups.setter
+    def groups(self, groups: pd.DataFrame):
+        self._groups.value = groups
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, relative_accuracy: float = 0.01,
+                   rollup: Optional[TimeRollup] = None,
+                   errors: Optional[ErrorAggregator] = None,
+                   concurrency: Optional[ConcurrencyRollup] = None,
+                   metrics: Optional[List[Metric]] = None) -> 'StreamingAggregator':
+        """Aggregate loaded rows, reusing ``rollup``, ``errors`` and ``concurrency`` if already built from them"""
+        aggregator = cls(relative_accuracy, metrics)
+        if rollup is not None:
+            aggregator.rollup = rollup
+        if errors is not None:
+            aggregator.errors = errors
+        if concurrency is not None:
+            aggregator.concurrency = concurrency
+        aggregator.update(df, update_rollup=rollup is None, update_errors=errors is None,
+                          update_concurrency=concurrency is None)
+        return aggregator
+
+    def update(self, chunk: pd.DataFrame, update_rollup: bool = True, update_errors: bool = True,
+               update_concurrency: bool = True):
+        """Fold a chunk of loaded JTL rows into the running aggregates"""
+        if chunk.empty:
+            return
+
+        partial = reduce_groups(chunk, metrics=self.metrics)
+        self.sketch.update(chunk)
+        if update_rollup:
+            self.rollup.update(chunk)
+        if update_concurrency:
+            self.concurrency.update(chunk)
+        if update_errors:
+            self.errors.update(chunk)
+        self._fold(partial, len(chunk))
+
+    def merge(self, other: 'StreamingAggregator') -> 'StreamingAggregator':
+        """Merge another aggregator into this one and return self"""
+        self.sketch.merge(other.sketch)
+        self.rollup.merge(other.rollup)
+        self.concurrency.merge(other.concurrency)
+        self.errors.merge(other.errors)
+        self._fold(other.groups, other.rows)
+        return self
+
+    def _fold(self, groups: pd.DataFrame, rows: int):
+        """Queue partial aggregates for folding into the running state"""
+        self._groups.add(groups)
+        self.rows += rows
+
+    def by_file(self) -> pd.DataFrame:
+        """Collapse the per-label aggregates to per-file aggregates"""
+        return collapse_groups(self.groups)
+
+    @property
+    def buckets(self) -> pd.Series:
+        """Request counts per file and 1 second bucket"""
+        table = self.rollup.table('1s', by=['file'])
+        return table.set_index(['file', 'bucket'])['count']
+
+    @property
+    def empty(self) -> bool:
+        return self.rows == 0
+
+
+def group_codes(df: pd.DataFrame, keys: Sequence[str] = GROUP_KEYS) -> Tuple[np.ndarray, pd.MultiIndex]:
+    """Combined integer code of every row's group and the index of all possible groups
+
+    Codes come straight from the categorical columns (other columns are
+    factorized), so no hashing of strings is needed. Rows with a missing
+    key get the code -1.
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    levels = []
+    for key in keys:
+        column = df[key]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            key_codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+        else:
+            key_codes, uniques = pd.factorize(column)
+        codes = codes * len(uniques) + key_codes
+        missing |= key_codes < 0
+        levels.append(uniques)
+    codes[missing] = -1
+
+    # Every combination of the key categories, in the order of the combined code
+    shape = [len(level) for level in levels]
+    grid = np.unravel_index(np.arange(int(np.prod(shape))), shape) if all(shape) else [[] for _ in shape]
+    index = pd.MultiIndex(levels=levels, codes=list(grid), names=list(keys))
+    return codes, index
+
+
+def reduce_groups(df: pd.DataFrame, keys: Sequence[str] = GROUP_KEYS,
+                  metrics: Optional[List[Metric]] = None) -> pd.DataFrame:
+    """Per-group partials of ``metrics``, by default the response time moments and successes
+
+    The group codes are computed once and each metric reduces them with
+    ``bincount`` (``fmin.at``/``fmax.at`` for extremes), which stays linear
+    in the rows however many labels and metrics there are. Only groups
+    with rows are returned.
+    """
+    codes, index = group_codes(df, keys)
+    valid = codes >= 0
+    if not valid.all():
+        df, codes = df[valid], codes[valid]
+    size = len(index)
+    partials = {}
+    for metric in metrics if metrics is not None else build_metrics():
+        partials.update(metric.reduce(df, codes, size))
+    observed = np.bincount(codes, minlength=size) > 0
+    return pd.DataFrame(partials, index=index)[observed]
+
+
+def collapse_groups(groups: pd.DataFrame) -> pd.DataFrame:
+    """Merge per-(file, label) partials into per-file ones"""
+    if groups.empty:
+        return groups.droplevel('label')
+    return groups.groupby(level='file').agg(merge_aggregations(groups.columns))
+
+
+def summarize(aggregates: pd.DataFrame, ddof: Optional[int] = 1) -> pd.DataFrame:
+    """Derive mean, standard deviation and success rate from raw aggregates"""
+    count = aggregates['count'].astype('float64')
+    mean = aggregates['sum'] / count
+    variance = (aggregates['sum_sq'] - aggregates['sum'] * mean) / (count - ddof)
+    return pd.DataFrame({
+        'count': aggregates['count'].astype('int64'),
+        'mean': mean,
+        'std': np.sqrt(variance.clip(lower=0)).where(count > ddof),
+        'min': aggregates['min'],
+        'max': aggregates['max'],
+        'success_rate': aggregates['success'] / count,
+    }, index=aggregates.index)
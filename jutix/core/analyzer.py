@@ -1,32 +1,63 @@
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
+from loguru import logger
 
 from jutix.config.config_handler import ConfigHandler
 from jutix.utils.logger import setup_logger
+from jutix.core.aggregates import GROUP_KEYS, StreamingAggregator, reduce_groups
 from jutix.core.data_loader import JTLDataLoader
-from jutix.visualization.plotter import JMeterPlotter
-from jutix.core.report_generator import ReportGenerator
+from jutix.core.deadline import Deadline, DeadlineExceeded
+from jutix.core.errors import ErrorAggregator
+from jutix.core.cache import JTLCache
+from jutix.core.parsers import pyarrow_available
+from jutix.core.percentiles import compute_percentiles, percentile_columns
+from jutix.core.box_stats import QUARTILES, box_stats, sketch_box_stats
+from jutix.core.concurrency import ConcurrencyRollup
+from jutix.core.rollup import TimeRollup
+from jutix.core.follow import JTLFollower
+from jutix.core.metrics import build_metrics
+from jutix.core.partials import merge_partials
+from jutix.core.profiler import StageProfiler
+from jutix.core.run_store import RunStore
+from jutix.core.histograms import sketch_histograms
+from jutix.core.interactive import interactive_series
+from jutix.core.report_generator import PLOT_SECTIONS, ReportGenerator
 from jutix.config.settings import settings
 
 class JMeterAnalyzer:
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.config_handler = ConfigHandler()
+        self.include_plots = settings.report.get('include_plots', True)
+        self.start_deadline()
         
-        # Create temporary logger for initialization
-        self.logger = setup_logger(str(id(self)), Path("logs"))  # Temporary logs directory
+        # Log through the already configured handlers until the run's log directory exists
+        self.logger = logger.bind(context=str(id(self)))
         
         try:
             # Setup directories
             self.setup_directories()
             
-            # Recreate logger with proper log directory
+            # Configure the logger once, in the run's log directory
             self.logger = setup_logger(str(id(self)), self.logs_dir)
             
+            # Every enabled metric is folded in the same pass over the rows
+            self.group_metrics = build_metrics(self.config_handler.config['metrics'],
+                                               settings.get('metric_options', {}))
+
             # Initialize components with input directory from settings
-            self.data_loader = JTLDataLoader(settings.paths.input_dir, self.logger)
-            self.plotter = JMeterPlotter(self.plots_dir, self.logger)
+            self.data_loader = JTLDataLoader(
+                settings.paths.input_dir,
+                self.logger,
+                max_workers=settings.analysis.max_workers,
+                metrics=self.config_handler.config['metrics'],
+                parser=settings.analysis.get('parser', 'c'),
+                cache=self.create_cache(),
+                group_metrics=self.group_metrics
+            )
+            self.plotter = self.create_plotter() if self.include_plots else None
             self.report_generator = ReportGenerator(self.reports_dir, self.logger)
             
             self.logger.info(f"Initialized JMeterAnalyzer with output directory: {output_dir}")
@@ -54,29 +85,333 @@ class JMeterAnalyzer:
             dir_path.mkdir(parents=True, exist_ok=True)
             self.logger.debug(f"Created directory: {dir_path}")
 
+    def create_plotter(self):
+        """Create the plotter, importing matplotlib and seaborn only when plots are wanted"""
+        from jutix.visualization.plotter import JMeterPlotter
+
+        return JMeterPlotter(
+            self.plots_dir,
+            self.logger,
+            percentiles=self.config_handler.config['percentiles'],
+            violin_mode=settings.report.get('violin_mode', 'binned'),
+            max_workers=settings.analysis.max_workers if settings.report.get('parallel_plots', True) else 1
+        )
+
+    def create_cache(self) -> Optional[JTLCache]:
+        """Create the parsed-file cache from the cache settings, if enabled"""
+        cache_settings = settings.get('cache', {})
+        if not cache_settings.get('enabled', False):
+            return None
+        if not pyarrow_available():
+            self.logger.warning("JTL cache disabled: pyarrow is required for Feather files")
+            return None
+
+        cache_dir = Path(cache_settings.get('dir', '.jutix_cache'))
+        if not cache_dir.is_absolute():
+            cache_dir = Path(settings.paths.input_dir) / cache_dir
+        self.logger.debug(f"Using JTL cache: {cache_dir}")
+        return JTLCache(
+            cache_dir,
+            max_size_mb=cache_settings.get('max_size_mb', 2048),
+            rebuild=cache_settings.get('rebuild', False)
+        )
+
     def generate_report(self) -> Optional[str]:
-        """Generate comprehensive analysis report"""
+        """Generate comprehensive analysis report
+
+        The run is bounded by ``analysis.timeout``: once it passes, loading
+        stops, the remaining stages over the loaded rows are skipped and the
+        report of whatever was finished is written, marked as partial.
+        Streamed and merged aggregates always get their tables, see
+        ``report_from_aggregates``.
+        """
         try:
             config = self.config_handler.config
+            self.start_profiler()
+            self.start_deadline()
+            if settings.analysis.get('streaming', False):
+                return self.generate_streaming_report(config)
+
             # Load data
-            df = self.data_loader.load_jtl_files(
-                config['enabled_files'],
-                config.get('exclude_files', [])
-            )
+            load_deadline = self.stage_deadline('load')
+            with self.profiler.stage('load') as stage:
+                df = self.data_loader.load_jtl_files(
+                    config['enabled_files'],
+                    config.get('exclude_files', []),
+                    deadline=load_deadline
+                )
+                stage['rows'] = len(df)
+            if load_deadline.expired:
+                truncated = self.data_loader.truncated_files
+                self.mark_partial(f"The {load_deadline.name} timeout stopped loading after {len(df):,} rows"
+                                  + (f", part way through {', '.join(truncated)}" if truncated else ""))
             
             if df.empty:
                 self.logger.error("No data found in JTL files")
                 return None
 
-            # Generate plots
-            self.plotter.generate_all_plots(df)
-            
-            # Calculate statistics and generate report
-            stats_df = self.report_generator.calculate_statistics(df)
-            report_path = self.report_generator.generate_html_report(stats_df)
+            stats_df = rollup = concurrency = groups = label_stats = error_tables = None
+            try:
+                # Percentiles (plus the box plot quartiles) are computed once and
+                # shared by the plots and the report
+                with self.stage('percentiles', rows=len(df)):
+                    all_percentiles = sorted(set(config['percentiles']) | set(QUARTILES))
+                    all_percentile_table = self.compute_percentiles(df, all_percentiles)
+                    percentile_table = all_percentile_table[percentile_columns(config['percentiles'])]
+
+                # Time buckets are rolled up once for the throughput plot and stats
+                with self.stage('rollup', rows=len(df)):
+                    rollup = TimeRollup.from_frame(df)
+
+                # Requests in flight from the start and end of every sample
+                with self.stage('concurrency', rows=len(df)):
+                    concurrency = ConcurrencyRollup.from_frame(df)
+                    self.report_generator.concurrency_analysis(concurrency)
+
+                # Calculate statistics and generate report
+                # One pass over the rows computes every metric per (file, label);
+                # both statistics tables are derived from these partials
+                with self.stage('statistics', rows=len(df)):
+                    groups = reduce_groups(df, metrics=self.group_metrics)
+                    stats_df = self.report_generator.calculate_statistics(
+                        df, percentile_table, rollup, concurrency, groups)
+
+                with self.stage('label_statistics', rows=len(df)):
+                    label_stats = self.report_generator.label_statistics(
+                        groups,
+                        self.compute_percentiles(df, config['percentiles'], by=GROUP_KEYS),
+                        rollup
+                    )
+
+                with self.stage('errors', rows=len(df)):
+                    errors = ErrorAggregator.from_frame(df)
+                    error_tables = self.error_analysis(errors)
+
+                # Plots come last, so a timeout while rendering still reports every table
+                if self.plotter:
+                    with self.stage('plots', rows=len(df)):
+                        boxplot_stats = box_stats(df, quartiles=all_percentile_table)
+                        self.render_plots(df, percentile_table=percentile_table, rollup=rollup,
+                                          concurrency=concurrency, boxplot_stats=boxplot_stats)
+            except DeadlineExceeded as e:
+                self.mark_partial(str(e))
+
+            if self.history_enabled() and not self.partial:
+                self.save_history(StreamingAggregator.from_frame(
+                    df, settings.analysis.get('sketch_accuracy', 0.01), rollup, errors, concurrency,
+                    self.group_metrics
+                ))
             
-            return report_path
+            return self.write_report(stats_df, rollup, label_stats, error_tables)
             
         except Exception as e:
             self.logger.exception(f"Error during analysis: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    def generate_streaming_report(self, config) -> Optional[str]:
+        """Generate the statistics report from chunked aggregates
+
+        Rows are folded into running aggregates ``analysis.batch_size`` at a
+        time, so the raw data is never held in memory. Every plot is drawn
+        from the aggregator's sketch and rollup.
+        """
+        aggregate_deadline = self.stage_deadline('aggregate')
+        with self.profiler.stage('aggregate') as stage:
+            aggregator = self.data_loader.aggregate_jtl_files(
+                config['enabled_files'],
+                config.get('exclude_files', []),
+                batch_size=settings.analysis.batch_size,
+                relative_accuracy=settings.analysis.get('sketch_accuracy', 0.01),
+                deadline=aggregate_deadline
+            )
+            stage['rows'] = aggregator.rows
+        if aggregate_deadline.expired:
+            self.mark_partial(f"The {aggregate_deadline.name} timeout stopped aggregation "
+                              f"after {aggregator.rows:,} rows")
+
+        if aggregator.empty:
+            self.logger.error("No data found in JTL files")
+            return None
+        return self.report_from_aggregates(aggregator, config)
+
+    def generate_merged_report(self, partials) -> Optional[str]:
+        """Generate the report of partial aggregates saved by ``jutix partial``
+
+        The partials are merged in the given order and reported exactly
+        like a streaming analysis of all their JTL files.
+        """
+        try:
+            config = self.config_handler.config
+            self.start_profiler()
+            self.start_deadline()
+            with self.profiler.stage('merge') as stage:
+                aggregator, sources = merge_partials(partials, self.logger)
+                stage['rows'] = aggregator.rows
+                stage['partials'] = len(sources)
+
+            if aggregator.empty:
+                self.logger.error("No data found in the partials")
+                return None
+            return self.report_from_aggregates(aggregator, config)
+        except Exception as e:
+            self.logger.exception(f"Error merging partials: {e}")
+            raise
+
+    def report_from_aggregates(self, aggregator: StreamingAggregator, config) -> str:
+        """Statistics, plots and report of running aggregates
+
+        The tables only read the finished aggregates, so they are built even
+        after the run's deadline has passed; only the plots are skipped.
+        """
+        with self.profiler.stage('statistics'):
+            stats_df = self.report_generator.statistics_from_aggregates(aggregator, config['percentiles'])
+        with self.profiler.stage('label_statistics', rows=aggregator.rows):
+            label_stats = self.report_generator.label_statistics(
+                aggregator.groups,
+                aggregator.sketch.percentiles(config['percentiles'], by=GROUP_KEYS),
+                aggregator.rollup
+            )
+        with self.profiler.stage('errors'):
+            error_tables = self.error_analysis(aggregator.errors)
+        with self.profiler.stage('concurrency'):
+            self.report_generator.concurrency_analysis(aggregator.concurrency)
+        if self.plotter:
+            try:
+                with self.stage('plots'):
+                    self.render_plots(
+                        None,
+                        percentile_table=aggregator.sketch.percentiles(config['percentiles']),
+                        rollup=aggregator.rollup,
+                        concurrency=aggregator.concurrency,
+                        boxplot_stats=sketch_box_stats(aggregator.sketch),
+                        histograms=sketch_histograms(aggregator.sketch)
+                    )
+            except DeadlineExceeded as e:
+                self.mark_partial(str(e))
+        if self.history_enabled() and not self.partial:
+            self.save_history(aggregator)
+        return self.write_report(stats_df, aggregator.rollup, label_stats, error_tables)
+
+    def render_plots(self, df, **inputs):
+        """Render every plot within the plots stage deadline, noting any left out"""
+        deadline = self.stage_deadline('plots')
+        rendered = self.plotter.generate_all_plots(df, deadline=deadline, **inputs)
+        self.rendered_plots = [Path(path).name for path in rendered]
+        if len(rendered) < len(PLOT_SECTIONS):
+            self.mark_partial(f"The {deadline.name} timeout stopped plotting after "
+                              f"{len(rendered)} of {len(PLOT_SECTIONS)} plots")
+
+    def compute_percentiles(self, df, percentiles, by=('file',)):
+        """Percentile table of loaded rows, exact or sketched as configured"""
+        return compute_percentiles(
+            df,
+            percentiles,
+            mode=settings.analysis.get('percentile_mode', 'auto'),
+            max_exact_rows=settings.analysis.get('exact_percentile_rows', 1_000_000),
+            relative_accuracy=settings.analysis.get('sketch_accuracy', 0.01),
+            by=by
+        )
+
+    def error_analysis(self, errors: ErrorAggregator) -> Optional[dict]:
+        """Top error signatures for the report, unless ``errors.enabled`` is off"""
+        error_settings = settings.get('errors', {})
+        if not error_settings.get('enabled', True):
+            return None
+        return self.report_generator.error_analysis(errors, error_settings.get('top_n', 10))
+
+    def history_enabled(self) -> bool:
+        return settings.get('history', {}).get('enabled', True)
+
+    def save_history(self, aggregator: StreamingAggregator):
+        """Store the run's aggregates under its run directory name for ``jutix compare``"""
+        store_path = self.config_handler.get_history_path()
+        try:
+            with self.profiler.stage('history', rows=aggregator.rows):
+                with RunStore(store_path) as store:
+                    store.save_run(self.run_dir.name, aggregator, settings.paths.input_dir)
+            self.logger.info(f"Saved run {self.run_dir.name} to {store_path}")
+        except Exception as e:
+            # History is a convenience; a locked or read-only database must not fail the report
+            self.logger.error(f"Error saving run history to {store_path}: {str(e)}")
+
+    def start_deadline(self) -> Deadline:
+        """Start the run's ``analysis.timeout`` clock; 0 or no value means no limit"""
+        self.deadline = Deadline(settings.analysis.get('timeout'), 'analysis')
+        self.partial = []
+        self.rendered_plots = []
+        return self.deadline
+
+    def stage_deadline(self, name: str) -> Deadline:
+        """Deadline of a stage: ``analysis.stage_timeouts.<name>``, never later than the run's"""
+        return self.deadline.stage(name, settings.analysis.get('stage_timeouts', {}).get(name))
+
+    @contextmanager
+    def stage(self, name: str, **context):
+        """Profile a stage of per-row work, which is skipped once the run's deadline has passed"""
+        self.deadline.check(f"before the {name} stage")
+        with self.profiler.stage(name, **context) as record:
+            yield record
+
+    def mark_partial(self, reason: str):
+        """Record why the report is incomplete"""
+        self.logger.warning(f"Partial report: {reason}")
+        self.partial.append(reason)
+
+    def start_profiler(self) -> StageProfiler:
+        """Start a fresh stage profiler for this run and attach it to the loader"""
+        self.profiler = StageProfiler(self.logger)
+        self.data_loader.profiler = self.profiler
+        return self.profiler
+
+    def write_report(self, stats_df, rollup: Optional[TimeRollup] = None, label_stats=None,
+                     error_tables: Optional[dict] = None) -> str:
+        """Write the HTML report, then ``run_metrics.json`` with every stage next to it
+
+        With ``report.interactive`` the rollup's per-second series are
+        downsampled to ``report.max_points`` and embedded in the report.
+        """
+        series = None
+        if settings.report.get('interactive', False) and rollup is not None and not self.deadline.expired:
+            with self.profiler.stage('series'):
+                series = interactive_series(rollup, settings.report.get('max_points', 1000))
+        with self.profiler.stage('report'):
+            report_path = self.report_generator.generate_html_report(
+                stats_df, plots=self.report_plots(), performance=self.profiler.stages, series=series,
+                label_stats=label_stats, error_tables=error_tables, partial=self.partial
+            )
+        metrics_path = self.profiler.write_json(self.reports_dir / 'run_metrics.json', partial=self.partial)
+        self.logger.info(f"Pipeline metrics written to {metrics_path}")
+        return report_path
+
+    def report_plots(self) -> Optional[list]:
+        """Plot files linked from the report: all of them, none in stats-only mode, or those
+        rendered before a timeout"""
+        if not self.plotter:
+            return []
+        return self.rendered_plots if self.partial else None
+
+    def follow(self, interval: Optional[float] = None, max_refreshes: Optional[int] = None) -> Optional[str]:
+        """Analyze JTL files while they are being written
+
+        Only newly appended lines are parsed on each poll, and the stats
+        table and throughput plot are regenerated from running aggregates
+        every ``interval`` seconds until interrupted.
+        """
+        config = self.config_handler.config
+        interval = interval or settings.analysis.get('follow_interval', 10)
+        follower = JTLFollower(
+            self.data_loader,
+            self.report_generator,
+            self.plotter,
+            self.logger,
+            percentiles=config['percentiles'],
+            relative_accuracy=settings.analysis.get('sketch_accuracy', 0.01),
+            batch_size=settings.analysis.batch_size
+        )
+        self.logger.info(f"Following JTL files in {settings.paths.input_dir} every {interval}s (Ctrl+C to stop)")
+        return follower.run(
+            config['enabled_files'],
+            config.get('exclude_files', []),
+            interval=interval,
+            max_refreshes=max_refreshes
+        )
@@ -0,0 +1,96 @@
+"""
+Box plot statistics computed without sorting the raw rows
+"""
+import pandas as pd
+import numpy as np
+from typing import List, Optional
+
+from jutix.core.percentiles import PercentileSketch, exact_percentiles
+
+QUARTILES = [25, 50, 75]
+WHISKER_IQR = 1.5
+DEFAULT_MAX_FLIERS = 200
+
+
+def _quartile_arrays(table: pd.DataFrame, groups) -> tuple:
+    """Return q1, median and q3 aligned to ``groups``"""
+    table = table.reindex(groups)
+    return table['P25'].to_numpy(), table['P50'].to_numpy(), table['P75'].to_numpy()
+
+
+def _sample_fliers(values: np.ndarray, max_fliers: int, rng) -> np.ndarray:
+    """Cap fliers to ``max_fliers``, always keeping the two extremes"""
+    if len(values) <= max_fliers:
+        return values
+    extremes = [values.min(), values.max()]
+    sampled = rng.choice(values, max_fliers - 2, replace=False)
+    return np.concatenate([extremes, sampled])
+
+
+def box_stats(df: pd.DataFrame, by: str = 'file', column: str = 'elapsed',
+              quartiles: Optional[pd.DataFrame] = None, max_fliers: int = DEFAULT_MAX_FLIERS,
+              seed: int = 0) -> List[dict]:
+    """Per-group statistics for ``Axes.bxp`` from loaded rows
+
+    ``quartiles`` is a percentile table with P25/P50/P75 columns (e.g. the
+    one computed for the report); it is computed exactly if missing. Whiskers
+    follow the 1.5 IQR rule and are found with one masked min/max pass.
+    """
+    if quartiles is None:
+        quartiles = exact_percentiles(df, QUARTILES, by=[by], column=column)
+
+    codes, groups = pd.factorize(df[by], sort=True)
+    values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+    q1, median, q3 = _quartile_arrays(quartiles, groups)
+    iqr = q3 - q1
+    low_fence = (q1 - WHISKER_IQR * iqr)[codes]
+    high_fence = (q3 + WHISKER_IQR * iqr)[codes]
+
+    inside = (values >= low_fence) & (values <= high_fence)
+    whislo = pd.Series(np.where(inside, values, np.inf)).groupby(codes).min().to_numpy()
+    whishi = pd.Series(np.where(inside, values, -np.inf)).groupby(codes).max().to_numpy()
+    means = pd.Series(values).groupby(codes).mean().to_numpy()
+
+    outside = ~inside & ~np.isnan(values)
+    flier_codes, flier_values = codes[outside], values[outside]
+    rng = np.random.default_rng(seed)
+
+    stats = []
+    for i, group in enumerate(groups):
+        stats.append({
+            'label': str(group),
+            'q1': q1[i], 'med': median[i], 'q3': q3[i], 'mean': means[i],
+            'whislo': whislo[i], 'whishi': whishi[i],
+            'fliers': _sample_fliers(flier_values[flier_codes == i], max_fliers, rng),
+        })
+    return stats
+
+
+def sketch_box_stats(sketch: PercentileSketch, by: str = 'file',
+                     max_fliers: int = DEFAULT_MAX_FLIERS, seed: int = 0) -> List[dict]:
+    """Per-group statistics for ``Axes.bxp`` from a percentile sketch
+
+    Quartiles, whiskers and fliers are bucket estimates, so they carry the
+    sketch's relative error; fliers are one point per occupied bucket.
+    """
+    quartiles = sketch.percentiles(QUARTILES, by=[by])
+    counts = sketch.counts.groupby(level=[by, 'bucket'], observed=True).sum()
+    rng = np.random.default_rng(seed)
+
+    stats = []
+    for group, group_counts in counts.groupby(level=by, observed=True):
+        buckets = group_counts.index.get_level_values('bucket').to_numpy()
+        values = sketch.bucket_value(buckets)
+        weights = group_counts.to_numpy(dtype='float64')
+        q1, median, q3 = quartiles.loc[group, ['P25', 'P50', 'P75']]
+        iqr = q3 - q1
+        inside = (values >= q1 - WHISKER_IQR * iqr) & (values <= q3 + WHISKER_IQR * iqr)
+        stats.append({
+            'label': str(group),
+            'q1': q1, 'med': median, 'q3': q3,
+            'mean': float((values * weights).sum() / weights.sum()),
+            'whislo': values[inside].min() if inside.any() else q1,
+            'whishi': values[inside].max() if inside.any() else q3,
+            'fliers': _sample_fliers(np.sort(values[~inside]), max_fliers, rng),
+        })
+    return stats
@@ -0,0 +1,103 @@
+"""
+Persistent columnar cache of parsed JTL files
+"""
+import hashlib
+import os
+import re
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+
+from jutix.core.schema import SCHEMA_VERSION, columns_for_metrics
+
+CACHE_SUFFIX = '.feather'
+
+
+class JTLCache:
+    """Feather files holding prepared JTL frames, keyed by file fingerprint.
+
+    An entry is valid for a given path, size, modification time, schema
+    version and column projection, so edited or re-written JTL files are
+    parsed again. The cache is kept under ``max_size_mb`` by evicting the
+    least recently used entries.
+
+    Instances hold no open handles and can be shipped to worker processes.
+    """
+
+    def __init__(self, cache_dir, max_size_mb: int = 2048, rebuild: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_size_mb) * 1024 * 1024
+        self.rebuild = rebuild
+
+    def fingerprint(self, file_path: str, metrics: Optional[List[str]] = None) -> str:
+        """Return the cache key for a JTL file and column projection"""
+        stat = os.stat(file_path)
+        parts = [
+            str(Path(file_path).resolve()),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            str(SCHEMA_VERSION),
+            ','.join(columns_for_metrics(metrics) or ['*']),
+        ]
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    def entry_path(self, file_path: str, metrics: Optional[List[str]] = None) -> Path:
+        """Return the cache file path for a JTL file"""
+        key = self.fingerprint(file_path, metrics)[:16]
+        return self.cache_dir / f"{Path(file_path).name}.{key}{CACHE_SUFFIX}"
+
+    def load(self, file_path: str, metrics: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Return the cached frame for a file, or None on a miss"""
+        if self.rebuild:
+            return None
+        entry = self.entry_path(file_path, metrics)
+        if not entry.exists():
+            return None
+        try:
+            df = pd.read_feather(entry)
+        except Exception:
+            # A truncated or incompatible entry is treated as a miss
+            entry.unlink(missing_ok=True)
+            return None
+        # Mark the entry as recently used for eviction
+        os.utime(entry)
+        return df
+
+    def store(self, file_path: str, df: pd.DataFrame, metrics: Optional[List[str]] = None) -> Path:
+        """Write a prepared frame to the cache, replacing stale entries for the file"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.entry_path(file_path, metrics)
+        pattern = re.compile(rf"{re.escape(Path(file_path).name)}\.[0-9a-f]{{16}}{re.escape(CACHE_SUFFIX)}")
+        for stale in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            if stale != entry and pattern.fullmatch(stale.name):
+                stale.unlink(missing_ok=True)
+
+        # Write to a temporary name so concurrent readers never see partial files
+        tmp_path = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        df.reset_index(drop=True).to_feather(tmp_path)
+        os.replace(tmp_path, entry)
+        return entry
+
+    def size(self) -> int:
+        """Total size of the cache in bytes"""
+        if not self.cache_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.cache_dir.glob(f"*{CACHE_SUFFIX}"))
+
+    def evict(self) -> List[Path]:
+        """Delete least recently used entries until the cache fits its size bound"""
+        if not self.cache_dir.exists():
+            return []
+        entries = sorted(
+            (p for p in self.cache_dir.glob(f"*{CACHE_SUFFIX}")),
+            key=lambda p: p.stat().st_mtime
+        )
+        total = sum(p.stat().st_size for p in entries)
+        evicted = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+            evicted.append(entry)
+        return evicted
@@ -0,0 +1,130 @@
+"""
+Streaming decompression of archived JTL files
+
+Compressed files are never written back to disk: a background thread
+decompresses them into a bounded queue of chunks and the parser reads
+from the other end, so decompression and parsing overlap while memory
+stays bounded by the queue size.
+"""
+import gzip
+import io
+import queue
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Optional
+
+# File suffixes of the supported compression formats
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+# Decompressed bytes per queued chunk and chunks buffered ahead of the parser
+CHUNK_BYTES = 1 << 20
+MAX_BUFFERED_CHUNKS = 8
+
+
+def compression_of(file_path) -> Optional[str]:
+    """Compression format of a file, from its suffix"""
+    return COMPRESSIONS.get(Path(file_path).suffix.lower())
+
+
+def zstandard_available() -> bool:
+    """Check whether the optional zstandard dependency can be imported"""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _open_stream(file_path, compression: str, stack: ExitStack):
+    """Open a decompressing binary stream, registering everything to close on ``stack``"""
+    if compression == 'gzip':
+        return stack.enter_context(gzip.open(file_path, 'rb'))
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst files requires zstandard: pip install -e \".[zstd]\"")
+        raw = stack.enter_context(open(file_path, 'rb'))
+        return stack.enter_context(zstandard.ZstdDecompressor().stream_reader(raw))
+    raise ValueError(f"Unsupported compression '{compression}'")
+
+
+class DecompressingReader(io.RawIOBase):
+    """Binary file object over a compressed file, decompressed by a background thread
+
+    The thread stops after at most ``max_chunks`` chunks of ``chunk_bytes``
+    ahead of the reader. Errors raised while decompressing are re-raised
+    by ``read`` once the chunks before them have been consumed.
+    """
+
+    def __init__(self, file_path, compression: Optional[str] = None,
+                 chunk_bytes: int = CHUNK_BYTES, max_chunks: int = MAX_BUFFERED_CHUNKS):
+        super().__init__()
+        self.file_path = str(file_path)
+        self.compression = compression or compression_of(file_path)
+        self._chunks: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._finished = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._decompress, args=(chunk_bytes,),
+            name=f"decompress-{Path(file_path).name}", daemon=True
+        )
+        self._thread.start()
+
+    def _decompress(self, chunk_bytes: int):
+        try:
+            with ExitStack() as stack:
+                stream = _open_stream(self.file_path, self.compression, stack)
+                while not self._stop.is_set():
+                    data = stream.read(chunk_bytes)
+                    if not data:
+                        break
+                    self._put(data)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._put(None)
+
+    def _put(self, item):
+        """Queue a chunk, giving up once the reader has been closed"""
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not len(self._pending):
+            if self._finished:
+                return 0
+            data = self._chunks.get()
+            if data is None:
+                self._finished = True
+                if self._error is not None:
+                    raise self._error
+                return 0
+            self._pending = memoryview(data)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+        super().close()
+
+
+def open_jtl(file_path):
+    """Open a JTL file for binary reading, decompressing ``.gz`` and ``.zst`` files in the background"""
+    if compression_of(file_path):
+        return io.BufferedReader(DecompressingReader(file_path), buffer_size=CHUNK_BYTES)
+    return open(file_path, 'rb')
@@ -0,0 +1,213 @@
+"""
+Requests in flight over time, from the intervals of the samples
+
+Every sample is the interval ``[timeStamp, timeStamp + elapsed)``. Instead
+of sweeping over sorted start and end events, each interval adds one start
+and one end event to the 1 second bucket it falls in, together with its
+offset into the bucket. The number in flight at the start of a bucket is
+the running sum of starts minus ends before it, and its time-weighted mean
+over the bucket follows from the offsets:
+
+    mean_k = level_{k+1} - (start_offsets_k - end_offsets_k) / 1000
+
+so the whole series takes one ``bincount`` over the rows and a cumulative
+sum over the buckets, and bucket counters of different chunks, files or
+injectors merge by addition.
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Sequence
+
+from jutix.core.folding import Folded
+from jutix.core.rollup import RESOLUTIONS, resolution_for_span
+from jutix.core.schema import timestamp_millis
+
+CONCURRENCY_KEYS = ['file', 'bucket']
+CONCURRENCY_AGGREGATIONS = {
+    'starts': 'sum', 'start_offsets': 'sum', 'ends': 'sum', 'end_offsets': 'sum',
+    'allThreads': 'max', 'grpThreads': 'max',
+}
+EVENT_COLUMNS = ['starts', 'start_offsets', 'ends', 'end_offsets']
+THREAD_COLUMNS = ['allThreads', 'grpThreads']
+BUCKET_MS = RESOLUTIONS['1s']
+
+# Rows reduced at a time, bounding the temporary arrays of very large frames
+BLOCK_ROWS = 4_000_000
+
+# Largest dense (file, bucket) grid; sparser ones are compacted by sorting
+MAX_DENSE_CELLS = 1 << 22
+
+
+def _file_codes(files: pd.Series):
+    if isinstance(files.dtype, pd.CategoricalDtype):
+        return files.cat.codes.to_numpy(dtype=np.int64), files.cat.categories
+    codes, categories = pd.factorize(files)
+    return codes.astype(np.int64), categories
+
+
+def _reduce(df: pd.DataFrame) -> pd.DataFrame:
+    """Bucket the start and end events of a block of rows by file and 1 second bucket"""
+    codes, files = _file_codes(df['file'])
+    starts = timestamp_millis(df['timeStamp'])
+    ends = starts + df['elapsed'].to_numpy(dtype='float64', na_value=0).astype(np.int64)
+    start_buckets = starts // BUCKET_MS
+    end_buckets = ends // BUCKET_MS
+
+    first = int(start_buckets.min())
+    span = int(end_buckets.max()) - first + 1
+    start_cells = codes * span + (start_buckets - first)
+    end_cells = codes * span + (end_buckets - first)
+    cells = None
+    size = len(files) * span
+    if size > MAX_DENSE_CELLS:
+        # Long tests with many files: number only the cells that occur
+        cells, inverse = np.unique(np.concatenate([start_cells, end_cells]), return_inverse=True)
+        start_cells, end_cells = inverse[:len(starts)], inverse[len(starts):]
+        size = len(cells)
+
+    data = {
+        'starts': np.bincount(start_cells, minlength=size).astype('float64'),
+        'start_offsets': np.bincount(start_cells, weights=starts - start_buckets * BUCKET_MS, minlength=size),
+        'ends': np.bincount(end_cells, minlength=size).astype('float64'),
+        'end_offsets': np.bincount(end_cells, weights=ends - end_buckets * BUCKET_MS, minlength=size),
+    }
+    for column in THREAD_COLUMNS:
+        # Thread counts are reported at the start of a sample
+        peak = np.full(size, np.nan)
+        if column in df.columns:
+            np.fmax.at(peak, start_cells, df[column].to_numpy(dtype='float64', na_value=np.nan))
+        data[column] = peak
+
+    used = np.flatnonzero((data['starts'] > 0) | (data['ends'] > 0))
+    cell_ids = used if cells is None else cells[used]
+    index = pd.MultiIndex.from_arrays([
+        pd.Categorical.from_codes(cell_ids // span, categories=files),
+        cell_ids % span + first,
+    ], names=CONCURRENCY_KEYS)
+    return pd.DataFrame({column: values[used] for column, values in data.items()}, index=index)
+
+
+class ConcurrencyRollup:
+    """Start and end events of the samples per file and 1 second bucket
+
+    Also keeps the highest ``allThreads``/``grpThreads`` JMeter reported in
+    each bucket, so the load the test applied can be compared with the
+    requests actually in flight.
+    """
+
+    def __init__(self):
+        self._frame = Folded(pd.DataFrame(
+            columns=list(CONCURRENCY_AGGREGATIONS),
+            index=pd.MultiIndex.from_arrays([[], []], names=CONCURRENCY_KEYS)
+        ), CONCURRENCY_KEYS, CONCURRENCY_AGGREGATIONS)
+        self._tables: Dict[tuple, pd.DataFrame] = {}
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Event counters and thread peaks per file and 1 second bucket"""
+        return self._frame.value
+
+    @frame.setter
+    def frame(self, frame: pd.DataFrame):
+        self._frame.value = frame
+        self._tables.clear()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ConcurrencyRollup':
+        """Build the event counters from loaded JTL rows"""
+        concurrency = cls()
+        concurrency.update(df)
+        return concurrency
+
+    def update(self, df: pd.DataFrame):
+        """Add the intervals of a chunk of loaded JTL rows"""
+        if df.empty:
+            return
+        partials = [_reduce(df.iloc[start:start + BLOCK_ROWS]) for start in range(0, len(df), BLOCK_ROWS)]
+        self._fold(pd.concat(partials) if len(partials) > 1 else partials[0])
+
+    def merge(self, other: 'ConcurrencyRollup') -> 'ConcurrencyRollup':
+        """Merge another rollup into this one and return self"""
+        self._fold(other.frame)
+        return self
+
+    def _fold(self, partial: pd.DataFrame):
+        if partial.empty:
+            return
+        self._frame.add(partial)
+        self._tables.clear()
+
+    def table(self, resolution: str = '1s', by: Sequence[str] = ()) -> pd.DataFrame:
+        """Requests in flight and JMeter's thread counts per time bucket
+
+        ``in_flight`` is the time-weighted mean number of requests in flight
+        during a bucket and ``peak_in_flight`` the highest 1 second mean
+        within it. Thread counts are the highest reported in the bucket,
+        summed over files unless grouped ``by`` file, and carried forward
+        through buckets without new samples. Buckets are contiguous, so the
+        quiet seconds spanned by long requests are included.
+        """
+        key = (resolution, tuple(by))
+        if key not in self._tables:
+            self._tables[key] = self._table(resolution, list(by))
+        return self._tables[key]
+
+    def _table(self, resolution: str, by: list) -> pd.DataFrame:
+        columns = by + ['bucket', 'time', 'in_flight', 'peak_in_flight'] + THREAD_COLUMNS
+        if self.frame.empty:
+            return pd.DataFrame(columns=columns)
+
+        grouped = self.frame.groupby(level=by + ['bucket'], observed=True)
+        per_second = grouped[EVENT_COLUMNS].sum().join(grouped[THREAD_COLUMNS].sum(min_count=1))
+        groups = per_second.groupby(level=by, observed=True) if by else [((), per_second)]
+
+        factor = RESOLUTIONS[resolution] // BUCKET_MS
+        tables = []
+        for group, events in groups:
+            buckets = events.index.get_level_values('bucket')
+            dense = events.droplevel(by) if by else events
+            dense = dense.reindex(pd.RangeIndex(buckets.min(), buckets.max() + 1, name='bucket'))
+            dense[EVENT_COLUMNS] = dense[EVENT_COLUMNS].fillna(0)
+            level = np.cumsum(dense['starts'].to_numpy() - dense['ends'].to_numpy())
+            offsets = (dense['start_offsets'].to_numpy() - dense['end_offsets'].to_numpy()) / BUCKET_MS
+            table = pd.DataFrame({
+                'bucket': dense.index.to_numpy() // factor,
+                'in_flight': level - offsets,
+                **{column: dense[column].ffill().to_numpy() for column in THREAD_COLUMNS},
+            })
+            table = table.groupby('bucket', sort=True).agg(
+                in_flight=('in_flight', 'mean'), peak_in_flight=('in_flight', 'max'),
+                allThreads=('allThreads', 'max'), grpThreads=('grpThreads', 'max'),
+            ).reset_index()
+            for column, value in zip(by, group if isinstance(group, tuple) else (group,)):
+                table[column] = value
+            tables.append(table)
+
+        table = pd.concat(tables, ignore_index=True)
+        table['time'] = pd.to_datetime(table['bucket'] * RESOLUTIONS[resolution], unit='ms')
+        return table[columns]
+
+    def summary(self) -> pd.DataFrame:
+        """Mean and peak requests in flight and the peak thread count of each file"""
+        per_second = self.table('1s', by=['file'])
+        grouped = per_second.groupby('file', observed=True)
+        return pd.DataFrame({
+            'mean_in_flight': grouped['in_flight'].mean(),
+            'peak_in_flight': grouped['in_flight'].max(),
+            'peak_threads': grouped['allThreads'].max(),
+        })
+
+    def auto_resolution(self, max_points: int = 2000) -> str:
+        """Finest resolution that keeps the series under ``max_points`` buckets"""
+        return resolution_for_span(self.span_seconds(), max_points)
+
+    def span_seconds(self) -> int:
+        """Number of 1 second buckets between the first start and the last end"""
+        if self.frame.empty:
+            return 0
+        buckets = self.frame.index.get_level_values('bucket')
+        return int(buckets.max() - buckets.min() + 1)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
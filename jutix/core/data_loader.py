@@ -2,49 +2,333 @@
 JMeter log data loading functionality
 """
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import glob
-from typing import List
+from typing import Iterator, List, Optional
 import logging
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from tqdm import tqdm
 import os
 
+from jutix.core.aggregates import StreamingAggregator
+from jutix.core.cache import JTLCache
+from jutix.core.compression import COMPRESSIONS, compression_of
+from jutix.core.deadline import Deadline, DeadlineExceeded, pool_timeout, terminate_pool
+from jutix.core.metrics import Metric
+from jutix.core.parsers import DEFAULT_PARSER, iter_jtl_csv, read_jtl_csv, resolve_parser
+from jutix.core.profiler import StageProfiler, measure_call
+from jutix.core.schema import concat_frames, parse_timestamps, success_flags, timestamp_millis
+from jutix.core.xmlparse import is_xml_jtl, iter_jtl_xml, read_jtl_xml
+
+# Rows parsed between deadline checks when reading a whole file
+DEADLINE_BATCH_ROWS = 500_000
+
+def prepare_jtl_frame(df: pd.DataFrame, file_name: str) -> pd.DataFrame:
+    """Add the derived columns to a frame (or chunk) of raw JTL rows"""
+    # Convert timestamp to datetime
+    df['timeStamp'] = parse_timestamps(df['timeStamp'])
+
+    # Convert success to boolean
+    df['success'] = success_flags(df)
+
+    # Add file metadata
+    df['file'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [file_name])
+
+    # Add epoch bucket ids (not wall-clock components) with integer arithmetic
+    millis = timestamp_millis(df['timeStamp'])
+    df['second'] = millis // 1000
+    df['minute'] = (millis // 60_000).astype(np.int32)
+    df['hour'] = (millis // 3_600_000).astype(np.int32)
+    return df
+
+
+def read_raw_jtl(file_path: str, metrics: Optional[List[str]] = None,
+                 parser: str = DEFAULT_PARSER) -> pd.DataFrame:
+    """Read a CSV or XML JTL file into a frame of raw rows"""
+    if is_xml_jtl(file_path):
+        return read_jtl_xml(file_path, metrics)
+    return read_jtl_csv(file_path, metrics, parser)
+
+
+def iter_raw_jtl(file_path: str, batch_size: int, metrics: Optional[List[str]] = None,
+                 parser: str = DEFAULT_PARSER) -> Iterator[pd.DataFrame]:
+    """Yield frames of roughly ``batch_size`` raw rows from a CSV or XML JTL file"""
+    if is_xml_jtl(file_path):
+        return iter_jtl_xml(file_path, batch_size, metrics)
+    return iter_jtl_csv(file_path, batch_size, metrics, parser)
+
+
+def read_jtl_file(file_path: str, metrics: Optional[List[str]] = None,
+                  parser: str = DEFAULT_PARSER, cache: Optional[JTLCache] = None,
+                  deadline: Optional[Deadline] = None) -> pd.DataFrame:
+    """Read a single JTL file with the compact schema and add the derived columns.
+
+    When a cache is given a valid entry is returned instead of parsing, and
+    freshly parsed frames are written back to it; a failed write is noted in
+    ``attrs['cache_error']`` for the caller to log. XML results are detected
+    by their content and read incrementally whatever the parser. With a
+    ``deadline`` the file is parsed in large chunks; once it passes the
+    chunks read so far are returned with ``attrs['truncated']`` set (and not
+    cached), and ``DeadlineExceeded`` is raised if it passed before the
+    first. Kept at module level so it can be shipped to worker processes.
+    """
+    if cache is not None:
+        df = cache.load(file_path, metrics)
+        if df is not None:
+            return df
+
+    truncated = False
+    if deadline is None or deadline.unlimited:
+        raw = read_raw_jtl(file_path, metrics, parser)
+    else:
+        deadline.check(f"while reading {Path(file_path).name}")
+        chunks = []
+        for chunk in iter_raw_jtl(file_path, DEADLINE_BATCH_ROWS, metrics, parser):
+            chunks.append(chunk)
+            if deadline.expired:
+                truncated = True
+                break
+        # Files without rows may yield no chunk at all
+        raw = concat_frames(chunks) if chunks else read_raw_jtl(file_path, metrics, parser)
+    df = prepare_jtl_frame(raw, Path(file_path).name)
+
+    if truncated:
+        df.attrs['truncated'] = True
+    elif cache is not None:
+        try:
+            cache.store(file_path, df, metrics)
+        except Exception as e:
+            # Caching is best effort; a read-only or full disk must not fail the load
+            df.attrs['cache_error'] = f"Could not cache {Path(file_path).name}: {str(e)}"
+    return df
+
+
+def iter_jtl_chunks(file_path: str, batch_size: int, metrics: Optional[List[str]] = None,
+                    parser: str = DEFAULT_PARSER) -> Iterator[pd.DataFrame]:
+    """Yield prepared chunks of roughly ``batch_size`` rows from a JTL file"""
+    file_name = Path(file_path).name
+    for chunk in iter_raw_jtl(file_path, batch_size, metrics, parser):
+        yield prepare_jtl_frame(chunk, file_name)
+
+
+def aggregate_jtl_file(file_path: str, batch_size: int, metrics: Optional[List[str]] = None,
+                       parser: str = DEFAULT_PARSER, relative_accuracy: float = 0.01,
+                       deadline: Optional[Deadline] = None,
+                       group_metrics: Optional[List[Metric]] = None) -> StreamingAggregator:
+    """Fold a JTL file into running aggregates one chunk at a time
+
+    ``group_metrics`` are computed in the same pass over every chunk. Once
+    ``deadline`` passes the aggregates of the chunks folded so far are
+    returned.
+    """
+    aggregator = StreamingAggregator(relative_accuracy=relative_accuracy, metrics=group_metrics)
+    if deadline is not None and deadline.expired:
+        return aggregator
+    for chunk in iter_jtl_chunks(file_path, batch_size, metrics, parser):
+        aggregator.update(chunk)
+        if deadline is not None and deadline.expired:
+            break
+    return aggregator
+
+
 class JTLDataLoader:
-    def __init__(self, input_dir, logger):
+    def __init__(self, input_dir, logger, max_workers: int = 1, metrics: Optional[List[str]] = None,
+                 parser: str = DEFAULT_PARSER, cache: Optional[JTLCache] = None,
+                 profiler: Optional[StageProfiler] = None, group_metrics: Optional[List[Metric]] = None):
         self.input_dir = Path(input_dir)
         self.logger = logger
-        
-    def load_jtl_files(self, enabled_files, exclude_files=None):
-        """Load JTL files"""
+        self.max_workers = max(1, int(max_workers or 1))
+        # Configured metrics drive the column projection; None reads every column
+        self.metrics = list(metrics) if metrics else None
+        # Registered metrics folded into streamed aggregates, see ``build_metrics``
+        self.group_metrics = group_metrics
+        self.parser = resolve_parser(parser, logger)
+        self.cache = cache
+        # Receives one record per loaded or aggregated file
+        self.profiler = profiler
+        # Files of the last load cut short by its deadline
+        self.truncated_files: List[str] = []
+
+    def find_jtl_files(self, enabled_files, exclude_files=None, compressed: bool = True) -> List[str]:
+        """Resolve enabled file patterns to a sorted, de-duplicated list of paths
+
+        Every pattern also matches its ``.gz`` and ``.zst`` archives, which
+        are excluded by the name of the file they contain, too. An archive
+        next to its plain file is skipped so its rows are not read twice.
+        With ``compressed`` off only plain files are returned.
+        """
         exclude_files = exclude_files or []
-        dfs = []
-        
+        matches = []
         for pattern in enabled_files:
-            for file_path in glob.glob(str(self.input_dir / pattern)):
+            patterns = [pattern] + [pattern + suffix for suffix in COMPRESSIONS]
+            matches.append(sorted(set().union(*(glob.glob(str(self.input_dir / p)) for p in patterns))))
+        plain = {file_path for found in matches for file_path in found if not compression_of(file_path)}
+        files = []
+        for file_path in (file_path for found in matches for file_path in found):
+            name = Path(file_path).name
+            compression = compression_of(file_path)
+            if compression and (not compressed or Path(name).stem in exclude_files):
+                continue
+            if name in exclude_files or file_path in files:
+                continue
+            if compression and str(Path(file_path).with_suffix('')) in plain:
+                self.logger.warning(f"Skipping {file_path}: {Path(name).stem} is read instead")
+                continue
+            files.append(file_path)
+        return files
+
+    def load_jtl_files(self, enabled_files, exclude_files=None, parallel: Optional[bool] = None,
+                       ordered: bool = True, deadline: Optional[Deadline] = None):
+        """Load JTL files
+
+        Files are parsed in a process pool when ``parallel`` is set (by default
+        whenever ``max_workers`` > 1 and more than one file matches). With
+        ``ordered`` the combined frame follows the sorted file order; otherwise
+        frames are combined in completion order. Files being read when
+        ``deadline`` passes contribute the rows read so far and are listed in
+        ``truncated_files``; files not started yet are left out.
+        """
+        files = self.find_jtl_files(enabled_files, exclude_files)
+        if parallel is None:
+            parallel = self.max_workers > 1 and len(files) > 1
+
+        if parallel:
+            dfs = self._load_parallel(files, ordered, deadline)
+        else:
+            dfs = self._load_sequential(files, deadline)
+        self.truncated_files = [str(df['file'].iloc[0]) for df in dfs
+                                if df.attrs.get('truncated') and not df.empty]
+        for file_name in self.truncated_files:
+            self.logger.warning(f"The {deadline.name} timeout was reached while reading {file_name}; "
+                                f"keeping the rows read so far")
+        for df in dfs:
+            if 'cache_error' in df.attrs:
+                self.logger.warning(df.attrs.pop('cache_error'))
+        self._evict_cache()
+
+        return concat_frames(dfs) if dfs else pd.DataFrame()
+
+    def _load_sequential(self, files: List[str], deadline: Optional[Deadline] = None) -> List[pd.DataFrame]:
+        """Load files one after another on the current thread"""
+        dfs = []
+        for index, file_path in enumerate(files, start=1):
+            file_name = Path(file_path).name
+            try:
+                df, measurements = measure_call(read_jtl_file, file_path, self.metrics, self.parser,
+                                                self.cache, deadline)
+                dfs.append(df)
+                self.logger.info(f"Loaded {file_name} ({index}/{len(files)})")
+                self._record_file(read_jtl_file, file_name, measurements)
+            except DeadlineExceeded as e:
+                self.logger.warning(f"{e}; skipping {len(files) - index + 1} of {len(files)} files")
+                break
+            except Exception as e:
+                self.logger.error(f"Error loading {file_name}: {str(e)}")
+        return dfs
+
+    def _load_parallel(self, files: List[str], ordered: bool,
+                       deadline: Optional[Deadline] = None) -> List[pd.DataFrame]:
+        """Load files concurrently in a process pool"""
+        return self._run_parallel(read_jtl_file, files, ordered, "Loading JTL files", deadline,
+                                  self.metrics, self.parser, self.cache, deadline)
+
+    def _record_file(self, func, file_name: str, measurements: dict):
+        """Hand a per-file measurement to the profiler, if any"""
+        if self.profiler is not None:
+            self.profiler.record(func.__name__, file=file_name, **measurements)
+
+    def _evict_cache(self):
+        """Keep the parsed-file cache within its size bound"""
+        if self.cache is None:
+            return
+        evicted = self.cache.evict()
+        if evicted:
+            self.logger.info(f"Evicted {len(evicted)} entries from JTL cache {self.cache.cache_dir}")
+
+    def _run_parallel(self, func, files: List[str], ordered: bool, desc: str,
+                      deadline: Optional[Deadline], *args) -> list:
+        """Run ``func(file, *args)`` for each file in a process pool
+
+        Each call is measured inside its worker and recorded with the profiler.
+        Workers are expected to honour ``deadline`` themselves; those still
+        running ``WORKER_GRACE_SECONDS`` after it are terminated.
+        """
+        workers = min(self.max_workers, len(files))
+        self.logger.info(f"{desc}: {len(files)} files with {workers} workers")
+        results = {}
+        completed = []
+        timeout = pool_timeout(deadline)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(measure_call, func, f, *args): f for f in files}
+            with tqdm(total=len(files), desc=desc) as progress:
+                try:
+                    for future in as_completed(futures, timeout=timeout):
+                        file_path = futures[future]
+                        file_name = Path(file_path).name
+                        progress.update(1)
+                        try:
+                            result, measurements = future.result()
+                        except DeadlineExceeded as e:
+                            self.logger.warning(f"{e}; skipping {file_name}")
+                            continue
+                        except Exception as e:
+                            self.logger.error(f"Error loading {file_name}: {str(e)}")
+                            continue
+                        results[file_path] = result
+                        completed.append(file_path)
+                        self.logger.info(f"Loaded {file_name} ({progress.n}/{len(files)})")
+                        self._record_file(func, file_name, measurements)
+                except FuturesTimeout:
+                    unfinished = [Path(f).name for f in files if f not in results]
+                    self.logger.warning(f"The {deadline.name} deadline passed; stopping the workers still "
+                                        f"reading {', '.join(unfinished)}")
+                    terminate_pool(executor)
+
+        order = [f for f in files if f in results] if ordered else completed
+        return [results[f] for f in order]
+
+    def aggregate_jtl_files(self, enabled_files, exclude_files=None, batch_size: int = 100000,
+                            parallel: Optional[bool] = None,
+                            relative_accuracy: float = 0.01,
+                            deadline: Optional[Deadline] = None) -> StreamingAggregator:
+        """Stream JTL files in ``batch_size`` chunks into running aggregates
+
+        Unlike ``load_jtl_files`` no file is ever fully materialized, so peak
+        memory is bounded by the chunk size and the number of groups. Once
+        ``deadline`` passes every file contributes the chunks folded so far.
+        """
+        files = self.find_jtl_files(enabled_files, exclude_files)
+        if parallel is None:
+            parallel = self.max_workers > 1 and len(files) > 1
+
+        aggregator = StreamingAggregator(relative_accuracy=relative_accuracy, metrics=self.group_metrics)
+        if parallel:
+            partials = self._run_parallel(aggregate_jtl_file, files, True,
+                                          "Aggregating JTL files", deadline, batch_size,
+                                          self.metrics, self.parser, relative_accuracy, deadline,
+                                          self.group_metrics)
+            for partial in partials:
+                aggregator.merge(partial)
+        else:
+            for index, file_path in enumerate(files, start=1):
                 file_name = Path(file_path).name
-                if file_name in exclude_files:
-                    continue
-                    
                 try:
-                    df = pd.read_csv(file_path)
-                    
-                    # Convert timestamp to datetime
-                    df['timeStamp'] = pd.to_datetime(df['timeStamp'])
-                    
-                    # Convert success to boolean
-                    df['success'] = df['responseCode'].astype(str).str.startswith('2')
-                    
-                    # Add time components
-                    df['second'] = df['timeStamp'].dt.second
-                    df['minute'] = df['timeStamp'].dt.minute
-                    df['hour'] = df['timeStamp'].dt.hour
-                    
-                    dfs.append(df)
-                    self.logger.info(f"Loaded {file_name}")
+                    partial, measurements = measure_call(
+                        aggregate_jtl_file, file_path, batch_size, self.metrics, self.parser, relative_accuracy,
+                        deadline, self.group_metrics
+                    )
+                    aggregator.merge(partial)
+                    self.logger.info(f"Aggregated {file_name} ({index}/{len(files)})")
+                    self._record_file(aggregate_jtl_file, file_name, measurements)
                 except Exception as e:
                     self.logger.error(f"Error loading {file_name}: {str(e)}")
-                    
-        return pd.concat(dfs) if dfs else pd.DataFrame()
+
+        if deadline is not None and deadline.expired:
+            self.logger.warning(f"The {deadline.name} deadline passed; aggregates cover only the rows read so far")
+        self.logger.info(f"Aggregated {aggregator.rows} records in chunks of {batch_size}")
+        return aggregator
 
     def load_jtl_files_old(self, enabled_files: List[str], exclude_files: List[str] = None) -> pd.DataFrame:
         """Load JTL files based on config"""
@@ -0,0 +1,86 @@
+"""
+Analysis deadlines and cooperative cancellation
+
+``analysis.timeout`` bounds a whole run and ``analysis.stage_timeouts``
+single stages. Long-running work (file chunks, loader and plot workers)
+checks its ``Deadline`` between units and stops early, so a run that
+runs out of time still reports whatever it finished.
+"""
+import time
+from typing import Optional
+
+# Seconds workers get past a deadline to hand back what they finished
+WORKER_GRACE_SECONDS = 5
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised by ``Deadline.check`` once the deadline has passed"""
+
+
+class Deadline:
+    """A point in time after which work should stop, or no limit at all
+
+    Wall-clock rather than monotonic time is used, so a deadline keeps its
+    meaning when it is shipped to a worker process.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, name: str = 'analysis',
+                 expires_at: Optional[float] = None):
+        self.name = name
+        self.seconds = seconds
+        if expires_at is None and seconds:
+            expires_at = time.time() + seconds
+        self.expires_at = expires_at
+
+    @property
+    def unlimited(self) -> bool:
+        return self.expires_at is None
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a limit"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    def check(self, activity: str = ''):
+        """Raise ``DeadlineExceeded`` if the deadline has passed, ``activity`` saying where"""
+        if self.expired:
+            limit = f"{self.seconds:g}s " if self.seconds else ""
+            raise DeadlineExceeded(f"The {limit}{self.name} timeout was reached {activity}".rstrip())
+
+    def stage(self, name: str, seconds: Optional[float] = None) -> 'Deadline':
+        """Deadline of a stage with its own budget of ``seconds``, never later than this one"""
+        if not seconds:
+            return self
+        stage = Deadline(seconds, f"{name} stage")
+        if self.expires_at is not None and self.expires_at <= stage.expires_at:
+            return self
+        return stage
+
+
+def pool_timeout(deadline: Optional[Deadline]) -> Optional[float]:
+    """Seconds to wait for pool workers: until ``WORKER_GRACE_SECONDS`` past the deadline"""
+    if deadline is None or deadline.unlimited:
+        return None
+    return deadline.remaining() + WORKER_GRACE_SECONDS
+
+
+def terminate_pool(executor):
+    """Cancel the queued work of a process pool and kill its running workers
+
+    Used once workers ignored a deadline for too long; a worker stuck in a
+    single parse or render can't check it.
+    """
+    # ProcessPoolExecutor has no public way to kill its workers: this relies on
+    # CPython's private _processes attribute (pid -> Process), read before
+    # shutdown() clears it, and kills nothing without it
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
@@ -0,0 +1,253 @@
+"""
+Error signatures: failed samples grouped by response code and normalized failure message
+"""
+import hashlib
+import pandas as pd
+import numpy as np
+from typing import Dict, Tuple
+
+from jutix.core.folding import Folded
+from jutix.core.parsers import pyarrow_available
+from jutix.core.schema import timestamp_millis
+
+# Messages are cut to this many characters after normalization
+MAX_MESSAGE_LENGTH = 200
+
+# Raw messages whose normalized text is kept across chunks, per column; the
+# cache is emptied when full so messages with unique ids can't grow it without bound
+MAX_CACHED_MESSAGES = 100_000
+
+# Variable parts of failure messages, replaced in this order so that e.g.
+# request ids and durations don't make every failure a distinct signature.
+# Kept RE2-compatible (no lookarounds) so pyarrow can apply them vectorized.
+NORMALIZE_PATTERNS = [
+    (r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}', '<uuid>'),
+    (r'\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b', '<ip>'),
+    (r'\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{16,}\b', '<hex>'),
+    (r'\d+(?:\.\d+)?', '<n>'),
+    (r'\s+', ' '),
+]
+
+SIGNATURE_COLUMNS = ['code', 'message']
+
+
+def normalize_messages(messages: pd.Index) -> pd.Index:
+    """Collapse the variable parts of failure messages and cut them to ``MAX_MESSAGE_LENGTH``
+
+    With pyarrow the patterns run as vectorized RE2 over Arrow strings,
+    several times faster than Python's ``re`` on many distinct messages.
+    """
+    dtype = 'string[pyarrow]' if pyarrow_available() else 'object'
+    text = pd.Series(messages, dtype='object').fillna('').astype(str).astype(dtype)
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        text = text.str.replace(pattern, replacement, regex=True)
+    return pd.Index(text.str.strip().str[:MAX_MESSAGE_LENGTH].astype('object'))
+
+
+def normalize_message(message) -> str:
+    """Normalized form of a single failure message"""
+    return normalize_messages(pd.Index([message]))[0]
+
+
+def signature_id(code: str, message: str) -> int:
+    """Stable 64-bit id of a (response code, normalized message) signature"""
+    digest = hashlib.blake2b(f"{code}\x00{message}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def _column_codes(df: pd.DataFrame, column: str) -> Tuple[np.ndarray, pd.Index]:
+    """Category codes and categories of a column"""
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, uniques = pd.factorize(values)
+    return codes, pd.Index(uniques)
+
+
+def _normalized_codes(df: pd.DataFrame, column: str, rows: np.ndarray,
+                      cache: Dict[str, str]) -> Tuple[np.ndarray, pd.Index]:
+    """Codes of the selected rows into the normalized texts of ``column``
+
+    Only the categories used by the selected rows are looked up, and only
+    those missing from ``cache`` (raw message to normalized text, kept
+    across chunks) are normalized. Rows where the column is absent or
+    missing get an empty text.
+    """
+    if column not in df.columns:
+        return np.zeros(int(rows.sum()), dtype=np.int64), pd.Index([''])
+    codes, categories = _column_codes(df, column)
+    codes = codes[rows]
+    used = np.unique(codes)
+    used = used[used >= 0]
+    raw = pd.Index(categories).take(used).tolist()
+    # The trailing slot, reached by code -1, holds the empty text of missing values
+    normalized = np.array([cache.get(message) for message in raw] + [''], dtype=object)
+    new = [i for i, text in enumerate(normalized[:-1]) if text is None]
+    if new:
+        if len(cache) + len(new) > MAX_CACHED_MESSAGES:
+            cache.clear()
+        messages = [raw[i] for i in new]
+        normalized[new] = normalize_messages(pd.Index(messages, dtype='object')).to_numpy()
+        cache.update(zip(messages, normalized[new].tolist()))
+    norm_codes, texts = pd.factorize(pd.Index(normalized, dtype=object))
+    lookup = np.full(len(categories) + 1, norm_codes[-1], dtype=np.int64)
+    lookup[used] = norm_codes[:-1]
+    return lookup[codes], texts
+
+
+class ErrorAggregator:
+    """Counts failed samples per error signature, per label and per time bucket.
+
+    A signature is the response code plus the normalized failure message
+    (the response message when there is none), identified by a 64-bit hash.
+    Messages are normalized once per distinct raw value, never per row,
+    and remembered across chunks; only one example text is kept per
+    signature, so memory depends on the number of distinct signatures,
+    not on the number of errors. Aggregators of different chunks or
+    workers combine with ``merge``.
+    """
+
+    def __init__(self, bucket_seconds: int = 60):
+        self.bucket_seconds = bucket_seconds
+        self.signatures: Dict[int, Tuple[str, str]] = {}
+        # Normalized texts by raw message, per column, and ids by (code, normalized message)
+        self._normalized: Dict[str, Dict[str, str]] = {'failureMessage': {}, 'responseMessage': {}}
+        self._signature_ids: Dict[Tuple[str, str], int] = {}
+        self._by_label = Folded(pd.Series(
+            dtype='int64', name='count',
+            index=pd.MultiIndex.from_arrays([[], [], []], names=['file', 'label', 'signature'])
+        ), ['file', 'label', 'signature'])
+        self._by_time = Folded(pd.Series(
+            dtype='int64', name='count',
+            index=pd.MultiIndex.from_arrays([[], []], names=['bucket', 'signature'])
+        ), ['bucket', 'signature'])
+        self.errors = 0
+
+    @property
+    def by_label(self) -> pd.Series:
+        """Errors per file, label and signature"""
+        return self._by_label.value
+
+    @by_label.setter
+    def by_label(self, counts: pd.Series):
+        self._by_label.value = counts
+
+    @property
+    def by_time(self) -> pd.Series:
+        """Errors per time bucket and signature"""
+        return self._by_time.value
+
+    @by_time.setter
+    def by_time(self, counts: pd.Series):
+        self._by_time.value = counts
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, bucket_seconds: int = 60) -> 'ErrorAggregator':
+        aggregator = cls(bucket_seconds)
+        aggregator.update(df)
+        return aggregator
+
+    def update(self, df: pd.DataFrame):
+        """Fold the failed samples of a chunk of loaded JTL rows"""
+        failed = ~df['success'].to_numpy(dtype=bool)
+        if not failed.any():
+            return
+
+        failure_codes, failures = _normalized_codes(df, 'failureMessage', failed, self._normalized['failureMessage'])
+        message_codes, messages = _normalized_codes(df, 'responseMessage', failed, self._normalized['responseMessage'])
+        # The failure message, or the response message when there is none
+        texts = failures.append(messages)
+        text_codes, texts = pd.factorize(texts)
+        message = np.where(
+            failures.to_numpy()[failure_codes] != '',
+            text_codes[failure_codes],
+            text_codes[len(failures) + message_codes]
+        )
+        code, response_codes = _column_codes(df, 'responseCode')
+
+        frame = pd.DataFrame({
+            'file': df['file'].array[failed],
+            'label': df['label'].array[failed],
+            'bucket': timestamp_millis(df['timeStamp'])[failed] // (self.bucket_seconds * 1000),
+            'code': code[failed],
+            'message': message,
+        })
+        counts = frame.groupby(['file', 'label', 'bucket', 'code', 'message'], observed=True, sort=False).size()
+
+        # Hash each distinct (code, normalized message) pair once
+        keys = counts.index.to_frame(index=False)
+        pairs = keys[['code', 'message']].drop_duplicates()
+        pairs['signature'] = [
+            self._signature(str(response_codes[c]) if c >= 0 else '', texts[m])
+            for c, m in pairs.itertuples(index=False)
+        ]
+        keys = keys.merge(pairs, how='left', on=['code', 'message'])
+        keys['count'] = counts.to_numpy()
+        self._fold(
+            keys.groupby(['file', 'label', 'signature'], observed=True, sort=False)['count'].sum(),
+            keys.groupby(['bucket', 'signature'], sort=False)['count'].sum()
+        )
+        self.errors += int(failed.sum())
+
+    def _signature(self, code: str, message: str) -> int:
+        key = self._signature_ids.get((code, message))
+        if key is None:
+            key = self._signature_ids[(code, message)] = signature_id(code, message)
+        self.signatures.setdefault(key, (code, message))
+        return key
+
+    def merge(self, other: 'ErrorAggregator') -> 'ErrorAggregator':
+        """Merge another aggregator with the same bucket size into this one and return self"""
+        if other.bucket_seconds != self.bucket_seconds:
+            raise ValueError("Cannot merge error aggregators with different bucket sizes")
+        for key, signature in other.signatures.items():
+            self.signatures.setdefault(key, signature)
+        self._fold(other.by_label, other.by_time)
+        self.errors += other.errors
+        return self
+
+    def _fold(self, by_label: pd.Series, by_time: pd.Series):
+        self._by_label.add(by_label)
+        self._by_time.add(by_time)
+
+    def describe(self, table: pd.DataFrame) -> pd.DataFrame:
+        """Add the response code and example message of each signature"""
+        described = pd.DataFrame(
+            [self.signatures[key] for key in table['signature']],
+            columns=SIGNATURE_COLUMNS, index=table.index
+        )
+        return pd.concat([table.drop(columns='signature'), described], axis=1)
+
+    def top_signatures(self, n: int = 10) -> pd.DataFrame:
+        """The ``n`` most frequent signatures with their share of errors and labels affected"""
+        if self.by_label.empty:
+            return pd.DataFrame(columns=SIGNATURE_COLUMNS + ['count', 'share', 'labels'])
+        grouped = self.by_label.groupby(level='signature')
+        table = pd.DataFrame({
+            'count': grouped.sum(),
+            'labels': self.by_label.index.to_frame(index=False).groupby('signature')['label'].nunique(),
+        }).nlargest(n, 'count').reset_index()
+        table['share'] = 100 * table['count'] / self.errors
+        return self.describe(table)[SIGNATURE_COLUMNS + ['count', 'share', 'labels']]
+
+    def top_by_label(self, n: int = 10) -> pd.DataFrame:
+        """The ``n`` most frequent signatures of every label"""
+        counts = self.by_label.groupby(level=['label', 'signature'], observed=True).sum()
+        return self._top_per_group(counts, 'label', n)
+
+    def top_by_time(self, n: int = 10) -> pd.DataFrame:
+        """The ``n`` most frequent signatures of every time bucket, with the bucket's start time"""
+        table = self._top_per_group(self.by_time, 'bucket', n)
+        table.insert(0, 'time', pd.to_datetime(table['bucket'] * self.bucket_seconds, unit='s'))
+        return table.drop(columns='bucket')
+
+    def _top_per_group(self, counts: pd.Series, group: str, n: int) -> pd.DataFrame:
+        if counts.empty:
+            return pd.DataFrame(columns=[group] + SIGNATURE_COLUMNS + ['count'])
+        table = counts.reset_index().sort_values([group, 'count', 'signature'], ascending=[True, False, True])
+        table = table.groupby(group, observed=True, sort=False).head(n).reset_index(drop=True)
+        return self.describe(table)[[group] + SIGNATURE_COLUMNS + ['count']]
+
+    @property
+    def empty(self) -> bool:
+        return self.errors == 0
@@ -0,0 +1,290 @@
+"""
+Vectorized JTL parser over memory-mapped files
+
+JMeter's default CSV layout is unquoted, its numeric columns are plain
+integers and its string columns repeat from small vocabularies. For such
+files field boundaries are found with one NumPy scan of the mapped bytes,
+numbers are parsed for all rows at once from a fixed-width view of their
+digits and strings are dictionary-encoded by hashing their bytes, so no
+Python object is created per row. Files this parser cannot read exactly
+raise ``FastPathUnsupported`` and callers fall back to pandas.
+"""
+import mmap
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from jutix.core.schema import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, columns_for_metrics, concat_frames
+
+# Columns of the standard JMeter CSV layout, by how they are parsed
+INTEGER_COLUMNS = {'timeStamp': 'int64', 'SampleCount': 'int64', 'ErrorCount': 'int64', **NUMERIC_COLUMNS}
+BOOLEAN_COLUMNS = {'success'}
+STRING_COLUMNS = set(CATEGORICAL_COLUMNS) | {'URL', 'Hostname', 'Filename', 'Encoding'}
+
+# pandas' default missing-value strings plus the schema's 'NA'
+NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+# Bytes mapped per block when reading a whole file
+BLOCK_BYTES = 16 << 20
+
+# Strings are hashed from their first this many bytes, eight at a time;
+# longer values (rare in JTL files) are then hashed one by one
+MAX_HASH_WIDTH = 256
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+HASH_SHIFT = np.uint64(29)
+
+# Zero bytes around each block's copy
+PAD_BYTES = MAX_HASH_WIDTH + 16
+
+# Word constants for parsing eight ASCII digits at once
+BYTE_MASKS = np.array([(1 << (8 * n)) - 1 for n in range(9)], dtype=np.uint64)
+ZEROS = np.uint64(0x3030303030303030)
+HIGH_NIBBLES = np.uint64(0xF0F0F0F0F0F0F0F0)
+HIGH_BITS = np.uint64(0x8080808080808080)
+DIGIT_CARRY = np.uint64(0x7676767676767676)
+PAIRS = np.uint64(0x00FF00FF00FF00FF)
+QUADS = np.uint64(0x0000FFFF0000FFFF)
+OCTETS = np.uint64(0x00000000FFFFFFFF)
+
+NEWLINE, CARRIAGE_RETURN, COMMA = 10, 13, 44
+
+
+class FastPathUnsupported(ValueError):
+    """The file needs the general CSV parser"""
+
+
+class _Block:
+    """The complete lines of one slice of the file, split into fields
+
+    The slice is copied with ``PAD_BYTES`` zero bytes at both ends, enough
+    for every word read of a field to stay in bounds, so no array views
+    the mapping once the block exists.
+    """
+
+    def __init__(self, mapped: mmap.mmap, start: int, end: int, columns: int):
+        padded = np.zeros(end - start + 2 * PAD_BYTES, dtype=np.uint8)
+        padded[PAD_BYTES:-PAD_BYTES] = np.frombuffer(mapped, dtype=np.uint8, count=end - start, offset=start)
+        raw = padded[PAD_BYTES:-PAD_BYTES]
+        newlines = raw == NEWLINE
+        delimiters = np.flatnonzero(newlines | (raw == COMMA))
+        lines = int(np.count_nonzero(newlines))
+        if len(raw) and raw[-1] != NEWLINE:
+            delimiters = np.append(delimiters, len(raw))
+            lines += 1
+        if len(delimiters) != lines * columns:
+            raise FastPathUnsupported("Lines with a different number of fields than the header")
+        # One contiguous row of delimiter offsets per field
+        grid = np.ascontiguousarray(delimiters.reshape(lines, columns).T)
+        # With the right counts, every line is regular if each ends at a newline
+        line_ends = grid[-1]
+        if lines and not (raw[line_ends[line_ends < len(raw)]] == NEWLINE).all():
+            raise FastPathUnsupported("Lines with a different number of fields than the header")
+
+        self.raw = raw
+        self.rows = lines
+        self.grid = grid
+        self.line_starts = np.r_[0, line_ends[:-1] + 1] if lines else line_ends
+        # A carriage return before the newline is never part of the last field
+        self.line_ends = line_ends - (raw[np.maximum(line_ends - 1, 0)] == CARRIAGE_RETURN)
+        # Overlapping, unaligned view: word i holds bytes i..i+7 of the copy
+        self.words = np.ndarray((len(padded) - 7,), dtype='<u8', buffer=padded, strides=(1,))
+
+    def field(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end offsets of field ``index`` on every line"""
+        starts = self.line_starts if index == 0 else self.grid[index - 1] + 1
+        ends = self.line_ends if index == len(self.grid) - 1 else self.grid[index]
+        return starts, ends
+
+
+def _keep_masks(valid: np.ndarray) -> np.ndarray:
+    """Masks of the lowest ``valid`` bytes of 8-byte words"""
+    return BYTE_MASKS[np.minimum(np.maximum(valid, 0), 8)]
+
+
+def _parse_integers(block: _Block, starts: np.ndarray, ends: np.ndarray, dtype: str) -> np.ndarray:
+    """Parse unsigned decimal fields eight digits at a time
+
+    Each field is read as words ending at its last digit, bytes before the
+    field are replaced with ``'0'`` and the digits of every word are
+    validated and combined with SWAR multiply-shift steps.
+    """
+    lengths = ends - starts
+    if not block.rows:
+        return np.zeros(0, dtype=dtype)
+    if lengths.min() < 1 or lengths.max() > 18:
+        raise FastPathUnsupported("Empty or oversized numeric field")
+    chunks = (int(lengths.max()) + 7) // 8
+    shortest = int(lengths.min())
+    values = np.zeros(block.rows, dtype=np.uint64)
+    for chunk in range(chunks - 1, -1, -1):
+        # Chunk 0 holds the last eight digits; earlier digits come first in memory
+        digits = block.words[ends + PAD_BYTES - 8 * (chunk + 1)] ^ ZEROS
+        if shortest < 8 * (chunk + 1):
+            # Little-endian: the bytes right before a field are the low ones
+            digits &= ~_keep_masks(8 - (lengths - 8 * chunk))
+        if ((digits & HIGH_NIBBLES) | ((digits + DIGIT_CARRY) & HIGH_BITS)).any():
+            raise FastPathUnsupported("Non-numeric value in a numeric column")
+        digits = ((digits * np.uint64(10)) + (digits >> np.uint64(8))) & PAIRS
+        digits = ((digits * np.uint64(100)) + (digits >> np.uint64(16))) & QUADS
+        digits = ((digits * np.uint64(10000)) + (digits >> np.uint64(32))) & OCTETS
+        values = values * np.uint64(10 ** 8) + digits
+    if values.max() > np.iinfo(dtype).max:
+        raise FastPathUnsupported(f"Value out of range for {dtype}")
+    return values.astype(dtype)
+
+
+def _hash_strings(block: _Block, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """64-bit hash of every field's bytes, mixed in one 8-byte word at a time
+
+    Equal hashes do not guarantee equal bytes; ``_encode_strings`` checks.
+    """
+    lengths = ends - starts
+    chunks = (min(int(lengths.max()) if block.rows else 0, MAX_HASH_WIDTH) + 7) // 8
+    shortest = int(lengths.min()) if block.rows else 0
+    hashes = lengths.astype(np.uint64) * HASH_MULTIPLIER
+    rows = None
+    for chunk in range(chunks):
+        if shortest > 8 * chunk:
+            word = block.words[starts + PAD_BYTES + 8 * chunk]
+            if shortest < 8 * (chunk + 1):
+                # Bytes after the field belong to the next one
+                word &= _keep_masks(lengths - 8 * chunk)
+            hashes = (hashes ^ word) * HASH_MULTIPLIER
+            hashes ^= hashes >> HASH_SHIFT
+            continue
+        # Only the fields still longer than the words mixed so far
+        rows = np.flatnonzero(lengths > 8 * chunk) if rows is None else rows[lengths[rows] > 8 * chunk]
+        word = block.words[starts[rows] + PAD_BYTES + 8 * chunk] & _keep_masks(lengths[rows] - 8 * chunk)
+        mixed = (hashes[rows] ^ word) * HASH_MULTIPLIER
+        hashes[rows] = mixed ^ (mixed >> HASH_SHIFT)
+    for row in np.flatnonzero(lengths > MAX_HASH_WIDTH):
+        value = block.raw[starts[row]:ends[row]].tobytes()
+        hashes[row] ^= np.uint64(hash(value) & 0xFFFFFFFFFFFFFFFF)
+    return hashes
+
+
+def _first_rows(codes: np.ndarray) -> np.ndarray:
+    """Row of the first occurrence of every code, in code order"""
+    # pd.factorize numbers values in order of first appearance
+    return np.flatnonzero(codes > np.r_[-1, np.maximum.accumulate(codes)[:-1]])
+
+
+def _same_bytes(block: _Block, starts: np.ndarray, ends: np.ndarray, others: np.ndarray) -> bool:
+    """Whether every field holds the same bytes as the field on row ``others``"""
+    lengths = ends - starts
+    if (lengths != lengths[others]).any():
+        return False
+    # Compared a word at a time, keeping only the rows with bytes left
+    rows = np.flatnonzero(others != np.arange(len(others)))
+    chunk = 0
+    while len(rows):
+        masks = _keep_masks(lengths[rows] - 8 * chunk)
+        mine = block.words[starts[rows] + PAD_BYTES + 8 * chunk] & masks
+        theirs = block.words[starts[others[rows]] + PAD_BYTES + 8 * chunk] & masks
+        if (mine != theirs).any():
+            return False
+        chunk += 1
+        rows = rows[lengths[rows] > 8 * chunk]
+    return True
+
+
+def _encode_strings(block: _Block, starts: np.ndarray, ends: np.ndarray) -> pd.Categorical:
+    """Dictionary-encode string fields, decoding each distinct value once"""
+    codes, _ = pd.factorize(_hash_strings(block, starts, ends))
+    first = _first_rows(codes)
+    if not _same_bytes(block, starts, ends, first[codes]):
+        # Distinct values share a hash: factorize the bytes themselves
+        codes, _ = pd.factorize(pd.Index([
+            block.raw[start:end].tobytes() for start, end in zip(starts, ends)
+        ], dtype=object))
+        first = _first_rows(codes)
+    categories = np.array([
+        block.raw[starts[i]:ends[i]].tobytes().decode('utf-8') for i in first
+    ], dtype=object)
+
+    # Missing-value strings become missing, the rest are sorted as pandas does
+    missing = np.array([value in NA_STRINGS for value in categories], dtype=bool)
+    order = np.argsort(categories.astype(str), kind='stable')
+    order = order[~missing[order]]
+    remap = np.full(len(categories), -1, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    return pd.Categorical.from_codes(remap[codes], categories[order].astype(str))
+
+
+def _read_header(mapped: mmap.mmap) -> Tuple[List[str], int]:
+    end = mapped.find(b'\n')
+    if end < 0:
+        raise FastPathUnsupported("No data rows")
+    header = mapped[:end].decode('utf-8').rstrip('\r').split(',')
+    known = set(INTEGER_COLUMNS) | BOOLEAN_COLUMNS | STRING_COLUMNS
+    if not set(header) <= known or 'timeStamp' not in header or len(set(header)) != len(header):
+        raise FastPathUnsupported("Header is not the standard JMeter CSV layout")
+    return header, end + 1
+
+
+def _block_frame(block: _Block, header: List[str], wanted: Optional[set], first_row: int) -> pd.DataFrame:
+    data: Dict[str, object] = {}
+    for index, column in enumerate(header):
+        if wanted is not None and column not in wanted:
+            continue
+        starts, ends = block.field(index)
+        if column in INTEGER_COLUMNS:
+            data[column] = _parse_integers(block, starts, ends, INTEGER_COLUMNS[column])
+            continue
+        values = _encode_strings(block, starts, ends)
+        if column in BOOLEAN_COLUMNS:
+            flags = pd.Index(values.categories).str.lower()
+            if values.isna().any() or not set(flags) <= {'true', 'false'}:
+                raise FastPathUnsupported(f"Non-boolean value in {column}")
+            data[column] = np.asarray(flags == 'true')[values.codes]
+        elif column in CATEGORICAL_COLUMNS:
+            data[column] = values
+        else:
+            data[column] = values.categories.array.take(values.codes, allow_fill=True)
+    return pd.DataFrame(data, index=pd.RangeIndex(first_row, first_row + block.rows))
+
+
+def iter_jtl_mmap(file_path: str, block_bytes: int = BLOCK_BYTES,
+                  metrics: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield frames of the complete lines in consecutive ``block_bytes`` slices of a JTL file
+
+    Frames are indexed by row number in the file, like chunks of
+    ``pd.read_csv``. The whole file is checked for quotes and its header validated before
+    the first frame, so ``FastPathUnsupported`` is normally raised before
+    anything was yielded; a malformed line later in the file raises it
+    after the preceding blocks.
+    """
+    wanted = columns_for_metrics(metrics)
+    wanted = set(wanted) if wanted is not None else None
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise FastPathUnsupported("Empty file")
+        with mapped:
+            if mapped.find(b'"') >= 0:
+                raise FastPathUnsupported("Quoted fields")
+            header, offset = _read_header(mapped)
+            rows = 0
+            while offset < len(mapped):
+                end = min(offset + block_bytes, len(mapped))
+                if end < len(mapped):
+                    # Cut after the last complete line, or extend to the next one
+                    cut = mapped.rfind(b'\n', offset, end)
+                    end = cut + 1 if cut >= 0 else (mapped.find(b'\n', end) + 1 or len(mapped))
+                block = _Block(mapped, offset, end, len(header))
+                offset = end
+                if block.rows:
+                    yield _block_frame(block, header, wanted, rows)
+                    rows += block.rows
+
+
+def read_jtl_mmap(file_path: str, metrics: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a whole JTL file with the fast path, block by block"""
+    frames = list(iter_jtl_mmap(file_path, metrics=metrics))
+    if not frames:
+        raise FastPathUnsupported("No data rows")
+    return concat_frames(frames)
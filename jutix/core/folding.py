@@ -0,0 +1,83 @@
+"""
+Deferred folding of per-chunk partial aggregates into a running state
+"""
+import pandas as pd
+from typing import Callable, List, Sequence, Union
+
+# Partials are buffered until they hold at least this many rows, or as
+# many as the running state, whichever is more
+MIN_PENDING_ROWS = 50_000
+
+
+def aggregate(grouped, how: dict) -> pd.DataFrame:
+    """``grouped.agg(how)``, except that sums over no known values stay missing
+
+    A column that was never loaded (such as ``bytes`` without the
+    ``throughput`` metric) is NaN rather than a misleading 0.
+    """
+    result = grouped.agg(how)
+    for column, func in how.items():
+        if func == 'sum' and grouped.obj[column].isna().any():
+            result[column] = result[column].where(grouped[column].count() > 0)
+    return result
+
+
+class Folded:
+    """A running aggregate (frame or series) plus the partials not yet folded into it
+
+    Folding concatenates the state with the partials and groups by the
+    index once, so it costs time proportional to the state. Folding every
+    chunk made streaming quadratic in the number of chunks; partials are
+    instead buffered until they are as large as the state, which keeps the
+    amortized cost per chunk proportional to the chunk. ``value`` folds
+    whatever is pending.
+
+    ``how`` is the aggregation of every column (a name, a dict, or a
+    function returning a dict for the columns of a frame).
+    """
+
+    def __init__(self, state: Union[pd.DataFrame, pd.Series], levels: Sequence[str],
+                 how: Union[str, dict, Callable] = 'sum'):
+        self.levels = list(levels)
+        self.how = how
+        self._state = state
+        self._pending: List = []
+        self._pending_rows = 0
+
+    def add(self, partial: Union[pd.DataFrame, pd.Series]):
+        """Queue a partial aggregate, folding once enough rows are pending"""
+        if partial.empty:
+            return
+        self._pending.append(partial)
+        self._pending_rows += len(partial)
+        if self._pending_rows >= max(len(self._state), MIN_PENDING_ROWS):
+            self.fold()
+
+    def fold(self):
+        """Combine the state with every pending partial"""
+        if not self._pending:
+            return
+        parts = ([self._state] if not self._state.empty else []) + self._pending
+        self._pending, self._pending_rows = [], 0
+        combined = pd.concat(parts) if len(parts) > 1 else parts[0]
+        if len(parts) > 1 or combined.index.has_duplicates:
+            grouped = combined.groupby(level=self.levels, observed=True, sort=False)
+            how = self.how(combined.columns) if callable(self.how) else self.how
+            combined = grouped.agg(how) if isinstance(combined, pd.Series) else aggregate(grouped, how)
+        if isinstance(combined, pd.Series):
+            combined = combined.rename(self._state.name)
+        self._state = combined
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    @property
+    def value(self) -> Union[pd.DataFrame, pd.Series]:
+        self.fold()
+        return self._state
+
+    @value.setter
+    def value(self, state: Union[pd.DataFrame, pd.Series]):
+        self._state = state
+        self._pending, self._pending_rows = [], 0
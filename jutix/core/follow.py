@@ -0,0 +1,163 @@
+"""
+Tail/follow mode: analyze JTL files while the load test is still running
+"""
+import io
+import time
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from jutix.core.aggregates import StreamingAggregator
+from jutix.core.data_loader import prepare_jtl_frame
+from jutix.core.schema import read_csv_kwargs
+from jutix.core.xmlparse import is_xml_jtl
+
+
+class JTLTailReader:
+    """Reads the complete lines appended to a JTL file since the last call.
+
+    The byte offset of the first unread line is remembered, so each read
+    costs time proportional to the new data only. A trailing line without
+    a newline is left for the next read, as JMeter may still be writing it.
+    """
+
+    def __init__(self, file_path: str, metrics: Optional[List[str]] = None, batch_size: int = 100_000):
+        self.file_path = file_path
+        self.file_name = Path(file_path).name
+        self.metrics = metrics
+        self.batch_size = batch_size
+        self.offset = 0
+        self.header = b''
+
+    def reset(self):
+        """Start again from the beginning of the file"""
+        self.offset = 0
+        self.header = b''
+
+    def truncated(self) -> bool:
+        """Whether the file shrank below the remembered offset (rotated or rewritten)"""
+        return Path(self.file_path).stat().st_size < self.offset
+
+    def read_new(self) -> List[pd.DataFrame]:
+        """Return prepared chunks for the newly appended complete lines"""
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b'\n')
+        if end < 0:
+            return []
+        data = data[:end + 1]
+        self.offset += len(data)
+
+        if not self.header:
+            header_end = data.find(b'\n') + 1
+            self.header, data = data[:header_end], data[header_end:]
+        if not data.strip():
+            return []
+        return [prepare_jtl_frame(chunk, self.file_name) for chunk in self._parse(self.header + data)]
+
+    def _parse(self, data: bytes) -> List[pd.DataFrame]:
+        """Parse CSV bytes with the compact schema"""
+        try:
+            with pd.read_csv(io.BytesIO(data), chunksize=self.batch_size,
+                             **read_csv_kwargs(self.metrics)) as reader:
+                return list(reader)
+        except (ValueError, TypeError):
+            with pd.read_csv(io.BytesIO(data), chunksize=self.batch_size,
+                             **read_csv_kwargs(self.metrics, nullable=True)) as reader:
+                return list(reader)
+
+
+class JTLFollower:
+    """Incrementally aggregates JTL files and periodically refreshes the report.
+
+    New rows are folded into a ``StreamingAggregator``; every refresh
+    regenerates the stats table and throughput plot from the aggregates,
+    never from the raw rows. Without a ``plotter`` only the stats are refreshed.
+    """
+
+    def __init__(self, data_loader, report_generator, plotter, logger,
+                 percentiles: Optional[List[float]] = None, relative_accuracy: float = 0.01,
+                 batch_size: int = 100_000):
+        self.data_loader = data_loader
+        self.report_generator = report_generator
+        self.plotter = plotter
+        self.logger = logger
+        self.percentiles = percentiles
+        self.batch_size = batch_size
+        self.relative_accuracy = relative_accuracy
+        self.aggregator = StreamingAggregator(relative_accuracy=relative_accuracy,
+                                              metrics=data_loader.group_metrics)
+        self.readers: Dict[str, JTLTailReader] = {}
+        # XML results can't be parsed line by line
+        self.skipped: Set[str] = set()
+
+    def poll(self, enabled_files, exclude_files=None) -> int:
+        """Read newly appended rows from every matching file and return the row count"""
+        new_rows = 0
+        # Archives are complete; only plain files can still be growing
+        for file_path in self.data_loader.find_jtl_files(enabled_files, exclude_files, compressed=False):
+            if file_path in self.skipped:
+                continue
+            reader = self.readers.get(file_path)
+            if reader is None:
+                if is_xml_jtl(file_path):
+                    self.logger.warning(f"{Path(file_path).name} is an XML JTL and can't be followed, skipping it")
+                    self.skipped.add(file_path)
+                    continue
+                reader = JTLTailReader(file_path, self.data_loader.metrics, self.batch_size)
+                self.readers[file_path] = reader
+                self.logger.info(f"Following {reader.file_name}")
+            elif reader.truncated():
+                # Aggregates cannot be un-merged, so start over for every file
+                self.logger.warning(f"{reader.file_name} was truncated, restarting aggregation")
+                self.restart()
+                return self.poll(enabled_files, exclude_files)
+
+            try:
+                for chunk in reader.read_new():
+                    self.aggregator.update(chunk)
+                    new_rows += len(chunk)
+            except Exception as e:
+                self.logger.error(f"Error reading {reader.file_name}: {str(e)}")
+        return new_rows
+
+    def restart(self):
+        """Drop all aggregates and re-read every file from the start"""
+        self.aggregator = StreamingAggregator(relative_accuracy=self.relative_accuracy,
+                                              metrics=self.data_loader.group_metrics)
+        for reader in self.readers.values():
+            reader.reset()
+
+    def refresh(self) -> Optional[str]:
+        """Regenerate the stats table, throughput plot and report from the aggregates"""
+        if self.aggregator.empty:
+            return None
+        stats_df = self.report_generator.statistics_from_aggregates(self.aggregator, self.percentiles)
+        if self.plotter is None:
+            return self.report_generator.generate_html_report(stats_df, plots=[])
+        self.plotter.plot_throughput_over_time(None, rollup=self.aggregator.rollup)
+        return self.report_generator.generate_html_report(stats_df, plots=['throughput_over_time.png'])
+
+    def run(self, enabled_files, exclude_files=None, interval: float = 10.0,
+            max_refreshes: Optional[int] = None) -> Optional[str]:
+        """Poll and refresh every ``interval`` seconds until interrupted"""
+        report_path = None
+        refreshes = 0
+        try:
+            while max_refreshes is None or refreshes < max_refreshes:
+                started = time.monotonic()
+                new_rows = self.poll(enabled_files, exclude_files)
+                if new_rows:
+                    report_path = self.refresh()
+                    self.logger.info(
+                        f"Processed {new_rows} new rows ({self.aggregator.rows} total) "
+                        f"in {time.monotonic() - started:.2f}s"
+                    )
+                refreshes += 1
+                if max_refreshes is None or refreshes < max_refreshes:
+                    time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.logger.info("Follow mode stopped")
+        return report_path or self.refresh()
@@ -0,0 +1,162 @@
+"""
+Downsampled time series and a self-contained renderer for the interactive report
+"""
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from jutix.core.downsample import lttb
+from jutix.core.rollup import TimeRollup
+
+DEFAULT_MAX_POINTS = 1000
+
+# (key, chart title, unit) of the embedded series, in display order
+SERIES_METRICS = [
+    ('throughput', 'Throughput', 'req/s'),
+    ('mean_rt', 'Mean Response Time', 'ms'),
+    ('max_rt', 'Max Response Time', 'ms'),
+    ('errors', 'Errors', 'errors/s'),
+]
+
+
+def _per_second(table: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Expand one file's 1 second buckets to a dense range and derive the metrics"""
+    buckets = table['bucket'].to_numpy(dtype=np.int64)
+    dense = np.arange(buckets.min(), buckets.max() + 1)
+    table = table.set_index('bucket').reindex(dense)
+    count = table['count'].fillna(0).to_numpy(dtype='float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_rt = table['elapsed_sum'].to_numpy(dtype='float64') / count
+    return {
+        'bucket': dense,
+        'throughput': count,
+        # Seconds without requests have no response time; they are dropped below
+        'mean_rt': mean_rt,
+        'max_rt': table['elapsed_max'].to_numpy(dtype='float64'),
+        'errors': table['errors'].fillna(0).to_numpy(dtype='float64'),
+    }
+
+
+def interactive_series(rollup: TimeRollup, max_points: int = DEFAULT_MAX_POINTS) -> dict:
+    """Per-file series of every metric, each downsampled with LTTB to ``max_points``
+
+    Times are seconds since the first request, values are rounded to two
+    decimals, so a series costs a few bytes per point whatever the test length.
+    """
+    table = rollup.table('1s', by=['file'])
+    if table.empty:
+        return {'start': 0, 'metrics': [], 'series': []}
+    start = int(table['bucket'].min())
+
+    series: List[dict] = []
+    for file_name, file_table in table.groupby('file', observed=True, sort=True):
+        dense = _per_second(file_table)
+        seconds = dense['bucket'] - start
+        for key, _, _ in SERIES_METRICS:
+            values = dense[key]
+            valid = ~np.isnan(values)
+            x, y = seconds[valid], values[valid]
+            keep = lttb(x, y, max_points)
+            series.append({
+                'metric': key,
+                'name': str(file_name),
+                't': x[keep].tolist(),
+                'v': np.round(y[keep], 2).tolist(),
+            })
+    return {
+        'start': start * 1000,
+        'metrics': [{'key': key, 'title': title, 'unit': unit} for key, title, unit in SERIES_METRICS],
+        'series': series,
+    }
+
+
+def series_html(series: dict) -> str:
+    """HTML fragment embedding ``series`` as JSON plus the chart renderer"""
+    # Keep "</script>" inside the data from closing the tag
+    data = json.dumps(series, separators=(',', ':')).replace('</', '<\\/')
+    return (
+        '<div id="jutix-charts"></div>\n'
+        f'<script type="application/json" id="jutix-series">{data}</script>\n'
+        f'<script>{RENDERER_JS}</script>'
+    )
+
+
+# Dependency-free SVG line charts with a hover readout, one chart per metric
+RENDERER_JS = r"""
+(function () {
+  var data = JSON.parse(document.getElementById('jutix-series').textContent);
+  var root = document.getElementById('jutix-charts');
+  var NS = 'http://www.w3.org/2000/svg';
+  var COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f'];
+  var W = 1100, H = 300, L = 60, R = 20, T = 20, B = 40;
+
+  function el(name, attrs, parent) {
+    var node = document.createElementNS(NS, name);
+    for (var key in attrs) node.setAttribute(key, attrs[key]);
+    if (parent) parent.appendChild(node);
+    return node;
+  }
+  function clock(seconds) {
+    var d = new Date(data.start + seconds * 1000);
+    return d.toISOString().substr(11, 8);
+  }
+  function ticks(min, max, count) {
+    var step = Math.pow(10, Math.floor(Math.log10((max - min) / count || 1)));
+    [1, 2, 5, 10].some(function (m) { if ((max - min) / (step * m) <= count) { step *= m; return true; } });
+    var out = [];
+    for (var v = Math.ceil(min / step) * step; v <= max; v += step) out.push(v);
+    return out;
+  }
+
+  data.metrics.forEach(function (metric) {
+    var lines = data.series.filter(function (s) { return s.metric === metric.key && s.t.length; });
+    if (!lines.length) return;
+    var xMax = 1, yMax = 0;
+    lines.forEach(function (s) {
+      xMax = Math.max(xMax, s.t[s.t.length - 1]);
+      s.v.forEach(function (v) { yMax = Math.max(yMax, v); });
+    });
+    yMax = yMax * 1.05 || 1;
+    var sx = function (t) { return L + (W - L - R) * t / xMax; };
+    var sy = function (v) { return H - B - (H - T - B) * v / yMax; };
+
+    var box = document.createElement('div');
+    box.className = 'plot';
+    box.innerHTML = '<h2>' + metric.title + ' (' + metric.unit + ')</h2>';
+    root.appendChild(box);
+    var svg = el('svg', {viewBox: '0 0 ' + W + ' ' + H, width: '100%', style: 'font: 11px sans-serif'}, box);
+
+    ticks(0, yMax, 5).forEach(function (v) {
+      el('line', {x1: L, x2: W - R, y1: sy(v), y2: sy(v), stroke: '#eee'}, svg);
+      el('text', {x: L - 6, y: sy(v) + 4, 'text-anchor': 'end'}, svg).textContent = +v.toFixed(2);
+    });
+    ticks(0, xMax, 8).forEach(function (t) {
+      el('text', {x: sx(t), y: H - B + 16, 'text-anchor': 'middle'}, svg).textContent = clock(t);
+    });
+    lines.forEach(function (s, i) {
+      var d = s.t.map(function (t, j) { return (j ? 'L' : 'M') + sx(t).toFixed(1) + ',' + sy(s.v[j]).toFixed(1); });
+      el('path', {d: d.join(''), fill: 'none', stroke: COLORS[i % COLORS.length], 'stroke-width': 1.2}, svg);
+      el('text', {x: L + 10 + 150 * i, y: T - 6, fill: COLORS[i % COLORS.length]}, svg).textContent = s.name;
+    });
+
+    var cursor = el('line', {y1: T, y2: H - B, stroke: '#999', visibility: 'hidden'}, svg);
+    var readout = el('text', {x: W - R, y: T - 6, 'text-anchor': 'end'}, svg);
+    svg.addEventListener('mousemove', function (event) {
+      var rect = svg.getBoundingClientRect();
+      var t = ((event.clientX - rect.left) * W / rect.width - L) / (W - L - R) * xMax;
+      if (t < 0 || t > xMax) return;
+      var parts = lines.map(function (s) {
+        var lo = 0, hi = s.t.length - 1;
+        while (lo < hi) { var mid = (lo + hi) >> 1; if (s.t[mid] < t) lo = mid + 1; else hi = mid; }
+        return s.name + ': ' + s.v[lo];
+      });
+      cursor.setAttribute('x1', sx(t));
+      cursor.setAttribute('x2', sx(t));
+      cursor.setAttribute('visibility', 'visible');
+      readout.textContent = clock(t) + '  ' + parts.join('  ');
+    });
+    svg.addEventListener('mouseleave', function () { cursor.setAttribute('visibility', 'hidden'); });
+  });
+})();
+"""
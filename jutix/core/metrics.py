@@ -0,0 +1,213 @@
+"""
+Registry of per-(file, label) metrics computed in one pass over each chunk
+
+A ``Metric`` declares the JTL columns it needs, reduces a chunk to a few
+partial columns per group and says how those partials merge (``sum``,
+``min`` or ``max``), so the partials of chunks, files and injectors
+combine exactly. ``reduce_groups`` computes the group codes of a chunk
+once and hands them to every enabled metric, so adding a metric costs a
+few ``bincount`` calls rather than another scan of the rows.
+
+Metrics are enabled by name in the ``metrics`` setting, with keyword
+options from ``metric_options.<name>``. ``finalize`` derives the report
+columns from merged partials alone, so stored and merged aggregates are
+reported without knowing the options they were computed with. Custom
+metrics are added with ``register_metric``.
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Type
+
+from jutix.core.schema import METRIC_COLUMNS
+
+# Always computed, whatever the ``metrics`` setting: the statistics table is built on them
+CORE_METRICS = ['responseTime', 'errorCount']
+
+
+def _values(chunk: pd.DataFrame, column: str) -> np.ndarray:
+    """A column as float64, missing values as NaN"""
+    return chunk[column].to_numpy(dtype='float64', na_value=np.nan)
+
+
+class Metric:
+    """A statistic reduced per group from each chunk and merged across chunks
+
+    Subclasses set ``name``, the JTL ``columns`` read for it and the merge
+    function of every partial column in ``aggregations``. Options are
+    keyword arguments of ``__init__`` and must have defaults.
+    """
+    name = ''
+    columns: List[str] = []
+    aggregations: Dict[str, str] = {}
+
+    def reduce(self, chunk: pd.DataFrame, codes: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+        """Partial columns of a chunk, indexed by the group codes ``0..size-1``"""
+        raise NotImplementedError
+
+    def finalize(self, groups: pd.DataFrame) -> pd.DataFrame:
+        """Report columns derived from merged partials; none by default"""
+        return pd.DataFrame(index=groups.index)
+
+
+METRICS: Dict[str, Type[Metric]] = {}
+
+
+def register_metric(metric: Type[Metric]) -> Type[Metric]:
+    """Add a metric class to the registry; also usable as a class decorator"""
+    METRICS[metric.name] = metric
+    METRIC_COLUMNS[metric.name] = list(metric.columns)
+    return metric
+
+
+@register_metric
+class ResponseTime(Metric):
+    """Count, sum, sum of squares and extremes of ``elapsed``"""
+    name = 'responseTime'
+    columns = ['elapsed']
+    aggregations = {'count': 'sum', 'sum': 'sum', 'sum_sq': 'sum', 'min': 'min', 'max': 'max'}
+
+    def reduce(self, chunk, codes, size):
+        elapsed = _values(chunk, 'elapsed')
+        present = ~np.isnan(elapsed)
+        values = np.where(present, elapsed, 0.0)
+        minimum = np.full(size, np.inf)
+        maximum = np.full(size, -np.inf)
+        np.fmin.at(minimum, codes, elapsed)
+        np.fmax.at(maximum, codes, elapsed)
+        count = np.bincount(codes, present, minlength=size)
+        return {
+            'count': count.astype('int64'),
+            'sum': np.bincount(codes, values, minlength=size),
+            'sum_sq': np.bincount(codes, values * values, minlength=size),
+            'min': np.where(count > 0, minimum, np.nan),
+            'max': np.where(count > 0, maximum, np.nan),
+        }
+
+
+@register_metric
+class ErrorCount(Metric):
+    """Successful samples; the message columns are read for the error analysis"""
+    name = 'errorCount'
+    columns = ['success', 'responseMessage', 'failureMessage']
+    aggregations = {'success': 'sum'}
+
+    def reduce(self, chunk, codes, size):
+        success = chunk['success'].to_numpy(dtype='float64')
+        return {'success': np.bincount(codes, success, minlength=size).astype('int64')}
+
+
+@register_metric
+class Latency(Metric):
+    """Mean and maximum time to first byte, and mean connect time"""
+    name = 'latency'
+    columns = ['Latency', 'Connect']
+    aggregations = {
+        'latency_count': 'sum', 'latency_sum': 'sum', 'latency_max': 'max',
+        'connect_count': 'sum', 'connect_sum': 'sum',
+    }
+
+    def reduce(self, chunk, codes, size):
+        partials = {}
+        for column, prefix in [('Latency', 'latency'), ('Connect', 'connect')]:
+            if column not in chunk.columns:
+                continue
+            values = _values(chunk, column)
+            present = ~np.isnan(values)
+            partials[f'{prefix}_count'] = np.bincount(codes, present, minlength=size)
+            partials[f'{prefix}_sum'] = np.bincount(codes, np.where(present, values, 0.0), minlength=size)
+            if prefix == 'latency':
+                maximum = np.full(size, np.nan)
+                np.fmax.at(maximum, codes, values)
+                partials['latency_max'] = maximum
+        return partials
+
+    def finalize(self, groups):
+        stats = pd.DataFrame(index=groups.index)
+        if 'latency_sum' in groups.columns:
+            stats['Mean Latency'] = groups['latency_sum'] / groups['latency_count']
+            stats['Max Latency'] = groups['latency_max']
+        if 'connect_sum' in groups.columns:
+            stats['Mean Connect'] = groups['connect_sum'] / groups['connect_count']
+        return stats
+
+
+@register_metric
+class Apdex(Metric):
+    """Application Performance Index: (satisfied + tolerating / 2) / samples
+
+    Samples finishing within ``threshold_ms`` are satisfied, within
+    ``tolerating_factor`` times that tolerating; failed samples are always
+    frustrated.
+    """
+    name = 'apdex'
+    columns = ['elapsed', 'success']
+    aggregations = {'apdex_samples': 'sum', 'apdex_satisfied': 'sum', 'apdex_tolerating': 'sum'}
+
+    def __init__(self, threshold_ms: float = 500, tolerating_factor: float = 4):
+        self.threshold_ms = threshold_ms
+        self.tolerating_factor = tolerating_factor
+
+    def reduce(self, chunk, codes, size):
+        elapsed = _values(chunk, 'elapsed')
+        success = chunk['success'].to_numpy(dtype=bool)
+        satisfied = success & (elapsed <= self.threshold_ms)
+        tolerating = success & ~satisfied & (elapsed <= self.threshold_ms * self.tolerating_factor)
+        return {
+            'apdex_samples': np.bincount(codes, ~np.isnan(elapsed), minlength=size),
+            'apdex_satisfied': np.bincount(codes, satisfied, minlength=size),
+            'apdex_tolerating': np.bincount(codes, tolerating, minlength=size),
+        }
+
+    def finalize(self, groups):
+        score = (groups['apdex_satisfied'] + groups['apdex_tolerating'] / 2) / groups['apdex_samples']
+        return pd.DataFrame({'Apdex': score}, index=groups.index)
+
+
+@register_metric
+class SLABreach(Metric):
+    """Share of samples that failed or took longer than ``max_response_ms``"""
+    name = 'sla'
+    columns = ['elapsed', 'success']
+    aggregations = {'sla_samples': 'sum', 'sla_breaches': 'sum'}
+
+    def __init__(self, max_response_ms: float = 1000):
+        self.max_response_ms = max_response_ms
+
+    def reduce(self, chunk, codes, size):
+        elapsed = _values(chunk, 'elapsed')
+        breached = ~chunk['success'].to_numpy(dtype=bool) | (elapsed > self.max_response_ms)
+        return {
+            'sla_samples': np.bincount(codes, minlength=size),
+            'sla_breaches': np.bincount(codes, breached, minlength=size),
+        }
+
+    def finalize(self, groups):
+        return pd.DataFrame({'SLA Breach %': groups['sla_breaches'] / groups['sla_samples'] * 100},
+                            index=groups.index)
+
+
+def build_metrics(names: Optional[Iterable[str]] = None, options: Optional[dict] = None) -> List[Metric]:
+    """Instantiate the core metrics plus the registered ones among ``names``
+
+    Names without a registered metric (such as ``throughput``, which is
+    only a column selection) are skipped. ``options`` maps metric names to
+    keyword arguments.
+    """
+    options = options or {}
+    selected = dict.fromkeys(CORE_METRICS + list(names or []))
+    return [METRICS[name](**options.get(name, {})) for name in selected if name in METRICS]
+
+
+def merge_aggregations(columns: Iterable[str]) -> Dict[str, str]:
+    """How each partial column merges; ``sum`` for columns no registered metric declares"""
+    declared = {column: how for metric in METRICS.values() for column, how in metric.aggregations.items()}
+    return {column: declared.get(column, 'sum') for column in columns}
+
+
+def metric_statistics(groups: pd.DataFrame) -> pd.DataFrame:
+    """Report columns of every registered metric with partials in ``groups``"""
+    frames = [
+        metric().finalize(groups) for metric in METRICS.values()
+        if set(metric.aggregations) & set(groups.columns)
+    ]
+    return pd.concat(frames, axis=1) if frames else pd.DataFrame(index=groups.index)
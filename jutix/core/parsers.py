@@ -0,0 +1,176 @@
+"""
+CSV parser engines for JTL ingestion
+
+``.gz`` and ``.zst`` files are read through ``jutix.core.compression``,
+decompressed in a background thread while the engine parses.
+"""
+import csv
+import io
+import pandas as pd
+from contextlib import nullcontext
+from typing import Iterator, List, Optional
+
+from jutix.core.compression import compression_of, open_jtl
+from jutix.core.fastparse import FastPathUnsupported, iter_jtl_mmap, read_jtl_mmap
+from jutix.core.schema import (
+    CATEGORICAL_COLUMNS, NULLABLE_NUMERIC, NUMERIC_COLUMNS, columns_for_metrics, read_csv_kwargs
+)
+
+# The pandas C engine is always available, pyarrow is optional and the
+# NumPy 'mmap' fast path falls back to the C engine for files it can't read
+DEFAULT_PARSER = 'c'
+PARSERS = ('c', 'pyarrow', 'mmap')
+
+# Approximate bytes per JTL row, used to size pyarrow and mmap streaming blocks
+BYTES_PER_ROW = 200
+
+
+def pyarrow_available() -> bool:
+    """Check whether the optional pyarrow dependency can be imported"""
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_parser(parser: Optional[str], logger=None) -> str:
+    """Return a usable parser name, falling back to the C engine"""
+    parser = (parser or DEFAULT_PARSER).lower()
+    if parser not in PARSERS:
+        if logger:
+            logger.warning(f"Unknown parser '{parser}', using '{DEFAULT_PARSER}'")
+        return DEFAULT_PARSER
+    if parser == 'pyarrow' and not pyarrow_available():
+        if logger:
+            logger.warning("pyarrow is not installed, falling back to the C parser")
+        return DEFAULT_PARSER
+    return parser
+
+
+def _csv_source(file_path: str):
+    """The path of a plain file, or a background-decompressed stream of a compressed one"""
+    return open_jtl(file_path) if compression_of(file_path) else nullcontext(file_path)
+
+
+def read_jtl_csv(file_path: str, metrics: Optional[List[str]] = None,
+                 parser: str = DEFAULT_PARSER) -> pd.DataFrame:
+    """Read a whole JTL file into a frame using the compact schema"""
+    if parser == 'pyarrow':
+        return _read_pyarrow(file_path, metrics)
+    if parser == 'mmap' and not compression_of(file_path):
+        try:
+            return read_jtl_mmap(file_path, metrics)
+        except FastPathUnsupported:
+            pass
+    try:
+        with _csv_source(file_path) as source:
+            return pd.read_csv(source, **read_csv_kwargs(metrics))
+    except (ValueError, TypeError):
+        # Missing values in integer columns need the nullable dtypes
+        with _csv_source(file_path) as source:
+            return pd.read_csv(source, **read_csv_kwargs(metrics, nullable=True))
+
+
+def iter_jtl_csv(file_path: str, batch_size: int, metrics: Optional[List[str]] = None,
+                 parser: str = DEFAULT_PARSER) -> Iterator[pd.DataFrame]:
+    """Yield raw frames of roughly ``batch_size`` rows from a JTL file"""
+    if parser == 'pyarrow':
+        yield from _iter_pyarrow(file_path, batch_size, metrics)
+        return
+
+    rows_read = 0
+    if parser == 'mmap' and not compression_of(file_path):
+        try:
+            for chunk in iter_jtl_mmap(file_path, max(batch_size * BYTES_PER_ROW, 1 << 16), metrics):
+                rows_read += len(chunk)
+                yield chunk
+            return
+        except FastPathUnsupported:
+            pass
+
+    # Resume after the rows already yielded by the fast path
+    try:
+        with _csv_source(file_path) as source, pd.read_csv(
+            source, chunksize=batch_size, skiprows=range(1, rows_read + 1), **read_csv_kwargs(metrics)
+        ) as reader:
+            for chunk in reader:
+                rows_read += len(chunk)
+                yield chunk
+        return
+    except (ValueError, TypeError):
+        pass
+
+    # Resume after the rows already yielded using the nullable dtypes
+    with _csv_source(file_path) as source, pd.read_csv(
+        source, chunksize=batch_size, skiprows=range(1, rows_read + 1), **read_csv_kwargs(metrics, nullable=True)
+    ) as reader:
+        yield from reader
+
+
+def _read_header(file_path: str) -> List[str]:
+    """Return the column names from the first line of a CSV file"""
+    with open_jtl(file_path) as f:
+        return next(csv.reader(io.TextIOWrapper(f, newline='')), [])
+
+
+def _pyarrow_convert_options(file_path: str, metrics: Optional[List[str]]):
+    """Build pyarrow convert options mirroring the pandas schema"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    header = _read_header(file_path)
+    wanted = columns_for_metrics(metrics)
+    include = [c for c in header if wanted is None or c in wanted]
+
+    column_types = {}
+    for column in include:
+        if column in CATEGORICAL_COLUMNS:
+            column_types[column] = pa.dictionary(pa.int32(), pa.string())
+        elif column in NUMERIC_COLUMNS:
+            column_types[column] = getattr(pa, NUMERIC_COLUMNS[column])()
+
+    return pa_csv.ConvertOptions(
+        column_types=column_types,
+        include_columns=include,
+        strings_can_be_null=True,
+    )
+
+
+def _arrow_to_pandas(table) -> pd.DataFrame:
+    """Convert an Arrow table or batch, keeping integers narrow"""
+    df = table.to_pandas()
+    for column, dtype in NUMERIC_COLUMNS.items():
+        # Arrow widens integer columns with nulls to float64
+        if column in df.columns and df[column].dtype.kind == 'f':
+            df[column] = df[column].astype(NULLABLE_NUMERIC[dtype])
+    return df
+
+
+def _read_pyarrow(file_path: str, metrics: Optional[List[str]]) -> pd.DataFrame:
+    """Read a whole file with the multithreaded pyarrow CSV reader"""
+    import pyarrow.csv as pa_csv
+
+    with _csv_source(file_path) as source:
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=_pyarrow_convert_options(file_path, metrics),
+        )
+    return _arrow_to_pandas(table)
+
+
+def _iter_pyarrow(file_path: str, batch_size: int,
+                  metrics: Optional[List[str]]) -> Iterator[pd.DataFrame]:
+    """Stream record batches with the pyarrow CSV reader"""
+    import pyarrow.csv as pa_csv
+
+    with _csv_source(file_path) as source:
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=max(batch_size * BYTES_PER_ROW, 1 << 16)),
+            convert_options=_pyarrow_convert_options(file_path, metrics),
+        )
+        for batch in reader:
+            if batch.num_rows:
+                yield _arrow_to_pandas(batch)
@@ -0,0 +1,151 @@
+"""
+Partial-aggregate artifacts for analyzing tests spread over several load generators
+
+``jutix partial`` folds the JTL files of one injector into a
+``StreamingAggregator`` and saves its state in a compressed ``.npz``
+archive: per-label moments, percentile sketch buckets, the 1 second
+rollup, request start/end events and error signature counts, plus JSON metadata. ``jutix merge``
+combines any number of them into the report of the whole test. Counts,
+sums and min/max merge exactly and percentiles keep the sketch's
+relative accuracy.
+"""
+import json
+import socket
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from jutix.core.aggregates import GROUP_KEYS, StreamingAggregator
+from jutix.core.concurrency import CONCURRENCY_KEYS
+from jutix.core.errors import ErrorAggregator
+from jutix.core.rollup import ROLLUP_KEYS
+from jutix.core.schema import SCHEMA_VERSION
+
+# Bumped whenever the archive layout changes; older partials are rejected
+PARTIAL_VERSION = 2
+
+# Tables of an aggregator's state and the columns forming their index
+TABLES = {
+    'groups': GROUP_KEYS,
+    'sketch': GROUP_KEYS + ['bucket'],
+    'rollup': ROLLUP_KEYS,
+    'concurrency': CONCURRENCY_KEYS,
+    'errors_by_label': ['file', 'label', 'signature'],
+    'errors_by_time': ['bucket', 'signature'],
+    'signatures': ['signature'],
+}
+
+
+def _pack(arrays: dict, table: str, frame: pd.DataFrame):
+    """Add a flat frame's columns to ``arrays``, strings as codes plus categories"""
+    for column in frame.columns:
+        values = frame[column]
+        key = f"{table}/{column}"
+        if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(values):
+            codes, categories = pd.factorize(values.astype(str))
+            arrays[key] = codes
+            arrays[f"{key}/categories"] = np.asarray(categories, dtype=str)
+        else:
+            # Empty aggregates are object columns; archives must not need pickle
+            arrays[key] = pd.to_numeric(values).to_numpy()
+
+
+def _unpack(archive, table: str) -> pd.DataFrame:
+    """Rebuild a flat frame packed by ``_pack``, strings as categoricals"""
+    prefix = f"{table}/"
+    columns = [key[len(prefix):] for key in archive.files
+               if key.startswith(prefix) and not key.endswith('/categories')]
+    data = {}
+    for column in columns:
+        key = prefix + column
+        if f"{key}/categories" in archive.files:
+            data[column] = pd.Categorical.from_codes(archive[key], archive[f"{key}/categories"].tolist())
+        else:
+            data[column] = archive[key]
+    return pd.DataFrame(data)
+
+
+def save_partial(path, aggregator: StreamingAggregator, metadata: Optional[dict] = None) -> Path:
+    """Write an aggregator's state and metadata to ``path`` (``.npz`` is appended if missing)"""
+    path = Path(path)
+    if path.suffix != '.npz':
+        path = path.with_name(path.name + '.npz')
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    errors = aggregator.errors
+    info = {
+        **(metadata or {}),
+        'version': PARTIAL_VERSION,
+        'schema_version': SCHEMA_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': socket.gethostname(),
+        'rows': int(aggregator.rows),
+        'relative_accuracy': aggregator.sketch.relative_accuracy,
+        'bucket_seconds': errors.bucket_seconds,
+        'errors': int(errors.errors),
+    }
+    signatures = pd.DataFrame(
+        [(key, code, message) for key, (code, message) in errors.signatures.items()],
+        columns=['signature', 'code', 'message']
+    )
+    arrays = {'metadata': np.array(json.dumps(info))}
+    for table, frame in [
+        ('groups', aggregator.groups.reset_index()),
+        ('sketch', aggregator.sketch.counts.reset_index()),
+        ('rollup', aggregator.rollup.frame.reset_index()),
+        ('concurrency', aggregator.concurrency.frame.reset_index()),
+        ('errors_by_label', errors.by_label.reset_index()),
+        ('errors_by_time', errors.by_time.reset_index()),
+        ('signatures', signatures.astype({'signature': 'int64'})),
+    ]:
+        _pack(arrays, table, frame)
+    np.savez_compressed(path, **arrays)
+    return path
+
+
+def load_partial(path) -> Tuple[StreamingAggregator, dict]:
+    """Read a partial written by ``save_partial`` back into an aggregator"""
+    with np.load(path, allow_pickle=False) as archive:
+        metadata = json.loads(str(archive['metadata']))
+        if metadata.get('version') != PARTIAL_VERSION:
+            raise ValueError(f"{path} is a version {metadata.get('version')} partial, "
+                             f"expected version {PARTIAL_VERSION}")
+        tables = {table: _unpack(archive, table) for table in TABLES}
+
+    aggregator = StreamingAggregator(relative_accuracy=metadata['relative_accuracy'])
+    aggregator.rows = metadata['rows']
+    if not tables['groups'].empty:
+        aggregator.groups = tables['groups'].set_index(TABLES['groups'])
+        aggregator.sketch.counts = tables['sketch'].set_index(TABLES['sketch'])['count']
+        aggregator.rollup.frame = tables['rollup'].set_index(TABLES['rollup'])
+        aggregator.concurrency.frame = tables['concurrency'].set_index(TABLES['concurrency'])
+
+    errors = ErrorAggregator(metadata['bucket_seconds'])
+    if not tables['errors_by_label'].empty:
+        errors.by_label = tables['errors_by_label'].set_index(TABLES['errors_by_label'])['count']
+        errors.by_time = tables['errors_by_time'].set_index(TABLES['errors_by_time'])['count']
+        signatures = tables['signatures']
+        errors.signatures = dict(zip(
+            signatures['signature'].tolist(),
+            zip(signatures['code'].astype(str).tolist(), signatures['message'].astype(str).tolist())
+        ))
+    errors.errors = metadata['errors']
+    aggregator.errors = errors
+    return aggregator, metadata
+
+
+def merge_partials(paths: Iterable, logger=None) -> Tuple[StreamingAggregator, List[dict]]:
+    """Merge partials into one aggregator; returns it with the metadata of every partial"""
+    merged, sources = None, []
+    for path in paths:
+        aggregator, metadata = load_partial(path)
+        merged = aggregator if merged is None else merged.merge(aggregator)
+        sources.append({'path': str(path), **metadata})
+        if logger:
+            logger.info(f"Merged {path}: {metadata['rows']} rows from {metadata.get('host', 'unknown host')}")
+    if merged is None:
+        raise ValueError("No partials to merge")
+    return merged, sources
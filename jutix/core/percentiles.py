@@ -0,0 +1,144 @@
+"""
+Percentile calculation: exact for small inputs, mergeable sketches otherwise
+"""
+import math
+import pandas as pd
+import numpy as np
+from typing import Iterable, List, Sequence
+
+from jutix.core.folding import Folded
+
+DEFAULT_PERCENTILES = [50, 75, 90, 95, 99]
+
+# Bucket index used for non-positive values, which are estimated as 0
+ZERO_BUCKET = np.iinfo(np.int32).min
+
+
+def percentile_columns(percentiles: Iterable[float]) -> List[str]:
+    """Column names used for a list of percentiles, e.g. 95 -> 'P95'"""
+    return [f"P{p:g}" for p in percentiles]
+
+
+def exact_percentiles(df: pd.DataFrame, percentiles: Sequence[float],
+                      by: Sequence[str] = ('file',), column: str = 'elapsed') -> pd.DataFrame:
+    """Percentiles computed from every row with pandas' linear interpolation"""
+    quantiles = [p / 100 for p in percentiles]
+    table = df.groupby(list(by), observed=True)[column].quantile(quantiles).unstack()
+    table.columns = percentile_columns(percentiles)
+    return table
+
+
+class PercentileSketch:
+    """Grouped log-bucketed histogram with a bounded relative error.
+
+    Values are counted in buckets ``(gamma**(i-1), gamma**i]`` with
+    ``gamma = (1 + alpha) / (1 - alpha)`` (the DDSketch mapping), per group.
+    For any percentile the estimate is within a relative error of
+    ``relative_accuracy`` (alpha) of the sample at rank
+    ``floor(q * (n - 1))``. The size depends on the value range, not on the
+    number of rows: with alpha = 1% about 750 buckets cover 1 ms to 1 hour.
+    Sketches built on different chunks, files or workers merge exactly.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, keys: Sequence[str] = ('file', 'label')):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.keys = list(keys)
+        self._counts = Folded(pd.Series(
+            dtype='int64',
+            index=pd.MultiIndex.from_arrays([[] for _ in self.keys] + [[]], names=self.keys + ['bucket']),
+            name='count'
+        ), self.keys + ['bucket'])
+
+    @property
+    def counts(self) -> pd.Series:
+        """Values counted per group and bucket"""
+        return self._counts.value
+
+    @counts.setter
+    def counts(self, counts: pd.Series):
+        self._counts.value = counts
+
+    def bucket_index(self, values) -> np.ndarray:
+        """Map values to bucket indices"""
+        values = np.asarray(values, dtype='float64')
+        positive = values > 0
+        index = np.full(values.shape, ZERO_BUCKET, dtype=np.int32)
+        index[positive] = np.ceil(np.log(values[positive]) / self.log_gamma)
+        return index
+
+    def bucket_value(self, index) -> np.ndarray:
+        """Representative value of each bucket (its relative-error midpoint)"""
+        index = np.asarray(index)
+        values = 2 * np.power(self.gamma, index.astype('float64')) / (self.gamma + 1)
+        return np.where(index == ZERO_BUCKET, 0.0, values)
+
+    def update(self, df: pd.DataFrame, column: str = 'elapsed'):
+        """Add the values of a chunk to the sketch in one vectorized pass"""
+        if df.empty:
+            return
+        frame = pd.DataFrame({key: df[key].array for key in self.keys})
+        frame['bucket'] = self.bucket_index(df[column].to_numpy(dtype='float64', na_value=np.nan))
+        valid = df[column].notna().to_numpy()
+        counts = frame[valid].groupby(self.keys + ['bucket'], observed=True, sort=False).size()
+        self._fold(counts)
+
+    def merge(self, other: 'PercentileSketch') -> 'PercentileSketch':
+        """Merge another sketch with the same accuracy and keys into this one"""
+        if other.relative_accuracy != self.relative_accuracy or other.keys != self.keys:
+            raise ValueError("Cannot merge sketches with different accuracy or keys")
+        self._fold(other.counts)
+        return self
+
+    def _fold(self, counts: pd.Series):
+        self._counts.add(counts)
+
+    def percentiles(self, percentiles: Sequence[float], by: Sequence[str] = ('file',)) -> pd.DataFrame:
+        """Estimate percentiles per group of the ``by`` keys"""
+        by = list(by)
+        columns = percentile_columns(percentiles)
+        if self.counts.empty:
+            return pd.DataFrame(columns=columns)
+
+        counts = self.counts.groupby(level=by + ['bucket'], observed=True).sum().sort_index()
+        groups = counts.index.droplevel('bucket')
+        buckets = counts.index.get_level_values('bucket').to_numpy()
+        cumulative = counts.to_numpy().cumsum()
+
+        # Locate each group's slice of the global cumulative counts
+        codes, uniques = groups.factorize()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)]
+        offset = np.r_[0, cumulative[ends[:-1] - 1]]
+        totals = cumulative[ends - 1] - offset
+
+        table = {}
+        for name, p in zip(columns, percentiles):
+            rank = np.floor(p / 100 * (totals - 1))
+            position = np.searchsorted(cumulative, offset + rank, side='right')
+            table[name] = self.bucket_value(buckets[position])
+
+        uniques.names = by
+        return pd.DataFrame(table, index=uniques)
+
+    @property
+    def empty(self) -> bool:
+        return self.counts.empty
+
+
+def compute_percentiles(df: pd.DataFrame, percentiles: Sequence[float], mode: str = 'auto',
+                        max_exact_rows: int = 1_000_000, relative_accuracy: float = 0.01,
+                        by: Sequence[str] = ('file',)) -> pd.DataFrame:
+    """Percentile table for a loaded frame
+
+    ``mode`` is ``"exact"``, ``"sketch"`` or ``"auto"``, which is exact up to
+    ``max_exact_rows`` rows and uses a sketch above that.
+    """
+    if mode == 'exact' or (mode == 'auto' and len(df) <= max_exact_rows):
+        return exact_percentiles(df, percentiles, by)
+    sketch = PercentileSketch(relative_accuracy, keys=by)
+    sketch.update(df)
+    return sketch.percentiles(percentiles, by)
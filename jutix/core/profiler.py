@@ -0,0 +1,117 @@
+"""
+Wall time, CPU time and memory of each pipeline stage
+"""
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+RSS_UNIT_BYTES = 1 if sys.platform == 'darwin' else 1024
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT_BYTES / 1024 / 1024
+
+
+def count_rows(result) -> Optional[int]:
+    """Rows held by a stage result: a frame, an aggregator or a row count"""
+    if result is None:
+        return None
+    if isinstance(result, int):
+        return result
+    rows = getattr(result, 'rows', None)
+    if isinstance(rows, int):
+        return rows
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+class Measurement:
+    """Wall time, CPU time and peak RSS growth since creation"""
+
+    def __init__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.rss = peak_rss_mb()
+
+    def finish(self, rows: Optional[int] = None) -> Dict[str, Optional[float]]:
+        wall_seconds = time.perf_counter() - self.wall
+        rss = peak_rss_mb()
+        return {
+            'wall_seconds': round(wall_seconds, 4),
+            'cpu_seconds': round(time.process_time() - self.cpu, 4),
+            'peak_rss_delta_mb': round(rss - self.rss, 1) if rss is not None else None,
+            'rows': rows,
+            'rows_per_sec': round(rows / wall_seconds) if rows and wall_seconds > 0 else None,
+        }
+
+
+def measure_call(func, *args):
+    """Run ``func(*args)`` and return ``(result, measurements)``
+
+    Kept at module level so loaders can ship it to worker processes; the
+    measurements then describe the worker, not the parent.
+    """
+    measurement = Measurement()
+    result = func(*args)
+    return result, measurement.finish(count_rows(result))
+
+
+class StageProfiler:
+    """Records per-stage wall time, CPU time, peak RSS growth and throughput.
+
+    Stages are measured with the ``stage`` context manager; measurements
+    taken elsewhere (e.g. in worker processes) are added with ``record``.
+    Each stage is also logged with its numbers bound as structured fields.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.stages: List[dict] = []
+        self.started = Measurement()
+
+    @contextmanager
+    def stage(self, name: str, **context):
+        """Measure the enclosed block; set ``record['rows']`` to report throughput"""
+        record = {'rows': None, **context}
+        measurement = Measurement()
+        try:
+            yield record
+        finally:
+            self.record(name, **{**record, **measurement.finish(record['rows'])})
+
+    def record(self, name: str, **fields) -> dict:
+        """Add a finished stage and log it"""
+        entry = {'stage': name, **fields}
+        self.stages.append(entry)
+        throughput = f", {entry['rows_per_sec']:,} rows/s" if entry.get('rows_per_sec') else ""
+        subject = f"{name} [{entry['file']}]" if entry.get('file') else name
+        self.logger.bind(profile=entry).info(
+            f"Stage {subject}: {entry['wall_seconds']:.2f}s wall, {entry['cpu_seconds']:.2f}s CPU{throughput}"
+        )
+        return entry
+
+    def summary(self) -> dict:
+        """Totals since the profiler was created plus every recorded stage"""
+        return {
+            'total': self.started.finish(),
+            'stages': self.stages,
+        }
+
+    def write_json(self, path, **fields) -> str:
+        """Write ``summary()`` plus any extra ``fields`` to ``path``"""
+        with open(path, 'w') as f:
+            json.dump({**self.summary(), **fields}, f, indent=2)
+        return str(path)
@@ -1,7 +1,67 @@
+import html
 import pandas as pd
 from pathlib import Path
+from typing import Dict, List, Optional
 import logging
 
+from jutix.core.aggregates import StreamingAggregator, collapse_groups, reduce_groups, summarize
+from jutix.core.concurrency import ConcurrencyRollup
+from jutix.core.errors import ErrorAggregator
+from jutix.core.interactive import series_html
+from jutix.core.metrics import metric_statistics
+from jutix.core.rollup import TimeRollup
+
+# (title, file name) of the plots linked from the report, in display order
+PLOT_SECTIONS = [
+    ('Response Time Distribution (Box Plot)', 'response_time_boxplot.png'),
+    ('Response Time Density Distribution', 'response_time_violin.png'),
+    ('Throughput Over Time', 'throughput_over_time.png'),
+    ('Concurrency Over Time', 'concurrency_over_time.png'),
+    ('Response Time Percentiles', 'response_time_percentiles.png'),
+]
+
+# Profiler fields shown in the "Pipeline performance" section, with their headings
+PERFORMANCE_COLUMNS = {
+    'stage': 'Stage',
+    'file': 'File',
+    'wall_seconds': 'Wall (s)',
+    'cpu_seconds': 'CPU (s)',
+    'peak_rss_delta_mb': 'Peak RSS Delta (MB)',
+    'rows': 'Rows',
+    'rows_per_sec': 'Rows/s',
+}
+
+# Error tables written next to the report, with the file name they are saved under
+ERROR_TABLES = {
+    'signatures': 'error_signatures.csv',
+    'by_label': 'errors_by_label.csv',
+    'by_time': 'errors_by_time.csv',
+}
+
+# Requests in flight and thread counts per second, written next to the report
+CONCURRENCY_TABLE = 'concurrency_over_time.csv'
+
+# Click a column heading of a "sortable" table to sort by it, again to reverse
+SORT_JS = r"""
+document.querySelectorAll('table.sortable').forEach(function (table) {
+  table.querySelectorAll('thead th').forEach(function (th, column) {
+    th.style.cursor = 'pointer';
+    th.addEventListener('click', function () {
+      var ascending = th.dataset.order !== 'asc';
+      th.dataset.order = ascending ? 'asc' : 'desc';
+      var body = table.tBodies[0];
+      var rows = Array.prototype.slice.call(body.rows);
+      rows.sort(function (a, b) {
+        var x = a.cells[column].textContent, y = b.cells[column].textContent;
+        var order = isNaN(parseFloat(x)) || isNaN(parseFloat(y)) ? x.localeCompare(y) : parseFloat(x) - parseFloat(y);
+        return ascending ? order : -order;
+      });
+      rows.forEach(function (row) { body.appendChild(row); });
+    });
+  });
+});
+"""
+
 class ReportGenerator:
     def __init__(self, reports_dir: Path, logger: logging.Logger):
         self.reports_dir = reports_dir
@@ -11,20 +71,212 @@ class ReportGenerator:
         """Get full path for report files"""
         return str(self.reports_dir / filename)
 
-    def calculate_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate performance statistics by file"""
-        stats_by_file = df.groupby('file').agg({
-            'elapsed': ['count', 'mean', 'std', 'min', 'max'],
-            'success': 'mean'
-        }).round(2)
-        
+    def calculate_statistics(self, df: pd.DataFrame, percentile_table: Optional[pd.DataFrame] = None,
+                             rollup: Optional[TimeRollup] = None,
+                             concurrency: Optional[ConcurrencyRollup] = None,
+                             groups: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Calculate performance statistics by file
+
+        Every column is derived from ``groups``, the per-(file, label)
+        partials of ``reduce_groups`` (computed from ``df`` if not given),
+        so the enabled metrics need no further pass over the rows.
+        ``percentile_table`` (indexed by file, e.g. from ``compute_percentiles``)
+        adds one response time column per configured percentile, a
+        ``TimeRollup`` mean and peak throughput and a ``ConcurrencyRollup``
+        mean and peak requests in flight.
+        """
+        if groups is None:
+            groups = reduce_groups(df)
+        return self._file_statistics(collapse_groups(groups), percentile_table, rollup, concurrency)
+
+    def statistics_from_aggregates(self, aggregator: StreamingAggregator,
+                                   percentiles: Optional[List[float]] = None) -> pd.DataFrame:
+        """Calculate the same per-file statistics from streamed aggregates"""
+        percentile_table = aggregator.sketch.percentiles(percentiles) if percentiles else None
+        return self._file_statistics(aggregator.by_file(), percentile_table,
+                                     aggregator.rollup, aggregator.concurrency)
+
+    def _file_statistics(self, by_file: pd.DataFrame, percentile_table: Optional[pd.DataFrame],
+                         rollup: Optional[TimeRollup], concurrency: Optional[ConcurrencyRollup]) -> pd.DataFrame:
+        """Statistics table of per-file partials"""
+        stats_by_file = summarize(by_file)
         stats_by_file.columns = ['Total Requests', 'Mean RT', 'Std RT', 'Min RT', 'Max RT', 'Success Rate']
-        stats_by_file['Success Rate'] = (stats_by_file['Success Rate'] * 100).round(2)
-        return stats_by_file
+        stats_by_file['Success Rate'] = stats_by_file['Success Rate'] * 100
+        stats_by_file = self._add_throughput(stats_by_file, rollup)
+        stats_by_file = self._add_concurrency(stats_by_file, concurrency)
+        stats_by_file = self._add_percentiles(stats_by_file, percentile_table)
+        return stats_by_file.join(metric_statistics(by_file)).round(2)
+
+    def label_statistics(self, groups: pd.DataFrame, percentile_table: Optional[pd.DataFrame] = None,
+                         rollup: Optional[TimeRollup] = None) -> pd.DataFrame:
+        """Calculate performance statistics by file and label
+
+        ``groups`` holds raw per-(file, label) aggregates, from
+        ``reduce_groups`` or a ``StreamingAggregator``, whose metrics add
+        their columns. ``percentile_table`` must be indexed by file and
+        label, and a ``TimeRollup`` adds throughput and received bytes.
+        """
+        summary = summarize(groups)
+        stats_by_label = pd.DataFrame({
+            'Requests': summary['count'],
+            'Mean RT': summary['mean'],
+            'Std RT': summary['std'],
+            'Min RT': summary['min'],
+            'Max RT': summary['max'],
+        })
+        stats_by_label = self._add_percentiles(stats_by_label, percentile_table)
+        stats_by_label['Error %'] = (1 - summary['success_rate']) * 100
+        if rollup is not None and not rollup.empty:
+            throughput = rollup.label_throughput()
+            stats_by_label = stats_by_label.join(pd.DataFrame({
+                'Throughput (req/s)': throughput['throughput'],
+                'Received KB/s': throughput['bytes_per_sec'] / 1024,
+                'Avg Bytes': throughput['avg_bytes'],
+            }))
+        stats_by_label = stats_by_label.join(metric_statistics(groups))
+        return stats_by_label.sort_index().round(2)
+
+    def error_analysis(self, errors: ErrorAggregator, top_n: int = 10) -> Dict[str, pd.DataFrame]:
+        """Top ``top_n`` error signatures overall, per label and per time bucket
+
+        Every table is also written as CSV to the reports directory; the
+        per-bucket table can be long and is only linked from the report.
+        """
+        tables = {
+            'signatures': errors.top_signatures(top_n).round(2),
+            'by_label': errors.top_by_label(top_n),
+            'by_time': errors.top_by_time(top_n),
+        }
+        for name, table in tables.items():
+            table.to_csv(self.get_report_path(ERROR_TABLES[name]), index=False)
+        self.logger.info(f"Found {errors.errors} errors with {len(errors.signatures)} distinct signatures")
+        return tables
+
+    def concurrency_analysis(self, concurrency: ConcurrencyRollup) -> pd.DataFrame:
+        """Requests in flight next to allThreads/grpThreads for every second of the test
+
+        The table is written as CSV to the reports directory.
+        """
+        table = concurrency.table('1s')
+        numeric = ['in_flight', 'allThreads', 'grpThreads']
+        table.drop(columns=['bucket', 'peak_in_flight']).round(dict.fromkeys(numeric, 3)).to_csv(
+            self.get_report_path(CONCURRENCY_TABLE), index=False)
+        return table
+
+    def _add_concurrency(self, stats_by_file: pd.DataFrame,
+                         concurrency: Optional[ConcurrencyRollup]) -> pd.DataFrame:
+        """Append mean and peak requests in flight, and the peak thread count if recorded"""
+        if concurrency is None or concurrency.empty:
+            return stats_by_file
+        summary = concurrency.summary().dropna(axis=1, how='all')
+        summary = summary.rename(columns={
+            'mean_in_flight': 'Avg In-Flight', 'peak_in_flight': 'Peak In-Flight', 'peak_threads': 'Peak Threads'
+        })
+        return stats_by_file.join(summary)
+
+    def _add_throughput(self, stats_by_file: pd.DataFrame, rollup: Optional[TimeRollup]) -> pd.DataFrame:
+        """Append mean and peak requests per second from a time-bucket rollup"""
+        if rollup is None or rollup.empty:
+            return stats_by_file
+        throughput = rollup.throughput()
+        throughput.columns = ['Throughput (req/s)', 'Peak Throughput (req/s)']
+        return stats_by_file.join(throughput)
 
-    def generate_html_report(self, stats_df: pd.DataFrame) -> str:
-        """Generate HTML report with statistics and plots"""
+    def _add_percentiles(self, stats_by_file: pd.DataFrame,
+                         percentile_table: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Append percentile columns such as 'P95 RT' to a stats table"""
+        if percentile_table is None or percentile_table.empty:
+            return stats_by_file
+        percentile_table = percentile_table.rename(columns=lambda c: f"{c} RT")
+        return stats_by_file.join(percentile_table)
+
+    def performance_table(self, stages: List[dict]) -> pd.DataFrame:
+        """Tabulate profiler stage records for the report"""
+        table = pd.DataFrame(stages).reindex(columns=list(PERFORMANCE_COLUMNS))
+        return table.rename(columns=PERFORMANCE_COLUMNS)
+
+    def generate_html_report(self, stats_df: Optional[pd.DataFrame], plots: Optional[List[str]] = None,
+                             performance: Optional[List[dict]] = None, series: Optional[dict] = None,
+                             label_stats: Optional[pd.DataFrame] = None,
+                             error_tables: Optional[Dict[str, pd.DataFrame]] = None,
+                             partial: Optional[List[str]] = None) -> str:
+        """Generate HTML report with statistics and plots
+
+        ``plots`` limits the linked plots to the given file names; by default
+        every plot in ``PLOT_SECTIONS`` is linked. ``performance`` holds the
+        profiler's stage records for the "Pipeline performance" section,
+        ``series`` (from ``interactive_series``) adds embedded interactive charts
+        ``label_stats`` (from ``label_statistics``) a sortable label table and
+        ``error_tables`` (from ``error_analysis``) the top error signatures.
+        ``partial`` lists why a run that hit its timeout is incomplete; the
+        report is then headed by a warning and sections never computed
+        (``stats_df`` included) are left out.
+        """
         self.logger.info("Generating HTML report...")
+        partial_html = ""
+        if partial:
+            reasons = "".join(f"<li>{html.escape(reason)}</li>" for reason in partial)
+            partial_html = f"""
+                <div class="partial">
+                    <h2>Partial report</h2>
+                    <p>The analysis ran out of time; only the results finished before the deadline are shown.</p>
+                    <ul>{reasons}</ul>
+                </div>"""
+        stats_html = ""
+        if stats_df is not None:
+            stats_html = f"""
+                <div class="stats">
+                    <h2>Performance Statistics by Test File</h2>
+                    {stats_df.to_html()}
+                </div>"""
+        plot_html = "".join(
+            f"""
+                    <div class="plot">
+                        <h2>{title}</h2>
+                        <img src="../plots/{file_name}" />
+                    </div>"""
+            for title, file_name in PLOT_SECTIONS
+            if plots is None or file_name in plots
+        )
+        series_section = ""
+        if series:
+            series_section = f"""
+                <div class="plots">
+                    <h2>Interactive Time Series</h2>
+                    {series_html(series)}
+                </div>"""
+        label_html = ""
+        if label_stats is not None and not label_stats.empty:
+            label_table = label_stats.reset_index().rename(columns={'file': 'File', 'label': 'Label'})
+            label_html = f"""
+                <div class="stats">
+                    <h2>Performance Statistics by Label</h2>
+                    {label_table.to_html(index=False, na_rep='', classes='sortable')}
+                </div>"""
+        error_html = ""
+        if error_tables is not None and not error_tables['signatures'].empty:
+            signatures = error_tables['signatures'].rename(columns={
+                'code': 'Response Code', 'message': 'Message', 'count': 'Errors',
+                'share': '% of Errors', 'labels': 'Labels'
+            })
+            by_label = error_tables['by_label'].rename(columns={
+                'label': 'Label', 'code': 'Response Code', 'message': 'Message', 'count': 'Errors'
+            })
+            error_html = f"""
+                <div class="stats">
+                    <h2>Top Error Signatures</h2>
+                    {signatures.to_html(index=False, na_rep='')}
+                    <h2>Top Errors by Label</h2>
+                    {by_label.to_html(index=False, na_rep='', classes='sortable')}
+                    <p>Top errors per time bucket: <a href="{ERROR_TABLES['by_time']}">{ERROR_TABLES['by_time']}</a></p>
+                </div>"""
+        performance_html = ""
+        if performance:
+            performance_html = f"""
+                <div class="stats">
+                    <h2>Pipeline performance</h2>
+                    {self.performance_table(performance).to_html(index=False, na_rep='')}
+                </div>"""
         
         report = f"""
         <html>
@@ -41,35 +293,23 @@ class ReportGenerator:
                 th {{ background-color: #f8f9fa; }}
                 h1, h2 {{ color: #333; }}
                 img {{ max-width: 100%; height: auto; border-radius: 4px; }}
+                .partial {{ margin: 20px 0; padding: 10px 20px; background-color: #fff3cd; border: 1px solid #ffe69c; border-radius: 8px; }}
             </style>
         </head>
         <body>
             <div class="container">
                 <h1>JMeter Performance Analysis Report</h1>
-                <div class="stats">
-                    <h2>Performance Statistics by Test File</h2>
-                    {stats_df.to_html()}
-                </div>
+                {partial_html}
+                {stats_html}
+                {label_html}
+                {error_html}
                 
-                <div class="plots">
-                    <div class="plot">
-                        <h2>Response Time Distribution (Box Plot)</h2>
-                        <img src="../plots/response_time_boxplot.png" />
-                    </div>
-                    <div class="plot">
-                        <h2>Response Time Density Distribution</h2>
-                        <img src="../plots/response_time_violin.png" />
-                    </div>
-                    <div class="plot">
-                        <h2>Throughput Over Time</h2>
-                        <img src="../plots/throughput_over_time.png" />
-                    </div>
-                    <div class="plot">
-                        <h2>Response Time Percentiles</h2>
-                        <img src="../plots/response_time_percentiles.png" />
-                    </div>
+                {series_section}
+                <div class="plots">{plot_html}
                 </div>
+                {performance_html}
             </div>
+            <script>{SORT_JS}</script>
         </body>
         </html>
         """
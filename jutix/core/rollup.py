@@ -0,0 +1,155 @@
+"""
+Time-bucket rollups shared by the plots and the report
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from jutix.core.folding import Folded, aggregate
+from jutix.core.schema import timestamp_millis
+
+# Supported rollup resolutions in milliseconds, finest first
+RESOLUTIONS = {'1s': 1000, '10s': 10_000, '1m': 60_000}
+ROLLUP_KEYS = ['file', 'label', 'bucket']
+ROLLUP_AGGREGATIONS = {
+    'count': 'sum', 'errors': 'sum', 'elapsed_sum': 'sum', 'elapsed_max': 'max', 'bytes': 'sum'
+}
+
+
+def resolution_for_span(span_seconds: int, max_points: int = 2000) -> str:
+    """Finest resolution that splits ``span_seconds`` into at most ``max_points`` buckets"""
+    span_ms = span_seconds * RESOLUTIONS['1s']
+    for name, ms in RESOLUTIONS.items():
+        if span_ms / ms <= max_points:
+            return name
+    return list(RESOLUTIONS)[-1]
+
+
+class TimeRollup:
+    """Per-file/per-label counters in fixed time buckets.
+
+    Rows are rolled up once into 1 second buckets whose ids are computed
+    from epoch milliseconds with integer division. Coarser resolutions are
+    derived from the 1 second table, never from the raw rows. Rollups of
+    different chunks or workers merge by summing (max for ``elapsed_max``).
+    """
+
+    def __init__(self):
+        self._frame = Folded(pd.DataFrame(
+            columns=list(ROLLUP_AGGREGATIONS),
+            index=pd.MultiIndex.from_arrays([[], [], []], names=ROLLUP_KEYS)
+        ), ROLLUP_KEYS, ROLLUP_AGGREGATIONS)
+        self._tables: Dict[tuple, pd.DataFrame] = {}
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Counters per file, label and 1 second bucket"""
+        return self._frame.value
+
+    @frame.setter
+    def frame(self, frame: pd.DataFrame):
+        self._frame.value = frame
+        self._tables.clear()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'TimeRollup':
+        """Build a rollup from loaded JTL rows"""
+        rollup = cls()
+        rollup.update(df)
+        return rollup
+
+    def update(self, df: pd.DataFrame):
+        """Roll up a chunk of loaded JTL rows"""
+        if df.empty:
+            return
+        frame = pd.DataFrame({
+            'file': df['file'].array,
+            'label': df['label'].array,
+            'bucket': timestamp_millis(df['timeStamp']) // RESOLUTIONS['1s'],
+            'errors': ~df['success'].to_numpy(dtype=bool),
+            'elapsed': df['elapsed'].to_numpy(dtype='float64', na_value=np.nan),
+            'bytes': df['bytes'].to_numpy(dtype='float64', na_value=0) if 'bytes' in df.columns else np.nan,
+        })
+        partial = frame.groupby(ROLLUP_KEYS, observed=True, sort=False).agg(
+            count=('elapsed', 'size'),
+            errors=('errors', 'sum'),
+            elapsed_sum=('elapsed', 'sum'),
+            elapsed_max=('elapsed', 'max'),
+            bytes=('bytes', 'sum'),
+        )
+        if 'bytes' not in df.columns:
+            # Unknown rather than 0 when the throughput columns were not loaded
+            partial['bytes'] = np.nan
+        self._fold(partial)
+
+    def merge(self, other: 'TimeRollup') -> 'TimeRollup':
+        """Merge another rollup into this one and return self"""
+        self._fold(other.frame)
+        return self
+
+    def _fold(self, partial: pd.DataFrame):
+        if partial.empty:
+            return
+        self._frame.add(partial)
+        self._tables.clear()
+
+    def table(self, resolution: str = '1s', by: Sequence[str] = ('file',)) -> pd.DataFrame:
+        """Return the rollup at a resolution, grouped by ``by`` plus time bucket
+
+        The result has one row per group and bucket with the bucket id in
+        units of the resolution, its start ``time`` and the counters.
+        """
+        key = (resolution, tuple(by))
+        if key not in self._tables:
+            factor = RESOLUTIONS[resolution] // RESOLUTIONS['1s']
+            frame = self.frame.reset_index()
+            frame['bucket'] = frame['bucket'].astype('int64') // factor
+            grouped = frame.groupby(list(by) + ['bucket'], observed=True)
+            table = aggregate(grouped, ROLLUP_AGGREGATIONS).reset_index()
+            table['time'] = pd.to_datetime(table['bucket'] * RESOLUTIONS[resolution], unit='ms')
+            self._tables[key] = table
+        return self._tables[key]
+
+    def auto_resolution(self, max_points: int = 2000) -> str:
+        """Finest resolution that keeps a series under ``max_points`` buckets"""
+        return resolution_for_span(self.span_seconds(), max_points)
+
+    def span_seconds(self, file: Optional[str] = None) -> int:
+        """Number of 1 second buckets between the first and last request"""
+        if self.frame.empty:
+            return 0
+        buckets = self.frame.index.get_level_values('bucket')
+        if file is not None:
+            buckets = buckets[self.frame.index.get_level_values('file') == file]
+        return int(buckets.max() - buckets.min() + 1)
+
+    def throughput(self) -> pd.DataFrame:
+        """Mean and peak requests per second for each file"""
+        per_second = self.table('1s', by=['file'])
+        grouped = per_second.groupby('file', observed=True)
+        span = grouped['bucket'].max() - grouped['bucket'].min() + 1
+        return pd.DataFrame({
+            'throughput': grouped['count'].sum() / span,
+            'peak_throughput': grouped['count'].max(),
+        })
+
+    def label_throughput(self) -> pd.DataFrame:
+        """Requests and received bytes per second of each (file, label)
+
+        Rates are taken over the whole span of the label's file, so the
+        labels of a file add up to the file's throughput. Byte rates are NaN
+        when ``bytes`` was not loaded.
+        """
+        totals = self.frame.groupby(level=['file', 'label'], observed=True)[['count', 'bytes']].sum(min_count=1)
+        per_second = self.table('1s', by=['file']).groupby('file', observed=True)['bucket']
+        span = (per_second.max() - per_second.min() + 1).astype('float64')
+        span = span.reindex(totals.index.get_level_values('file')).to_numpy()
+        return pd.DataFrame({
+            'throughput': totals['count'].to_numpy() / span,
+            'bytes_per_sec': totals['bytes'].to_numpy() / span,
+            'avg_bytes': totals['bytes'].to_numpy() / totals['count'].to_numpy(),
+        }, index=totals.index)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
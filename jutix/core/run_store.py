@@ -0,0 +1,214 @@
+"""
+SQLite store of per-run aggregates for comparing runs without the raw JTL files
+
+Only the standard library is imported at module level so that
+``jutix compare`` answers without loading pandas.
+"""
+import json
+import math
+import sqlite3
+from itertools import repeat
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    input_dir TEXT,
+    rows INTEGER NOT NULL,
+    relative_accuracy REAL NOT NULL,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS label_stats (
+    run_id TEXT NOT NULL, file TEXT NOT NULL, label TEXT NOT NULL,
+    count INTEGER, sum REAL, sum_sq REAL, min REAL, max REAL, success INTEGER
+);
+CREATE TABLE IF NOT EXISTS sketch_buckets (
+    run_id TEXT NOT NULL, file TEXT NOT NULL, label TEXT NOT NULL, bucket INTEGER, count INTEGER
+);
+CREATE TABLE IF NOT EXISTS file_rollup (
+    run_id TEXT NOT NULL, file TEXT NOT NULL, bucket INTEGER,
+    count INTEGER, errors INTEGER, elapsed_sum REAL, elapsed_max REAL, bytes REAL
+);
+CREATE INDEX IF NOT EXISTS label_stats_run ON label_stats (run_id);
+CREATE INDEX IF NOT EXISTS sketch_buckets_run ON sketch_buckets (run_id, label, bucket);
+CREATE INDEX IF NOT EXISTS file_rollup_run ON file_rollup (run_id);
+"""
+
+TABLES = ['runs', 'label_stats', 'sketch_buckets', 'file_rollup']
+ROLLUP_COLUMNS = ['file', 'bucket', 'count', 'errors', 'elapsed_sum', 'elapsed_max', 'bytes']
+
+# Bucket holding zero and negative values, as in ``jutix.core.percentiles``
+ZERO_BUCKET = -2 ** 31
+
+
+def _rows(run_id: str, frame, columns: Sequence[str]):
+    """Insert parameters for ``frame``, converted column by column rather than per row"""
+    return zip(repeat(run_id), *(frame[column].astype(str).tolist() if column in ('file', 'label')
+                                 else frame[column].tolist() for column in columns))
+
+
+def sketch_bucket_value(bucket: int, relative_accuracy: float) -> float:
+    """Representative value of a sketch bucket, as in ``PercentileSketch.bucket_value``"""
+    if bucket == ZERO_BUCKET:
+        return 0.0
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    return 2 * gamma ** bucket / (gamma + 1)
+
+
+class RunStore:
+    """Keeps the compact aggregates of every analysis run in one SQLite file.
+
+    A run is stored as its per-(file, label) moments, percentile sketch
+    buckets and per-file 1 second rollup counters: kilobytes to a few
+    megabytes per run regardless of how many rows the JTL files held.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> 'RunStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save_run(self, run_id: str, aggregator, input_dir: Optional[str] = None,
+                 metadata: Optional[dict] = None):
+        """Store a ``StreamingAggregator``, replacing any run with the same id"""
+        groups = aggregator.groups.reset_index()
+        sketch = aggregator.sketch.counts.reset_index()
+        rollup = aggregator.rollup.table('1s', by=['file'])
+
+        with self.connection:
+            self.delete_run(run_id)
+            self.connection.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, datetime.now().isoformat(timespec='seconds'), str(input_dir or ''),
+                 int(aggregator.rows), aggregator.sketch.relative_accuracy, json.dumps(metadata or {}))
+            )
+            self.connection.executemany(
+                "INSERT INTO label_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _rows(run_id, groups, ['file', 'label', 'count', 'sum', 'sum_sq', 'min', 'max', 'success'])
+            )
+            self.connection.executemany(
+                "INSERT INTO sketch_buckets VALUES (?, ?, ?, ?, ?)",
+                _rows(run_id, sketch, ['file', 'label', 'bucket', 'count'])
+            )
+            self.connection.executemany(
+                "INSERT INTO file_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _rows(run_id, rollup, ROLLUP_COLUMNS)
+            )
+
+    def delete_run(self, run_id: str):
+        for table in TABLES:
+            self.connection.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+
+    def list_runs(self) -> List[dict]:
+        """Stored runs, oldest first"""
+        cursor = self.connection.execute(
+            "SELECT run_id, created, input_dir, rows FROM runs ORDER BY created, run_id"
+        )
+        return [dict(zip(['run_id', 'created', 'input_dir', 'rows'], row)) for row in cursor]
+
+    def resolve(self, reference: str) -> str:
+        """Resolve a run id, ``latest``, ``previous`` or a negative index like ``-3``"""
+        runs = [run['run_id'] for run in self.list_runs()]
+        aliases = {'latest': -1, 'previous': -2}
+        if reference in aliases or (reference.startswith('-') and reference[1:].isdigit()):
+            index = aliases[reference] if reference in aliases else int(reference)
+            if not index or len(runs) < -index:
+                raise KeyError(f"Only {len(runs)} runs stored, cannot resolve '{reference}'")
+            return runs[index]
+        matches = [run for run in runs if run == reference] or [run for run in runs if run.startswith(reference)]
+        if len(matches) != 1:
+            raise KeyError(f"Run '{reference}' not found" if not matches else f"Run '{reference}' is ambiguous")
+        return matches[0]
+
+    def label_summary(self, run_id: str, percentiles: Sequence[float]) -> Dict[str, dict]:
+        """Requests, mean, error rate, throughput and percentiles per label"""
+        relative_accuracy, = self.connection.execute(
+            "SELECT relative_accuracy FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        first, last = self.connection.execute(
+            "SELECT MIN(bucket), MAX(bucket) FROM file_rollup WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        span = (last - first + 1) if first is not None else None
+
+        summary = {}
+        for label, count, total, success in self.connection.execute(
+            "SELECT label, SUM(count), SUM(sum), SUM(success) FROM label_stats "
+            "WHERE run_id = ? GROUP BY label ORDER BY label", (run_id,)
+        ):
+            summary[label] = {
+                'requests': count,
+                'mean': total / count if count else math.nan,
+                'error_rate': 100 * (count - success) / count if count else math.nan,
+                'throughput': count / span if span else math.nan,
+            }
+
+        buckets: Dict[str, list] = {}
+        for label, bucket, count in self.connection.execute(
+            "SELECT label, bucket, SUM(count) FROM sketch_buckets WHERE run_id = ? "
+            "GROUP BY label, bucket ORDER BY label, bucket", (run_id,)
+        ):
+            buckets.setdefault(label, []).append((bucket, count))
+        for label, counts in buckets.items():
+            summary.setdefault(label, {}).update(_sketch_percentiles(counts, percentiles, relative_accuracy))
+        return summary
+
+
+def _sketch_percentiles(counts: List[tuple], percentiles: Sequence[float],
+                        relative_accuracy: float) -> Dict[str, float]:
+    """Percentiles from sorted (bucket, count) pairs with the sketch's rank rule"""
+    total = sum(count for _, count in counts)
+    result = {}
+    for p in percentiles:
+        rank = math.floor(p / 100 * (total - 1))
+        cumulative = 0
+        for bucket, count in counts:
+            cumulative += count
+            if cumulative > rank:
+                break
+        result[f"P{p:g}"] = sketch_bucket_value(bucket, relative_accuracy)
+    return result
+
+
+def compare_runs(store: RunStore, run_a: str, run_b: str, percentiles: Sequence[float]) -> List[dict]:
+    """Per-label metrics of two runs side by side with the relative change
+
+    Each row holds ``<metric>_a``, ``<metric>_b`` and ``<metric>_change``
+    (percent, b relative to a) for requests, mean, error rate, throughput
+    and every percentile. Labels missing from one run have None values.
+    """
+    a = store.label_summary(run_a, percentiles)
+    b = store.label_summary(run_b, percentiles)
+    rows = []
+    for label in sorted(set(a) | set(b)):
+        row = {'label': label}
+        metrics = list((a.get(label) or b.get(label)).keys())
+        for metric in metrics:
+            value_a = a.get(label, {}).get(metric)
+            value_b = b.get(label, {}).get(metric)
+            row[f"{metric}_a"] = value_a
+            row[f"{metric}_b"] = value_b
+            row[f"{metric}_change"] = _change(value_a, value_b)
+        rows.append(row)
+    return rows
+
+
+def _change(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    if a is None or b is None or not a or math.isnan(a) or math.isnan(b):
+        return None
+    return 100 * (b - a) / a
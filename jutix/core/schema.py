@@ -0,0 +1,140 @@
+"""
+Central definition of the JTL column schema
+"""
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Bump whenever the dtypes or derived columns produced by the loader change
+SCHEMA_VERSION = 3
+
+# Repeated strings from small vocabularies are stored as categoricals
+CATEGORICAL_COLUMNS = [
+    'label', 'responseCode', 'responseMessage', 'threadName', 'dataType', 'failureMessage'
+]
+
+# Timings fit comfortably in int32, byte counts are never negative
+NUMERIC_COLUMNS = {
+    'elapsed': 'int32',
+    'Latency': 'int32',
+    'Connect': 'int32',
+    'IdleTime': 'int32',
+    'grpThreads': 'int32',
+    'allThreads': 'int32',
+    'bytes': 'uint32',
+    'sentBytes': 'uint32',
+}
+
+# Nullable fallbacks for files that contain missing numeric values
+NULLABLE_NUMERIC = {'int32': 'Int32', 'uint32': 'UInt32'}
+
+# Columns the analysis always needs; bytes feeds the received bytes per label
+BASE_COLUMNS = ['timeStamp', 'elapsed', 'label', 'responseCode', 'bytes']
+
+# Extra columns read for each entry of the ``metrics`` setting
+METRIC_COLUMNS = {
+    'responseTime': ['elapsed'],
+    'latency': ['Latency', 'Connect'],
+    'errorCount': ['success', 'responseMessage', 'failureMessage'],
+    'throughput': ['bytes', 'sentBytes'],
+    'concurrency': ['allThreads', 'grpThreads'],
+}
+
+
+def jtl_dtypes(nullable: bool = False) -> Dict[str, str]:
+    """Return the read-time dtype map for JTL columns"""
+    numeric = {
+        column: NULLABLE_NUMERIC[dtype] if nullable else dtype
+        for column, dtype in NUMERIC_COLUMNS.items()
+    }
+    return {**{column: 'category' for column in CATEGORICAL_COLUMNS}, **numeric}
+
+
+def columns_for_metrics(metrics: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """Return the columns needed for the configured metrics, or None for all columns"""
+    if not metrics:
+        return None
+    columns = list(BASE_COLUMNS)
+    for metric in metrics:
+        for column in METRIC_COLUMNS.get(metric, []):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def usecols_for_metrics(metrics: Optional[Iterable[str]]) -> Optional[Callable[[str], bool]]:
+    """Build a ``usecols`` callable that tolerates columns missing from a file"""
+    columns = columns_for_metrics(metrics)
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return lambda column: column in wanted
+
+
+def read_csv_kwargs(metrics: Optional[Iterable[str]] = None, nullable: bool = False) -> dict:
+    """Keyword arguments applying the schema to ``pd.read_csv``"""
+    return {
+        'dtype': jtl_dtypes(nullable),
+        'usecols': usecols_for_metrics(metrics),
+        'na_values': ['NA'],
+    }
+
+
+def parse_timestamps(timestamps: pd.Series) -> pd.Series:
+    """Parse JTL timestamps, which are epoch milliseconds or formatted dates"""
+    if pd.api.types.is_numeric_dtype(timestamps):
+        return pd.to_datetime(timestamps, unit='ms')
+    return pd.to_datetime(timestamps)
+
+
+def timestamp_millis(timestamps: pd.Series) -> np.ndarray:
+    """Return epoch milliseconds for a datetime series as int64"""
+    return timestamps.to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+
+def success_from_codes(response_codes: pd.Series) -> np.ndarray:
+    """Vectorized 2xx check that only inspects each distinct response code once"""
+    if isinstance(response_codes.dtype, pd.CategoricalDtype):
+        is_ok = np.asarray(response_codes.cat.categories.astype(str).str.startswith('2'))
+        # Code -1 (missing) indexes the trailing False
+        return np.append(is_ok, False)[response_codes.cat.codes.to_numpy()]
+    return response_codes.astype(str).str.startswith('2').to_numpy()
+
+
+def success_flags(df: pd.DataFrame) -> np.ndarray:
+    """JMeter's own ``success`` column when it was read, else a 2xx check of the response code
+
+    Assertions can fail a 200 response and a 3xx can be expected, so the
+    native flag is authoritative. The parsers already turn a complete
+    true/false column into booleans; other encodings are compared once per
+    distinct value.
+    """
+    if 'success' not in df.columns:
+        return success_from_codes(df['responseCode'])
+    flags = df['success']
+    if pd.api.types.is_bool_dtype(flags.dtype):
+        return flags.to_numpy(dtype=bool, na_value=False)
+    codes, uniques = pd.factorize(flags)
+    is_true = np.asarray(pd.Index(uniques).astype(str).str.lower() == 'true')
+    # Code -1 (missing) indexes the trailing False
+    return np.append(is_true, False)[codes]
+
+
+def concat_frames(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames while keeping categorical columns categorical
+
+    ``pd.concat`` falls back to object dtype when categories differ between
+    frames, so categories are unified first.
+    """
+    if len(dfs) == 1:
+        return dfs[0]
+    for column in dfs[0].columns:
+        if not isinstance(dfs[0][column].dtype, pd.CategoricalDtype):
+            continue
+        categories = pd.api.types.union_categoricals(
+            [df[column] for df in dfs if column in df.columns], ignore_order=True
+        ).categories
+        for df in dfs:
+            if column in df.columns:
+                df[column] = df[column].cat.set_categories(categories)
+    return pd.concat(dfs)
@@ -0,0 +1,227 @@
+"""
+Incremental parser for JMeter's XML result format
+
+``<testResults>`` holds one ``<httpSample>`` or ``<sample>`` element per
+result, with the CSV columns saved as short attributes. The file is fed
+to expat a block at a time and its handlers keep only the attributes and
+text of the columns, never an element tree, so memory is bounded by the
+chunk size however large the file is. Only top-level samples become rows;
+sub-results of embedded resources and transaction controllers are nested
+inside their parent.
+"""
+from xml.parsers import expat
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from jutix.core.compression import open_jtl
+from jutix.core.schema import (
+    BASE_COLUMNS, CATEGORICAL_COLUMNS, NULLABLE_NUMERIC, NUMERIC_COLUMNS, columns_for_metrics, concat_frames
+)
+
+# Sample attributes and the CSV columns they correspond to
+ATTRIBUTE_COLUMNS = {
+    'ts': 'timeStamp',
+    't': 'elapsed',
+    'lb': 'label',
+    'rc': 'responseCode',
+    'rm': 'responseMessage',
+    'tn': 'threadName',
+    'dt': 'dataType',
+    's': 'success',
+    'by': 'bytes',
+    'sby': 'sentBytes',
+    'ng': 'grpThreads',
+    'na': 'allThreads',
+    'lt': 'Latency',
+    'de': 'Encoding',
+    'sc': 'SampleCount',
+    'ec': 'ErrorCount',
+    'hn': 'Hostname',
+    'it': 'IdleTime',
+    'ct': 'Connect',
+}
+
+# Columns saved as child elements rather than attributes
+ELEMENT_COLUMNS = ['failureMessage', 'URL']
+
+# Column order of JMeter's CSV header
+COLUMN_ORDER = [
+    'timeStamp', 'elapsed', 'label', 'responseCode', 'responseMessage', 'threadName', 'dataType',
+    'success', 'failureMessage', 'bytes', 'sentBytes', 'grpThreads', 'allThreads', 'URL', 'Latency',
+    'Encoding', 'SampleCount', 'ErrorCount', 'Hostname', 'IdleTime', 'Connect',
+]
+
+# Numeric columns outside the compact schema keep pandas' default width
+INTEGER_COLUMNS = {'timeStamp': 'int64', 'SampleCount': 'int64', 'ErrorCount': 'int64', **NUMERIC_COLUMNS}
+
+# Bytes handed to the parser at a time
+BLOCK_BYTES = 1 << 20
+
+# Expat errors raised at the end of a document whose writer was stopped
+# mid-test: no closing </testResults>, or a sample cut off half-written
+TRUNCATION_ERRORS = {3, 5}
+
+# Leading bytes skipped when sniffing the format
+BYTE_ORDER_MARK = b'\xef\xbb\xbf'
+
+
+def is_xml_jtl(file_path) -> bool:
+    """Check whether a (possibly compressed) JTL file is in the XML format"""
+    with open_jtl(file_path) as f:
+        head = f.read(256)
+    return head.lstrip(BYTE_ORDER_MARK).lstrip().startswith(b'<')
+
+
+def _columns(attributes: dict, wanted: Optional[List[str]]) -> List[str]:
+    """Columns of a file, taken from the attributes of its first sample"""
+    present = {ATTRIBUTE_COLUMNS[key] for key in attributes if key in ATTRIBUTE_COLUMNS}
+    present.update(ELEMENT_COLUMNS)
+    return [column for column in COLUMN_ORDER
+            if column in present and (wanted is None or column in wanted)]
+
+
+def _convert(column: str, values: list):
+    """Convert raw attribute strings to the column's schema dtype"""
+    complete = None not in values
+    if column in CATEGORICAL_COLUMNS:
+        return pd.Categorical(values)
+    if column == 'success':
+        # Incomplete flags are left to ``success_flags``
+        return np.asarray(values, dtype=object) == 'true' if complete else np.asarray(values, dtype=object)
+    if column in INTEGER_COLUMNS:
+        dtype = INTEGER_COLUMNS[column]
+        if complete:
+            return np.asarray(values, dtype=dtype)
+        numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+        return numbers.astype(NULLABLE_NUMERIC.get(dtype, dtype.capitalize())).array
+    return np.asarray(values, dtype=object)
+
+
+def _frame(columns: List[str], rows: List[dict], urls: list, failures: list, first_row: int) -> pd.DataFrame:
+    """Build a schema frame from the attribute dicts of a chunk of samples"""
+    keys = {column: key for key, column in ATTRIBUTE_COLUMNS.items()}
+    data = {}
+    for column in columns:
+        if column == 'URL':
+            values = urls
+        elif column == 'failureMessage':
+            values = failures
+        else:
+            key = keys[column]
+            values = [row.get(key) for row in rows]
+        data[column] = _convert(column, values)
+    return pd.DataFrame(data, index=pd.RangeIndex(first_row, first_row + len(rows)))
+
+
+class _SampleCollector:
+    """Expat handlers collecting the attributes and child columns of top-level samples
+
+    The depth of the open elements is tracked: 1 is ``<testResults>``, 2 a
+    sample and deeper ones its children or sub-results. A sample is only
+    collected once its end tag has been read.
+    """
+
+    def __init__(self, want_url: bool, want_failure: bool):
+        self.want_url = want_url
+        self.want_failure = want_failure
+        self.depth = 0
+        self.rows, self.urls, self.failures = [], [], []
+        self.sample = None
+        self.url = self.failure = None
+        self.assertion: Optional[dict] = None
+        self.text: Optional[list] = None
+        self.parser = expat.ParserCreate()
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self.start
+        self.parser.EndElementHandler = self.end
+
+    def feed(self, block: bytes):
+        """Parse the next block of the file, an empty one ending the document"""
+        self.parser.Parse(block, not block)
+
+    def capture(self):
+        """Collect the text of the element just opened"""
+        self.text = []
+        # Only registered while needed; most text is indentation
+        self.parser.CharacterDataHandler = self.text.append
+
+    def captured(self) -> str:
+        text = ''.join(self.text)
+        self.text = None
+        self.parser.CharacterDataHandler = None
+        return text
+
+    def take(self, size: int):
+        """Remove and return up to ``size`` collected samples"""
+        taken = self.rows[:size], self.urls[:size], self.failures[:size]
+        del self.rows[:size], self.urls[:size], self.failures[:size]
+        return taken
+
+    def start(self, name: str, attributes: dict):
+        self.depth += 1
+        if self.depth == 2:
+            self.sample = attributes
+            self.url = self.failure = None
+        elif self.depth == 3:
+            if name == 'java.net.URL' and self.want_url:
+                self.capture()
+            elif name == 'assertionResult' and self.want_failure and self.failure is None:
+                self.assertion = {}
+        elif self.depth == 4 and self.assertion is not None:
+            self.capture()
+
+    def end(self, name: str):
+        if self.depth == 2:
+            self.rows.append(self.sample)
+            self.urls.append(self.url)
+            self.failures.append(self.failure)
+        elif self.depth == 3:
+            if self.text is not None:
+                self.url = self.captured()
+            elif self.assertion is not None:
+                # JMeter's CSV holds the message of the first failed assertion
+                if self.assertion.get('failure') == 'true' or self.assertion.get('error') == 'true':
+                    self.failure = self.assertion.get('failureMessage')
+                self.assertion = None
+        elif self.depth == 4 and self.text is not None:
+            self.assertion[name] = self.captured()
+        self.depth -= 1
+
+
+def iter_jtl_xml(file_path: str, batch_size: int, metrics: Optional[List[str]] = None,
+                 block_bytes: int = BLOCK_BYTES) -> Iterator[pd.DataFrame]:
+    """Yield raw frames of ``batch_size`` samples from an XML JTL file"""
+    wanted = columns_for_metrics(metrics)
+    collector = _SampleCollector(wanted is None or 'URL' in wanted,
+                                 wanted is None or 'failureMessage' in wanted)
+
+    columns = None
+    first_row = 0
+    with open_jtl(file_path) as source:
+        while True:
+            block = source.read(block_bytes)
+            try:
+                collector.feed(block)
+            except expat.ExpatError as e:
+                if collector.depth == 0 or e.code not in TRUNCATION_ERRORS:
+                    raise
+                block = b''
+            if columns is None and collector.rows:
+                columns = _columns(collector.rows[0], wanted)
+            while len(collector.rows) >= batch_size or (not block and collector.rows):
+                rows, urls, failures = collector.take(batch_size)
+                yield _frame(columns, rows, urls, failures, first_row)
+                first_row += len(rows)
+            if not block:
+                return
+
+
+def read_jtl_xml(file_path: str, metrics: Optional[List[str]] = None,
+                 batch_size: int = 100_000) -> pd.DataFrame:
+    """Read a whole XML JTL file into a frame using the compact schema"""
+    frames = list(iter_jtl_xml(file_path, batch_size, metrics))
+    if not frames:
+        return _frame(columns_for_metrics(metrics) or BASE_COLUMNS, [], [], [], 0)
+    return concat_frames(frames)
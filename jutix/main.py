@@ -2,8 +2,26 @@ import sys
 import argparse
 from pathlib import Path
 from loguru import logger
-from jutix.core.analyzer import JMeterAnalyzer
-from jutix.config.settings import settings, ROOT_DIR
+
+# Settings, the analyzer and its pandas/matplotlib stack are imported in
+# main() so that --help and argument errors return immediately
+
+def add_config_args(parser):
+    """Options shared by the analysis and partial/merge commands"""
+    parser.add_argument(
+        "-c", "--config",
+        help="Path to custom config file",
+        type=str,
+        default=None
+    )
+    
+    parser.add_argument(
+        "-e", "--env",
+        help="Environment to use (development, production)",
+        type=str,
+        choices=["development", "production", "default"],
+        default="default"
+    )
 
 def parse_args():
     """Parse command line arguments"""
@@ -14,37 +32,88 @@ def parse_args():
     
     parser.add_argument(
         "-i", "--input-dir",
-        help="Directory containing JMeter log files",
+        help="Directory containing JMeter log files (overrides paths.input_dir)",
         type=str,
-        default=str(Path(ROOT_DIR) / settings.paths.input_dir)
+        default=None
     )
     
     parser.add_argument(
         "-o", "--output-dir",
-        help="Directory for analysis output",
+        help="Directory for analysis output (overrides paths.output_dir)",
         type=str,
-        default=str(Path(ROOT_DIR) / settings.paths.output_dir)
+        default=None
     )
     
+    add_config_args(parser)
+    
     parser.add_argument(
-        "-c", "--config",
-        help="Path to custom config file",
+        "--stream",
+        help="Aggregate JTL files in analysis.batch_size chunks to bound memory use",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--parser",
+        help="CSV parser engine for JTL files (overrides analysis.parser)",
         type=str,
+        choices=["c", "pyarrow", "mmap"],
         default=None
     )
     
     parser.add_argument(
-        "-e", "--env",
-        help="Environment to use (development, production)",
-        type=str,
-        choices=["development", "production", "default"],
-        default="default"
+        "--no-cache",
+        help="Do not read or write the parsed JTL cache",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--rebuild-cache",
+        help="Re-parse every JTL file and overwrite its cache entry",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--follow",
+        help="Keep analyzing JTL files as the running test appends to them",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--interval",
+        help="Seconds between refreshes in --follow mode (overrides analysis.follow_interval)",
+        type=float,
+        default=None
+    )
+    
+    parser.add_argument(
+        "--interactive",
+        help="Embed downsampled time series and an interactive chart renderer in the report",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--no-plots", "--stats-only",
+        dest="no_plots",
+        help="Only compute the statistics table; plotting libraries are never imported",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--timeout",
+        help="Seconds before a partial report is written (overrides analysis.timeout, 0 disables)",
+        type=float,
+        default=None
     )
     
     return parser.parse_args()
 
 def setup_config(args):
-    """Setup configuration based on arguments"""
+    """Setup configuration based on arguments
+
+    Also used by the subcommands, whose parsers only define some of the options.
+    """
+    from jutix.config.settings import settings, ROOT_DIR
+
     try:
         # Set environment
         if args.env != "default":
@@ -61,10 +130,22 @@ def setup_config(args):
                 logger.warning(f"Config file not found: {config_path}")
         
         # Override paths from command line arguments
-        if args.input_dir:
-            settings.set("paths.input_dir", args.input_dir)
-        if args.output_dir:
-            settings.set("paths.output_dir", args.output_dir)
+        settings.set("paths.input_dir", getattr(args, 'input_dir', None) or str(Path(ROOT_DIR) / settings.paths.input_dir))
+        settings.set("paths.output_dir", getattr(args, 'output_dir', None) or str(Path(ROOT_DIR) / settings.paths.output_dir))
+        if getattr(args, 'stream', None):
+            settings.set("analysis.streaming", True)
+        if getattr(args, 'parser', None):
+            settings.set("analysis.parser", args.parser)
+        if getattr(args, 'no_cache', None):
+            settings.set("cache.enabled", False)
+        if getattr(args, 'rebuild_cache', None):
+            settings.set("cache.rebuild", True)
+        if getattr(args, 'no_plots', None):
+            settings.set("report.include_plots", False)
+        if getattr(args, 'interactive', None):
+            settings.set("report.interactive", True)
+        if getattr(args, 'timeout', None) is not None:
+            settings.set("analysis.timeout", args.timeout)
             
         # Log current configuration
         logger.debug("Current configuration:")
@@ -72,12 +153,270 @@ def setup_config(args):
         logger.debug(f"Output directory: {settings.paths.output_dir}")
         logger.debug(f"Log level: {settings.log_settings.level}")
         logger.debug(f"Batch size: {settings.analysis.batch_size}")
+        logger.debug(f"Streaming: {settings.analysis.get('streaming', False)}")
         
     except Exception as e:
         logger.exception(f"Error setting up configuration: {e}")
         raise
 
+def parse_compare_args(argv):
+    """Parse arguments of the ``compare`` command"""
+    parser = argparse.ArgumentParser(
+        prog="jutix compare",
+        description="Compare two stored runs from their aggregates, without reading any JTL file",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    parser.add_argument(
+        "run_a",
+        help="Baseline run: a run id (or unique prefix), 'latest', 'previous' or -N",
+        nargs="?",
+        default="previous"
+    )
+    
+    parser.add_argument(
+        "run_b",
+        help="Run compared against the baseline",
+        nargs="?",
+        default="latest"
+    )
+    
+    parser.add_argument(
+        "--store",
+        help="Run history database (overrides history.path)",
+        type=str,
+        default=None
+    )
+    
+    parser.add_argument(
+        "-p", "--percentiles",
+        help="Comma separated percentiles to compare (overrides percentiles)",
+        type=str,
+        default=None
+    )
+    
+    parser.add_argument(
+        "--list",
+        help="List the stored runs and exit",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--json",
+        help="Print the comparison as JSON",
+        action="store_true"
+    )
+    
+    return parser.parse_args(argv)
+
+def format_comparison(rows, percentiles) -> str:
+    """Render compared label metrics as an aligned text table"""
+    metrics = [('requests', 'Requests'), ('mean', 'Mean RT')]
+    metrics += [(f"P{p:g}", f"P{p:g} RT") for p in percentiles]
+    metrics += [('error_rate', 'Error %'), ('throughput', 'Req/s')]
+
+    def number(value):
+        if value is None:
+            return '-'
+        return f"{value:,}" if isinstance(value, int) else f"{value:,.1f}"
+
+    def cell(row, metric):
+        change = row.get(f"{metric}_change")
+        text = f"{number(row.get(f'{metric}_a'))} -> {number(row.get(f'{metric}_b'))}"
+        return text if change is None else f"{text} ({change:+.1f}%)"
+
+    table = [['Label'] + [title for _, title in metrics]]
+    table += [[row['label']] + [cell(row, metric) for metric, _ in metrics] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(table[0]))]
+    return "\n".join("  ".join(value.ljust(width) for value, width in zip(line, widths)) for line in table)
+
+def compare(argv) -> int:
+    """Run ``jutix compare`` and return the exit code"""
+    import json
+    from jutix.config.config_handler import ConfigHandler
+    from jutix.config.settings import settings
+    from jutix.core.run_store import RunStore, compare_runs
+
+    args = parse_compare_args(argv)
+    store_path = Path(args.store) if args.store else ConfigHandler().get_history_path()
+    if not store_path.exists():
+        logger.error(f"No run history found at {store_path}")
+        return 1
+
+    with RunStore(store_path) as store:
+        if args.list:
+            for run in store.list_runs():
+                print(f"{run['run_id']}  {run['created']}  {run['rows']:>12,} rows  {run['input_dir']}")
+            return 0
+
+        try:
+            run_a, run_b = store.resolve(args.run_a), store.resolve(args.run_b)
+        except KeyError as e:
+            logger.error(e.args[0])
+            return 1
+        percentiles = [float(p) for p in args.percentiles.split(',')] if args.percentiles else settings.percentiles
+        rows = compare_runs(store, run_a, run_b, percentiles)
+
+    if args.json:
+        print(json.dumps({'run_a': run_a, 'run_b': run_b, 'labels': rows}, indent=2))
+    else:
+        print(f"{run_a} -> {run_b}")
+        print(format_comparison(rows, percentiles))
+    return 0
+
+def parse_partial_args(argv):
+    """Parse arguments of the ``partial`` command"""
+    parser = argparse.ArgumentParser(
+        prog="jutix partial",
+        description="Aggregate this load generator's JTL files into a partial for 'jutix merge'",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    parser.add_argument(
+        "-i", "--input-dir",
+        help="Directory containing JMeter log files (overrides paths.input_dir)",
+        type=str,
+        default=None
+    )
+    
+    parser.add_argument(
+        "-o", "--output",
+        help="Partial file to write (default: partial_<host>_<timestamp>.npz in paths.output_dir)",
+        type=str,
+        default=None
+    )
+    
+    parser.add_argument(
+        "--parser",
+        help="CSV parser engine for JTL files (overrides analysis.parser)",
+        type=str,
+        choices=["c", "pyarrow", "mmap"],
+        default=None
+    )
+    
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+def partial(argv) -> int:
+    """Run ``jutix partial`` and return the exit code"""
+    import socket
+    from datetime import datetime
+    from jutix.config.config_handler import ConfigHandler
+    from jutix.config.settings import settings
+    from jutix.core.data_loader import JTLDataLoader
+    from jutix.core.metrics import build_metrics
+    from jutix.core.partials import save_partial
+
+    args = parse_partial_args(argv)
+    setup_config(args)
+    config = ConfigHandler().config
+    loader = JTLDataLoader(
+        settings.paths.input_dir,
+        logger,
+        max_workers=settings.analysis.max_workers,
+        metrics=config['metrics'],
+        parser=settings.analysis.get('parser', 'c'),
+        group_metrics=build_metrics(config['metrics'], settings.get('metric_options', {}))
+    )
+    files = loader.find_jtl_files(config['enabled_files'], config.get('exclude_files', []))
+    aggregator = loader.aggregate_jtl_files(
+        config['enabled_files'],
+        config.get('exclude_files', []),
+        batch_size=settings.analysis.batch_size,
+        relative_accuracy=settings.analysis.get('sketch_accuracy', 0.01)
+    )
+    if aggregator.empty:
+        logger.error("No data found in JTL files.")
+        return 1
+
+    output = args.output or Path(settings.paths.output_dir) / (
+        f"partial_{socket.gethostname()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+    )
+    path = save_partial(output, aggregator, {
+        'input_dir': str(settings.paths.input_dir),
+        'files': [Path(f).name for f in files],
+    })
+    logger.success(f"Wrote partial of {aggregator.rows} rows to {path}")
+    return 0
+
+def parse_merge_args(argv):
+    """Parse arguments of the ``merge`` command"""
+    parser = argparse.ArgumentParser(
+        prog="jutix merge",
+        description="Report on the combined partials written by 'jutix partial' on each load generator",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    parser.add_argument(
+        "partials",
+        help="Partial files to merge",
+        nargs="+"
+    )
+    
+    parser.add_argument(
+        "-o", "--output-dir",
+        help="Directory for analysis output (overrides paths.output_dir)",
+        type=str,
+        default=None
+    )
+    
+    parser.add_argument(
+        "--interactive",
+        help="Embed downsampled time series and an interactive chart renderer in the report",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--no-plots", "--stats-only",
+        dest="no_plots",
+        help="Only compute the statistics table; plotting libraries are never imported",
+        action="store_true"
+    )
+    
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+def merge(argv) -> int:
+    """Run ``jutix merge`` and return the exit code"""
+    args = parse_merge_args(argv)
+    missing = [p for p in args.partials if not Path(p).is_file()]
+    if missing:
+        logger.error(f"Partial not found: {', '.join(missing)}")
+        return 1
+    setup_config(args)
+
+    from jutix.config.settings import settings
+    from jutix.core.analyzer import JMeterAnalyzer
+
+    try:
+        analyzer = JMeterAnalyzer(settings.paths.output_dir)
+        result = analyzer.generate_merged_report(args.partials)
+    except Exception as e:
+        logger.exception(f"Error during merge: {e}")
+        return 1
+    if not result:
+        logger.error("No data found in the partials.")
+        return 1
+    if analyzer.partial:
+        logger.warning(f"Merge timed out; partial report written to {result}")
+        return PARTIAL_EXIT_CODE
+    logger.success(f"Report generated successfully. Open {result} to view the results.")
+    return 0
+
+# Exit code of a run that hit analysis.timeout and wrote a partial report
+PARTIAL_EXIT_CODE = 2
+
+# Subcommands dispatched on the first argument; anything else runs an analysis
+COMMANDS = {
+    'compare': compare,
+    'partial': partial,
+    'merge': merge,
+}
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+
     try:
         # Parse command line arguments
         args = parse_args()
@@ -86,9 +425,18 @@ def main():
         setup_config(args)
         
         # Initialize and run analyzer
+        from jutix.config.settings import settings
+        from jutix.core.analyzer import JMeterAnalyzer
+
         analyzer = JMeterAnalyzer(settings.paths.output_dir)
-        result = analyzer.generate_report()
+        if args.follow:
+            result = analyzer.follow(args.interval)
+        else:
+            result = analyzer.generate_report()
         
+        if result and analyzer.partial:
+            logger.warning(f"Analysis timed out; partial report written to {result}")
+            sys.exit(PARTIAL_EXIT_CODE)
         if result:
             logger.success(f"Report generated successfully. Open {result} to view the results.")
             sys.exit(0)
@@ -1,99 +1,313 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+import matplotlib
 import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from pathlib import Path
+from typing import List, Optional, Tuple
 import logging
 
+from jutix.core.box_stats import box_stats
+from jutix.core.concurrency import ConcurrencyRollup
+from jutix.core.deadline import Deadline, DeadlineExceeded, pool_timeout, terminate_pool
+from jutix.core.histograms import log_histograms, violin_stats
+from jutix.core.percentiles import DEFAULT_PERCENTILES, exact_percentiles
+from jutix.core.rollup import RESOLUTIONS, TimeRollup
+
+# Applied per figure with rc_context instead of mutating the global rcParams
+PLOT_STYLE = {
+    **sns.axes_style("whitegrid"),
+    'figure.figsize': [12, 6],
+    'figure.dpi': 100,
+    'savefig.dpi': 100,
+}
+FIGURE_SIZE = (15, 8)
+
+
+def _new_figure() -> Tuple[Figure, 'matplotlib.axes.Axes']:
+    """Create a figure bound to its own Agg canvas, outside the pyplot state machine"""
+    figure = Figure(figsize=FIGURE_SIZE)
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot()
+
+
+def _finish_figure(figure: Figure, ax, title: str, xlabel: str, ylabel: str, output_path: str):
+    """Apply the shared labels and write the figure to disk"""
+    ax.set_title(title, pad=20)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    for tick in ax.get_xticklabels():
+        tick.set_rotation(45)
+        tick.set_horizontalalignment('right')
+    figure.tight_layout()
+    figure.savefig(output_path, bbox_inches='tight')
+
+
+def render_boxplot(output_path: str, boxplot_stats: List[dict]):
+    """Render a box plot from precomputed box statistics"""
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure, ax = _new_figure()
+        parts = ax.bxp(boxplot_stats, patch_artist=True, showfliers=True,
+                       flierprops={'marker': 'o', 'markersize': 3, 'alpha': 0.5})
+        for box, color in zip(parts['boxes'], sns.color_palette('husl', len(boxplot_stats))):
+            box.set_facecolor(color)
+        _finish_figure(figure, ax, 'Response Time Distribution by Test File',
+                       'Test File', 'Response Time (ms)', output_path)
+
+
+def render_violin(output_path: str, stats: List[dict], labels: List[str]):
+    """Render violins from binned density statistics"""
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure, ax = _new_figure()
+        positions = list(range(len(stats)))
+        parts = ax.violin(stats, positions=positions, widths=0.8, showmedians=True)
+        for body, color in zip(parts['bodies'], sns.color_palette('husl', len(stats))):
+            body.set_facecolor(color)
+            body.set_alpha(0.8)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels)
+        ax.set_yscale('log')
+        _finish_figure(figure, ax, 'Response Time Density Distribution by Test File',
+                       'Test File', 'Response Time (ms)', output_path)
+
+
+def render_kde_violin(output_path: str, df: pd.DataFrame):
+    """Render violins with a KDE over every row"""
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure, ax = _new_figure()
+        sns.violinplot(data=df, x='file', y='elapsed', palette='husl', ax=ax)
+        _finish_figure(figure, ax, 'Response Time Density Distribution by Test File',
+                       'Test File', 'Response Time (ms)', output_path)
+
+
+def render_throughput(output_path: str, throughput: pd.DataFrame):
+    """Render requests per second over time from a rollup table"""
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure, ax = _new_figure()
+        sns.lineplot(data=throughput, x='time', y='rps', hue='file', palette='husl', ax=ax)
+        ax.legend(title='Test File', bbox_to_anchor=(1.05, 1), loc='upper left')
+        _finish_figure(figure, ax, 'Throughput Over Time', 'Time', 'Requests per Second', output_path)
+
+
+def render_concurrency(output_path: str, concurrency: pd.DataFrame):
+    """Render the requests in flight over time next to JMeter's active thread counts"""
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure, ax = _new_figure()
+        ax.plot(concurrency['time'], concurrency['in_flight'], label='Requests in flight (mean)')
+        if not np.allclose(concurrency['peak_in_flight'], concurrency['in_flight']):
+            ax.plot(concurrency['time'], concurrency['peak_in_flight'], alpha=0.5,
+                    label='Requests in flight (peak second)')
+        for column, style in [('allThreads', '--'), ('grpThreads', ':')]:
+            if concurrency[column].notna().any():
+                ax.plot(concurrency['time'], concurrency[column], linestyle=style, label=f"JMeter {column}")
+        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+        _finish_figure(figure, ax, 'Concurrency Over Time', 'Time', 'Concurrent Requests', output_path)
+
+
+def render_percentiles(output_path: str, percentiles: pd.DataFrame):
+    """Render a grouped bar chart of percentiles per file"""
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure, ax = _new_figure()
+        percentiles.plot(kind='bar', width=0.8, ax=ax)
+        ax.legend(title='Percentile', bbox_to_anchor=(1.05, 1), loc='upper left')
+
+        # Add value labels on the bars
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%.0f', padding=3, rotation=0)
+
+        _finish_figure(figure, ax, 'Response Time Percentiles by Test File',
+                       'Test File', 'Response Time (ms)', output_path)
+
+
+def render_unless_expired(deadline: Optional[Deadline], render, *args):
+    """Run a render job in a worker unless ``deadline`` passed while it was queued"""
+    if deadline is not None:
+        deadline.check(f"before rendering {Path(args[0]).name}")
+    render(*args)
+
+
 class JMeterPlotter:
-    def __init__(self, plots_dir: Path, logger: logging.Logger):
+    def __init__(self, plots_dir: Path, logger: logging.Logger, percentiles: Optional[List[float]] = None,
+                 violin_mode: str = 'binned', max_workers: int = 1):
         self.plots_dir = plots_dir
         self.logger = logger
-        
-        # Set Seaborn style globally
-        sns.set_theme(style="whitegrid")
-        plt.rcParams['figure.figsize'] = [12, 6]
-        plt.rcParams['figure.dpi'] = 100
-        plt.rcParams['savefig.dpi'] = 100
+        self.percentiles = list(percentiles or DEFAULT_PERCENTILES)
+        self.violin_mode = violin_mode
+        self.max_workers = max(1, int(max_workers or 1))
 
     def get_plot_path(self, filename: str) -> str:
         """Get full path for plot files"""
         return str(self.plots_dir / filename)
 
-    def plot_response_time_boxplot(self, df: pd.DataFrame, output_file='response_time_boxplot.png'):
-        """Plot response time boxplot by file"""
-        self.logger.info("Generating response time boxplot...")
-        plt.figure(figsize=(15, 8))
-        sns.boxplot(data=df, x='file', y='elapsed', palette='husl')
-        plt.title('Response Time Distribution by Test File', pad=20)
-        plt.xlabel('Test File')
-        plt.ylabel('Response Time (ms)')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
+    def boxplot_job(self, df: Optional[pd.DataFrame], output_file='response_time_boxplot.png',
+                    boxplot_stats: Optional[List[dict]] = None) -> tuple:
+        """Prepare the box plot render job from precomputed or freshly computed stats"""
+        if boxplot_stats is None:
+            boxplot_stats = box_stats(df)
+        return render_boxplot, (self.get_plot_path(output_file), boxplot_stats)
+
+    def violin_job(self, df: Optional[pd.DataFrame], output_file='response_time_violin.png',
+                   histograms: Optional[Tuple[np.ndarray, pd.DataFrame]] = None) -> tuple:
+        """Prepare the violin render job from binned densities (or raw rows in kde mode)"""
         output_path = self.get_plot_path(output_file)
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close()
+        if self.violin_mode == 'kde' and df is not None:
+            return render_kde_violin, (output_path, df)
+        edges, counts = histograms if histograms is not None else log_histograms(df)
+        return render_violin, (output_path, violin_stats(edges, counts), [str(i) for i in counts.index])
+
+    def throughput_job(self, df: Optional[pd.DataFrame], output_file='throughput_over_time.png',
+                       rollup: Optional[TimeRollup] = None) -> tuple:
+        """Prepare the throughput render job from a rollup table"""
+        if rollup is None:
+            rollup = TimeRollup.from_frame(df)
+        resolution = rollup.auto_resolution()
+        throughput = rollup.table(resolution, by=['file'])[['file', 'time', 'count']].copy()
+        throughput['rps'] = throughput['count'] / (RESOLUTIONS[resolution] / 1000)
+        return render_throughput, (self.get_plot_path(output_file), throughput)
+
+    def concurrency_job(self, df: Optional[pd.DataFrame], output_file='concurrency_over_time.png',
+                        concurrency: Optional[ConcurrencyRollup] = None) -> tuple:
+        """Prepare the concurrency render job from the request start/end events"""
+        if concurrency is None:
+            concurrency = ConcurrencyRollup.from_frame(df)
+        table = concurrency.table(concurrency.auto_resolution())
+        return render_concurrency, (self.get_plot_path(output_file), table)
+
+    def percentiles_job(self, df: Optional[pd.DataFrame], output_file='response_time_percentiles.png',
+                        percentile_table: Optional[pd.DataFrame] = None) -> tuple:
+        """Prepare the percentile render job from a percentile table"""
+        if percentile_table is None:
+            percentile_table = exact_percentiles(df, self.percentiles)
+        return render_percentiles, (self.get_plot_path(output_file), percentile_table.round(2))
+
+    def plot_response_time_boxplot(self, df: Optional[pd.DataFrame], output_file='response_time_boxplot.png',
+                                   boxplot_stats: Optional[List[dict]] = None):
+        """Plot response time boxplot by file
+
+        Boxes are drawn with ``Axes.bxp`` from precomputed per-file statistics
+        (``box_stats``/``sketch_box_stats``), so rendering costs O(files) and
+        only a capped sample of fliers is drawn.
+        """
+        self.logger.info("Generating response time boxplot...")
+        output_path = self._render(*self.boxplot_job(df, output_file, boxplot_stats))
         self.logger.info(f"Saved boxplot to {output_path}")
 
-    def plot_response_time_violin(self, df: pd.DataFrame, output_file='response_time_violin.png'):
-        """Plot response time violin plot by file"""
+    def plot_response_time_violin(self, df: Optional[pd.DataFrame], output_file='response_time_violin.png',
+                                  histograms: Optional[Tuple[np.ndarray, pd.DataFrame]] = None):
+        """Plot response time violin plot by file
+
+        In ``binned`` mode the violins are drawn from per-file log-spaced
+        histograms (``histograms`` from ``log_histograms``/``sketch_histograms``,
+        or built from ``df``), so render time depends on the bin count rather
+        than the row count. ``kde`` mode runs seaborn's KDE over every row.
+        """
         self.logger.info("Generating response time violin plot...")
-        plt.figure(figsize=(15, 8))
-        sns.violinplot(data=df, x='file', y='elapsed', palette='husl')
-        plt.title('Response Time Density Distribution by Test File', pad=20)
-        plt.xlabel('Test File')
-        plt.ylabel('Response Time (ms)')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        output_path = self.get_plot_path(output_file)
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close()
+        output_path = self._render(*self.violin_job(df, output_file, histograms))
         self.logger.info(f"Saved violin plot to {output_path}")
 
-    def plot_throughput_over_time(self, df: pd.DataFrame, output_file='throughput_over_time.png'):
-        """Plot throughput over time"""
+    def plot_throughput_over_time(self, df: Optional[pd.DataFrame], output_file='throughput_over_time.png',
+                                  rollup: Optional[TimeRollup] = None):
+        """Plot throughput over time
+
+        Drawn from a precomputed ``TimeRollup`` at the finest resolution that
+        keeps each series readable; a rollup is built from ``df`` if none is given.
+        """
         self.logger.info("Generating throughput over time plot...")
-        throughput = df.groupby(['file', 'second']).size().reset_index(name='count')
-        plt.figure(figsize=(15, 8))
-        sns.lineplot(data=throughput, x='second', y='count', hue='file', palette='husl')
-        plt.title('Throughput Over Time', pad=20)
-        plt.xlabel('Time')
-        plt.ylabel('Requests per Second')
-        plt.xticks(rotation=45, ha='right')
-        plt.legend(title='Test File', bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.tight_layout()
-        output_path = self.get_plot_path(output_file)
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close()
+        output_path = self._render(*self.throughput_job(df, output_file, rollup))
         self.logger.info(f"Saved throughput plot to {output_path}")
 
-    def plot_response_time_percentiles(self, df: pd.DataFrame, output_file='response_time_percentiles.png'):
-        """Plot response time percentiles by file"""
+    def plot_concurrency_over_time(self, df: Optional[pd.DataFrame], output_file='concurrency_over_time.png',
+                                   concurrency: Optional[ConcurrencyRollup] = None):
+        """Plot the requests in flight over time
+
+        Drawn from a ``ConcurrencyRollup`` (built from ``df`` if none is
+        given), with JMeter's allThreads/grpThreads for comparison.
+        """
+        self.logger.info("Generating concurrency over time plot...")
+        output_path = self._render(*self.concurrency_job(df, output_file, concurrency))
+        self.logger.info(f"Saved concurrency plot to {output_path}")
+
+    def plot_response_time_percentiles(self, df: Optional[pd.DataFrame], output_file='response_time_percentiles.png',
+                                       percentile_table: Optional[pd.DataFrame] = None):
+        """Plot response time percentiles by file
+
+        A precomputed ``percentile_table`` (indexed by file, one column per
+        percentile) is plotted as is; otherwise exact percentiles are
+        computed from ``df`` for the configured percentile list.
+        """
         self.logger.info("Generating response time percentiles plot...")
-        percentiles = df.groupby('file')['elapsed'].describe(
-            percentiles=[.50, .75, .90, .95, .99]
-        ).round(2)
-        
-        plt.figure(figsize=(15, 8))
-        ax = percentiles[['50%', '75%', '90%', '95%', '99%']].plot(kind='bar', width=0.8)
-        plt.title('Response Time Percentiles by Test File', pad=20)
-        plt.xlabel('Test File')
-        plt.ylabel('Response Time (ms)')
-        plt.legend(title='Percentile', bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.xticks(rotation=45, ha='right')
-        
-        # Add value labels on the bars
-        for container in ax.containers:
-            ax.bar_label(container, fmt='%.0f', padding=3, rotation=0)
-            
-        plt.tight_layout()
-        output_path = self.get_plot_path(output_file)
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close()
+        output_path = self._render(*self.percentiles_job(df, output_file, percentile_table))
         self.logger.info(f"Saved percentiles plot to {output_path}")
 
-    def generate_all_plots(self, df: pd.DataFrame):
-        """Generate all plots for the analysis"""
-        self.plot_response_time_boxplot(df)
-        self.plot_response_time_violin(df)
-        self.plot_throughput_over_time(df)
-        self.plot_response_time_percentiles(df) 
\ No newline at end of file
+    def _render(self, render, args) -> str:
+        """Render a job in the current process and return its output path"""
+        render(*args)
+        return args[0]
+
+    def render_jobs(self, jobs: List[tuple], parallel: Optional[bool] = None,
+                    deadline: Optional[Deadline] = None) -> List[str]:
+        """Render prepared jobs, concurrently in a process pool when ``max_workers`` > 1
+
+        Workers only receive the small pre-aggregated inputs of each plot;
+        jobs that need raw rows (kde violins) are rendered in this process.
+        Once ``deadline`` passes no plot is started, and rendering workers
+        still busy ``WORKER_GRACE_SECONDS`` later are terminated; the plots
+        finished so far are returned.
+        """
+        if parallel is None:
+            parallel = self.max_workers > 1 and len(jobs) > 1
+        local = [job for job in jobs if not parallel or job[0] is render_kde_violin]
+        remote = [job for job in jobs if job not in local]
+
+        rendered = []
+        if remote:
+            workers = min(self.max_workers, len(remote))
+            self.logger.info(f"Rendering {len(remote)} plots with {workers} workers")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(render_unless_expired, deadline, render, *args): args[0]
+                    for render, args in remote
+                }
+                try:
+                    for future in as_completed(futures, timeout=pool_timeout(deadline)):
+                        try:
+                            future.result()
+                            rendered.append(futures[future])
+                            self.logger.info(f"Saved plot to {futures[future]}")
+                        except DeadlineExceeded:
+                            continue
+                        except Exception as e:
+                            self.logger.error(f"Error rendering {futures[future]}: {str(e)}")
+                except FuturesTimeout:
+                    self.logger.warning(f"Terminating plot workers still running past the {deadline.name} deadline")
+                    terminate_pool(executor)
+        for render, args in local:
+            if deadline is not None and deadline.expired:
+                break
+            try:
+                rendered.append(self._render(render, args))
+                self.logger.info(f"Saved plot to {args[0]}")
+            except Exception as e:
+                self.logger.error(f"Error rendering {args[0]}: {str(e)}")
+        if deadline is not None and deadline.expired and len(rendered) < len(jobs):
+            self.logger.warning(f"The {deadline.name} deadline passed; "
+                                f"stopped after {len(rendered)} of {len(jobs)} plots")
+        return rendered
+
+    def generate_all_plots(self, df: Optional[pd.DataFrame], percentile_table: Optional[pd.DataFrame] = None,
+                           rollup: Optional[TimeRollup] = None, boxplot_stats: Optional[List[dict]] = None,
+                           histograms: Optional[Tuple[np.ndarray, pd.DataFrame]] = None,
+                           concurrency: Optional[ConcurrencyRollup] = None,
+                           parallel: Optional[bool] = None, deadline: Optional[Deadline] = None) -> List[str]:
+        """Generate all plots for the analysis and return the paths of those rendered"""
+        self.logger.info("Generating plots...")
+        jobs = [
+            self.boxplot_job(df, boxplot_stats=boxplot_stats),
+            self.violin_job(df, histograms=histograms),
+            self.throughput_job(df, rollup=rollup),
+            self.concurrency_job(df, concurrency=concurrency),
+            self.percentiles_job(df, percentile_table=percentile_table),
+        ]
+        return self.render_jobs(jobs, parallel, deadline)
@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 setup(
     name="jutix",
     version="0.1.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests*", "benchmarks*"]),
     install_requires=[
         "pandas>=2.0.0",
         "numpy>=1.24.0",
@@ -11,6 +11,12 @@ setup(
         "dynaconf>=3.2.0"
     ],
     extras_require={
+        "arrow": [
+            "pyarrow>=12.0.0"
+        ],
+        "zstd": [
+            "zstandard>=0.21.0"
+        ],
         "dev": [
             "pytest>=8.0.0",
             "pytest-cov>=4.1.0"
@@ -6,6 +6,23 @@ from jutix.config.settings import settings
 from jutix.core.analyzer import JMeterAnalyzer
 from jutix.utils.logger import setup_logger
 
+JTL_HEADER = "timeStamp,elapsed,label,responseCode,responseMessage,threadName,success,failureMessage,bytes,URL,Latency,Connect"
+
+def _write_epoch_jtl(path, rows, tail=()):
+    """Write an unquoted JTL with epoch timestamps, plus raw ``tail`` lines"""
+    lines = [JTL_HEADER]
+    for i in range(rows):
+        failed = i % 7 == 0
+        lines.append(",".join([
+            str(1700000000000 + 37 * i), str(i % 1000 + 1), f"Sampler {i % 5}",
+            "500" if failed else "200", "Internal Server Error" if failed else "OK",
+            f"Thread Group 1-{i % 13}", "false" if failed else "true",
+            ("x" * 300 + str(i % 3)) if failed else "",
+            str(1000 + i), f"http://example.com/api/{i % 5}", str(i % 1000), str(i % 9),
+        ]))
+    path.write_text("\r\n".join(lines + list(tail)) + "\r\n")
+    return path
+
 @pytest.fixture(scope="session")
 def test_data_dir():
     """Return path to test data directory"""
@@ -45,4 +62,9 @@ def analyzer(test_output_dir, test_config_file):
     """Return configured analyzer instance"""
     # Configure settings with test config
     settings.load_file(test_config_file)
-    return JMeterAnalyzer(str(test_output_dir)) 
\ No newline at end of file
+    return JMeterAnalyzer(str(test_output_dir)) 
+
+@pytest.fixture(scope="session")
+def write_epoch_jtl():
+    """Return a writer of unquoted JTL files with epoch timestamps"""
+    return _write_epoch_jtl
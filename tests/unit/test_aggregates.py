@@ -0,0 +1,109 @@
+import pytest
+import numpy as np
+import pandas as pd
+from jutix.core.aggregates import GROUP_KEYS, StreamingAggregator, reduce_groups, summarize
+from jutix.core.concurrency import ConcurrencyRollup
+from jutix.core.data_loader import JTLDataLoader, iter_jtl_chunks
+from jutix.core.percentiles import exact_percentiles
+from jutix.core.report_generator import ReportGenerator
+from jutix.core.rollup import TimeRollup
+
+@pytest.fixture
+def generated_jtl_dir(tmp_path):
+    """Write two JTL files with a few hundred rows each"""
+    rng = np.random.default_rng(7)
+    for name in ['alpha.jtl', 'beta.jtl']:
+        rows = 500
+        df = pd.DataFrame({
+            'timeStamp': pd.date_range('2025-03-16 02:00:00', periods=rows, freq='250ms')
+                           .strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3],
+            'elapsed': rng.integers(5, 2000, rows),
+            'label': rng.choice(['login', 'search', 'checkout'], rows),
+            'responseCode': rng.choice([200, 200, 200, 500], rows),
+            'bytes': rng.integers(200, 5000, rows),
+        })
+        df.to_csv(tmp_path / name, index=False)
+    return tmp_path
+
+def test_chunked_statistics_match_in_memory(generated_jtl_dir, test_logger, tmp_path):
+    """Test the streaming stats table matches the in-memory one"""
+    loader = JTLDataLoader(generated_jtl_dir, test_logger)
+    report_gen = ReportGenerator(tmp_path, test_logger)
+
+    df = loader.load_jtl_files(['*.jtl'])
+    expected = report_gen.calculate_statistics(df, rollup=TimeRollup.from_frame(df),
+                                               concurrency=ConcurrencyRollup.from_frame(df))
+    aggregator = loader.aggregate_jtl_files(['*.jtl'], batch_size=64)
+    actual = report_gen.statistics_from_aggregates(aggregator)
+
+    assert aggregator.rows == 1000
+    expected.index = expected.index.astype(str)
+    actual.index = actual.index.astype(str)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_names=False)
+
+def test_merge_equals_single_pass(generated_jtl_dir):
+    """Test merging per-chunk aggregators equals one aggregator over all chunks"""
+    single = StreamingAggregator()
+    merged = StreamingAggregator()
+    for chunk in iter_jtl_chunks(str(generated_jtl_dir / 'alpha.jtl'), 100):
+        single.update(chunk)
+        part = StreamingAggregator()
+        part.update(chunk)
+        merged.merge(part)
+
+    pd.testing.assert_frame_equal(merged.groups.sort_index(), single.groups.sort_index())
+    pd.testing.assert_series_equal(merged.buckets.sort_index(), single.buckets.sort_index())
+    assert single.buckets.sum() == 500
+    assert len(single.buckets) == 125  # 500 rows at 4 per second
+
+def test_summarize_single_sample_has_no_std():
+    """Test std is undefined for groups with a single sample"""
+    aggregates = pd.DataFrame({'count': [1], 'sum': [10.0], 'sum_sq': [100.0],
+                               'min': [10.0], 'max': [10.0], 'success': [1]})
+    summary = summarize(aggregates)
+    assert summary['mean'].iloc[0] == 10.0
+    assert np.isnan(summary['std'].iloc[0])
+
+def test_reduce_groups_matches_groupby(generated_jtl_dir, test_logger):
+    """Test the code-based reduction equals a (file, label) groupby"""
+    df = JTLDataLoader(generated_jtl_dir, test_logger).load_jtl_files(['*.jtl'])
+    df.loc[df.index[:3], 'elapsed'] = np.nan
+    groups = reduce_groups(df)
+
+    expected = df.groupby(GROUP_KEYS, observed=True).agg(
+        count=('elapsed', 'count'), sum=('elapsed', 'sum'),
+        min=('elapsed', 'min'), max=('elapsed', 'max'), success=('success', 'sum'),
+    )
+    assert len(groups) == 6
+    for column in expected.columns:
+        np.testing.assert_allclose(groups.loc[expected.index, column], expected[column])
+
+def test_label_statistics_in_memory_and_streamed(generated_jtl_dir, test_logger, tmp_path):
+    """Test the per-label table is the same from loaded rows and from chunks"""
+    loader = JTLDataLoader(generated_jtl_dir, test_logger)
+    report_gen = ReportGenerator(tmp_path, test_logger)
+    df = loader.load_jtl_files(['*.jtl'])
+    expected = report_gen.label_statistics(
+        reduce_groups(df), exact_percentiles(df, [50], by=GROUP_KEYS), TimeRollup.from_frame(df)
+    )
+    aggregator = loader.aggregate_jtl_files(['*.jtl'], batch_size=64)
+    actual = report_gen.label_statistics(aggregator.groups, rollup=aggregator.rollup)
+
+    login = df[(df['file'] == 'alpha.jtl') & (df['label'] == 'login')]
+    row = expected.loc[('alpha.jtl', 'login')]
+    assert row['Requests'] == len(login)
+    assert row['P50 RT'] == pytest.approx(login['elapsed'].median())
+    assert row['Error %'] == pytest.approx(100 * (1 - login['success'].mean()), abs=0.01)
+    assert expected.loc['alpha.jtl', 'Throughput (req/s)'].sum() == pytest.approx(4, abs=0.02)
+    pd.testing.assert_frame_equal(actual, expected.drop(columns='P50 RT'), check_index_type=False)
+
+    # Received bytes are loaded whatever metrics are configured
+    loader.metrics = ['responseTime']
+    streamed = loader.aggregate_jtl_files(['*.jtl'], batch_size=64)
+    received = report_gen.label_statistics(streamed.groups, rollup=streamed.rollup)
+    assert received['Avg Bytes'].notna().all()
+    pd.testing.assert_frame_equal(received[['Received KB/s', 'Avg Bytes']], expected[['Received KB/s', 'Avg Bytes']])
+
+    html = open(report_gen.generate_html_report(expected, plots=[], label_stats=expected)).read()
+    assert 'Performance Statistics by Label' in html
+    assert 'class="dataframe sortable"' in html
@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+import pandas as pd
+from jutix.core.box_stats import box_stats, sketch_box_stats
+from jutix.core.percentiles import PercentileSketch
+
+@pytest.fixture
+def latency_df():
+    rng = np.random.default_rng(11)
+    rows = 10000
+    return pd.DataFrame({
+        'file': pd.Categorical(rng.choice(['a.jtl', 'b.jtl'], rows)),
+        'label': pd.Categorical(['login'] * rows),
+        'elapsed': rng.lognormal(5, 0.7, rows).astype('int32'),
+    })
+
+def test_box_stats_match_matplotlib(latency_df):
+    """Test statistics agree with matplotlib's own boxplot_stats"""
+    from matplotlib.cbook import boxplot_stats
+
+    stats = box_stats(latency_df, max_fliers=10_000)
+    for entry in stats:
+        values = latency_df.loc[latency_df['file'] == entry['label'], 'elapsed'].to_numpy()
+        expected = boxplot_stats(values)[0]
+        for key in ['q1', 'med', 'q3', 'whislo', 'whishi', 'mean']:
+            assert entry[key] == pytest.approx(expected[key])
+        assert sorted(entry['fliers']) == sorted(expected['fliers'])
+
+def test_fliers_are_capped(latency_df):
+    """Test flier samples are capped and keep the extremes"""
+    stats = box_stats(latency_df, max_fliers=20)
+    for entry in stats:
+        values = latency_df.loc[latency_df['file'] == entry['label'], 'elapsed']
+        assert len(entry['fliers']) == 20
+        assert values.max() in entry['fliers']
+
+def test_sketch_box_stats_close_to_exact(latency_df):
+    """Test sketch-based statistics stay within the sketch error"""
+    sketch = PercentileSketch(0.01)
+    sketch.update(latency_df)
+    exact = {s['label']: s for s in box_stats(latency_df)}
+
+    for entry in sketch_box_stats(sketch, max_fliers=50):
+        reference = exact[entry['label']]
+        for key in ['q1', 'med', 'q3', 'whishi']:
+            assert entry[key] == pytest.approx(reference[key], rel=0.03)
+        assert len(entry['fliers']) <= 50
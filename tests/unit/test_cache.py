@@ -0,0 +1,84 @@
+import os
+import pytest
+import pandas as pd
+from jutix.core.cache import JTLCache
+from jutix.core.data_loader import JTLDataLoader, read_jtl_file
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def jtl_copy(tmp_path, sample_jtl_file):
+    """Copy the sample JTL so it can be modified"""
+    path = tmp_path / 'run.jtl'
+    path.write_text(sample_jtl_file.read_text())
+    return path
+
+def test_cache_round_trip(tmp_path, jtl_copy):
+    """Test a cached frame is returned unchanged on the next load"""
+    cache = JTLCache(tmp_path / 'cache')
+    assert cache.load(str(jtl_copy)) is None
+
+    parsed = read_jtl_file(str(jtl_copy), cache=cache)
+    cached = cache.load(str(jtl_copy))
+
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached, parsed.reset_index(drop=True))
+
+def test_cache_invalidated_by_changes(tmp_path, jtl_copy):
+    """Test modified files and different projections miss the cache"""
+    cache = JTLCache(tmp_path / 'cache')
+    read_jtl_file(str(jtl_copy), cache=cache)
+    assert cache.load(str(jtl_copy), metrics=['responseTime']) is None
+
+    lines = jtl_copy.read_text().splitlines()
+    jtl_copy.write_text('\n'.join(lines + [lines[1]]) + '\n')
+    assert cache.load(str(jtl_copy)) is None
+
+    read_jtl_file(str(jtl_copy), cache=cache)
+    assert len(list((tmp_path / 'cache').glob('*.feather'))) == 1
+    assert len(cache.load(str(jtl_copy))) == 4
+
+def test_rebuild_skips_cache(tmp_path, jtl_copy):
+    """Test rebuild mode ignores existing entries"""
+    read_jtl_file(str(jtl_copy), cache=JTLCache(tmp_path / 'cache'))
+    assert JTLCache(tmp_path / 'cache', rebuild=True).load(str(jtl_copy)) is None
+
+def test_evict_least_recently_used(tmp_path, jtl_copy, test_logger):
+    """Test eviction removes the oldest entries first"""
+    cache = JTLCache(tmp_path / 'cache', max_size_mb=0)
+    other = tmp_path / 'other.jtl'
+    other.write_text(jtl_copy.read_text())
+
+    old_entry = cache.store(str(jtl_copy), read_jtl_file(str(jtl_copy)))
+    new_entry = cache.store(str(other), read_jtl_file(str(other)))
+    os.utime(old_entry, (1, 1))
+    cache.max_bytes = new_entry.stat().st_size
+
+    assert cache.evict() == [old_entry]
+    assert new_entry.exists()
+
+def test_loader_uses_cache(tmp_path, jtl_copy, test_logger):
+    """Test the loader writes cache entries and reads them back"""
+    cache = JTLCache(tmp_path / 'cache')
+    loader = JTLDataLoader(tmp_path, test_logger, cache=cache)
+
+    first = loader.load_jtl_files(['*.jtl'])
+    second = loader.load_jtl_files(['*.jtl'])
+
+    assert cache.size() > 0
+    pd.testing.assert_frame_equal(first.reset_index(drop=True), second.reset_index(drop=True))
+
+def test_cache_write_failure_is_logged(tmp_path, jtl_copy, test_logger, monkeypatch):
+    """Test a cache that cannot be written is reported and the file still loads"""
+    def full_disk(*args):
+        raise OSError("No space left on device")
+
+    cache = JTLCache(tmp_path / 'cache')
+    monkeypatch.setattr(cache, 'store', full_disk)
+    warnings = []
+    monkeypatch.setattr(test_logger, 'warning', warnings.append)
+    df = JTLDataLoader(tmp_path, test_logger, cache=cache).load_jtl_files(['*.jtl'])
+
+    assert len(df) == 3
+    assert warnings == ["Could not cache run.jtl: No space left on device"]
+    assert 'cache_error' not in df.attrs
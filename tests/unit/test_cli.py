@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+
+# Generous wall-clock ceiling; pandas + matplotlib alone take well over this
+HELP_BUDGET_SECONDS = 1.0
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'dynaconf']
+
+def run_python(code):
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, cwd=ROOT)
+
+def test_help_skips_heavy_imports():
+    """Test --help never imports the analysis stack"""
+    result = run_python(
+        "import sys\n"
+        "sys.argv = ['jutix', '--help']\n"
+        "from jutix import main\n"
+        "try:\n"
+        "    main.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    assert '--stats-only' in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+def test_help_import_time_budget():
+    """Test jutix --help stays within the startup budget"""
+    started = time.perf_counter()
+    result = run_python("import sys; sys.argv = ['jutix', '--help']; from jutix.main import main; main()")
+    elapsed = time.perf_counter() - started
+
+    assert result.returncode == 0
+    assert elapsed < HELP_BUDGET_SECONDS, f"jutix --help took {elapsed:.2f}s"
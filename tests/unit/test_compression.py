@@ -0,0 +1,71 @@
+import gzip
+import pytest
+import pandas as pd
+from pathlib import Path
+from jutix.core.compression import DecompressingReader, compression_of, open_jtl
+from jutix.core.data_loader import JTLDataLoader, iter_jtl_chunks, read_jtl_file
+
+def gzip_copy(path):
+    """Write a gzip archive of ``path`` next to it"""
+    archive = path.with_name(path.name + '.gz')
+    archive.write_bytes(gzip.compress(path.read_bytes()))
+    return archive
+
+def test_gzip_matches_plain_file(tmp_path, write_epoch_jtl):
+    """Test archives read to the same frame as the file they contain, with every parser"""
+    path = write_epoch_jtl(tmp_path / "epoch.jtl", 2000)
+    archive = gzip_copy(path)
+
+    for parser in ['c', 'mmap', 'pyarrow']:
+        if parser == 'pyarrow':
+            pytest.importorskip('pyarrow')
+        # The mmap fast path can't map an archive, so both must match the C engine
+        plain = read_jtl_file(str(path), parser='c' if parser == 'mmap' else parser).drop(columns='file')
+        compressed = read_jtl_file(str(archive), parser=parser).drop(columns='file')
+        pd.testing.assert_frame_equal(compressed, plain)
+
+        chunks = list(iter_jtl_chunks(str(archive), 300, parser=parser))
+        assert sum(len(chunk) for chunk in chunks) == 2000
+        assert set(chunks[0]['file']) == {'epoch.jtl.gz'}
+
+def test_zstd_matches_plain_file(tmp_path, write_epoch_jtl):
+    """Test zstandard archives are read like gzip ones"""
+    zstandard = pytest.importorskip('zstandard')
+    path = write_epoch_jtl(tmp_path / "epoch.jtl", 500)
+    archive = tmp_path / "epoch.jtl.zst"
+    archive.write_bytes(zstandard.ZstdCompressor().compress(path.read_bytes()))
+
+    pd.testing.assert_frame_equal(read_jtl_file(str(archive)).drop(columns='file'),
+                                  read_jtl_file(str(path)).drop(columns='file'))
+
+def test_reader_bounds_buffer_and_propagates_errors(tmp_path, write_epoch_jtl):
+    """Test the background thread stops on close and corrupt data raises in the reader"""
+    path = write_epoch_jtl(tmp_path / "epoch.jtl", 5000)
+    archive = gzip_copy(path)
+
+    reader = DecompressingReader(archive, chunk_bytes=1024, max_chunks=2)
+    assert reader.read(10) == path.read_bytes()[:10]
+    reader.close()
+    assert not reader._thread.is_alive()
+
+    with open_jtl(archive) as f:
+        assert f.read() == path.read_bytes()
+
+    corrupt = tmp_path / "corrupt.jtl.gz"
+    corrupt.write_bytes(archive.read_bytes()[:200])
+    with pytest.raises(EOFError), open_jtl(corrupt) as f:
+        f.read()
+
+def test_find_jtl_files_matches_archives(tmp_path, test_logger, sample_jtl_file):
+    """Test patterns match compressed files, exclusions apply to their contents"""
+    for name in ['a.jtl', 'a.jtl.gz', 'b.jtl.gz', 'c.jtl.zst', 'skip.jtl.gz', 'notes.txt.gz']:
+        (tmp_path / name).write_bytes(b'')
+
+    loader = JTLDataLoader(tmp_path, test_logger)
+    files = loader.find_jtl_files(['*.jtl'], ['skip.jtl'])
+    assert [Path(f).name for f in files] == ['a.jtl', 'b.jtl.gz', 'c.jtl.zst']
+    assert [compression_of(f) for f in files] == [None, 'gzip', 'zstd']
+    # The plain file is read instead of its archive, also from another pattern
+    assert loader.find_jtl_files(['a.jtl.gz', 'a.jtl']) == files[:1]
+
+    assert [Path(f).name for f in loader.find_jtl_files(['*.jtl'], compressed=False)] == ['a.jtl']
@@ -0,0 +1,77 @@
+import sys
+import subprocess
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from jutix.core import concurrency as concurrency_module
+from jutix.core.concurrency import ConcurrencyRollup
+
+ROOT = Path(__file__).parents[2]
+
+def make_intervals(seed, rows=3000, files=('a.jtl', 'b.jtl')):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timeStamp': pd.to_datetime(1_700_000_000_000 + rng.integers(0, 60_000, rows), unit='ms'),
+        'elapsed': rng.integers(0, 8000, rows).astype('int32'),
+        'file': pd.Categorical(rng.choice(list(files), rows)),
+        'allThreads': rng.integers(1, 40, rows).astype('int32'),
+    })
+
+def brute_force(df):
+    """Mean requests in flight per second, from an explicit per-millisecond count"""
+    starts = df['timeStamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    ends = starts + df['elapsed'].to_numpy()
+    origin = starts.min() // 1000 * 1000
+    level = np.zeros((ends.max() // 1000 + 1) * 1000 - origin)
+    np.add.at(level, starts - origin, 1)
+    np.add.at(level, ends - origin, -1)
+    return np.cumsum(level).reshape(-1, 1000).mean(axis=1)
+
+def test_in_flight_matches_brute_force(monkeypatch):
+    """Test the per-second means are exact, also when reduced in blocks or merged"""
+    df = make_intervals(1)
+    expected = brute_force(df)
+    table = ConcurrencyRollup.from_frame(df).table()
+    assert len(table) == len(expected)
+    np.testing.assert_allclose(table['in_flight'], expected, atol=1e-9)
+
+    monkeypatch.setattr(concurrency_module, 'BLOCK_ROWS', 700)
+    monkeypatch.setattr(concurrency_module, 'MAX_DENSE_CELLS', 10)
+    merged = ConcurrencyRollup.from_frame(df.iloc[:1000]).merge(ConcurrencyRollup.from_frame(df.iloc[1000:]))
+    np.testing.assert_allclose(merged.table()['in_flight'], expected, atol=1e-9)
+
+def test_per_file_and_coarse_tables():
+    """Test per-file series add up, coarse buckets keep the peak second and threads add across files"""
+    df = make_intervals(2)
+    concurrency = ConcurrencyRollup.from_frame(df)
+    total = concurrency.table()
+    by_file = concurrency.table(by=['file'])
+
+    summed = by_file.groupby('bucket')['in_flight'].sum()
+    np.testing.assert_allclose(summed.reindex(total['bucket'], fill_value=0), total['in_flight'], atol=1e-9)
+    assert (total['allThreads'] <= 2 * 39).all() and total['allThreads'].max() > 39
+
+    ten_seconds = concurrency.table('10s').set_index('bucket')
+    per_ten = total.groupby(total['bucket'] // 10)['in_flight']
+    np.testing.assert_allclose(ten_seconds['in_flight'], per_ten.mean(), atol=1e-9)
+    np.testing.assert_allclose(ten_seconds['peak_in_flight'], per_ten.max(), atol=1e-9)
+
+    summary = concurrency.summary()
+    assert list(summary.index) == ['a.jtl', 'b.jtl']
+    assert (summary['peak_threads'] == 39).all()
+
+def test_report_concurrency(tmp_path, write_epoch_jtl):
+    """Test the report lists requests in flight and writes the per-second table"""
+    (tmp_path / 'data').mkdir()
+    write_epoch_jtl(tmp_path / 'data' / 'epoch.jtl', 2000)
+    result = subprocess.run([sys.executable, '-m', 'jutix.main', '-i', 'data', '-o', 'out', '--stats-only'],
+                            cwd=tmp_path, capture_output=True, text=True,
+                            env={'PYTHONPATH': str(ROOT), 'PATH': ''})
+    assert result.returncode == 0, result.stderr
+
+    reports = list(tmp_path.glob('analysis_output/*/reports'))[0]
+    assert 'Avg In-Flight' in (reports / 'performance_report.html').read_text()
+    table = pd.read_csv(reports / 'concurrency_over_time.csv')
+    assert list(table.columns) == ['time', 'in_flight', 'allThreads', 'grpThreads']
+    # 2000 samples of 1..1000 ms started every 37 ms
+    assert 10 < table['in_flight'].max() < 30
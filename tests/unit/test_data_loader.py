@@ -21,7 +21,7 @@ def test_load_jtl_files_with_specific_file(test_data_dir, test_logger, sample_jt
     assert 'success' in df.columns
     
     # Check data types
-    assert df['elapsed'].dtype == 'float64'
+    assert df['elapsed'].dtype == 'int32'
     assert df['success'].dtype == 'bool'
     
     # Check success conversion
@@ -73,4 +73,25 @@ def test_load_jtl_files_data_validation(test_data_dir, test_logger, sample_jtl_f
     
     # Check success mapping
     assert df[df['responseCode'] == '200']['success'].all()
-    assert not df[df['responseCode'] == '500']['success'].any() 
\ No newline at end of file
+    assert not df[df['responseCode'] == '500']['success'].any() 
+def test_load_jtl_files_parallel_matches_sequential(tmp_path, test_logger, sample_jtl_file):
+    """Test process-pool loading returns the same frame as sequential loading"""
+    for name in ['run_b.csv', 'run_a.csv', 'run_c.csv']:
+        (tmp_path / name).write_text(sample_jtl_file.read_text())
+
+    loader = JTLDataLoader(tmp_path, test_logger, max_workers=2)
+    sequential = loader.load_jtl_files(['*.csv'], parallel=False)
+    parallel = loader.load_jtl_files(['*.csv'], parallel=True, ordered=True)
+
+    assert len(parallel) == 9
+    pd.testing.assert_frame_equal(parallel, sequential)
+
+def test_find_jtl_files_sorted_and_excluded(tmp_path, test_logger, sample_jtl_file):
+    """Test file discovery is deterministic and honours exclusions"""
+    for name in ['b.jtl', 'a.jtl', 'skip.jtl']:
+        (tmp_path / name).write_text(sample_jtl_file.read_text())
+
+    loader = JTLDataLoader(tmp_path, test_logger)
+    files = loader.find_jtl_files(['*.jtl', 'a.jtl'], ['skip.jtl'])
+
+    assert [Path(f).name for f in files] == ['a.jtl', 'b.jtl']
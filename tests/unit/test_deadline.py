@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import time
+import subprocess
+from pathlib import Path
+import pytest
+from jutix.core import data_loader, deadline as deadline_module
+from jutix.core.data_loader import JTLDataLoader, aggregate_jtl_file, read_jtl_file
+from jutix.core.deadline import Deadline, DeadlineExceeded
+from jutix.core.partials import save_partial
+from jutix.visualization.plotter import JMeterPlotter
+
+ROOT = Path(__file__).parents[2]
+
+def slow_read(file_path, seconds):
+    """Stand-in for a parse of ``stuck`` that never checks its deadline, writing its pid there"""
+    if Path(file_path).name == 'stuck':
+        Path(file_path).write_text(str(os.getpid()))
+        time.sleep(seconds)
+    return file_path
+
+def slow_render(output_path, seconds):
+    """Stand-in for a render that never checks its deadline, writing its pid to ``output_path``"""
+    Path(output_path).write_text(str(os.getpid()))
+    time.sleep(seconds)
+
+def assert_terminated(pid_file):
+    """The worker that wrote ``pid_file`` is no longer running"""
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+def test_deadline_limits():
+    """Test unlimited deadlines, stage budgets capped by the run and the exceeded error"""
+    assert Deadline().remaining() is None and not Deadline(0).expired
+
+    run = Deadline(60)
+    assert run.stage('load') is run
+    assert run.stage('load', 120) is run
+    assert run.stage('plots', 1).name == 'plots stage'
+
+    with pytest.raises(DeadlineExceeded, match="0.01s analysis timeout was reached while testing"):
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        deadline.check("while testing")
+
+def test_readers_stop_at_deadline(tmp_path, write_epoch_jtl):
+    """Test whole-file reads give up and streaming folds keep the chunks already read"""
+    path = str(write_epoch_jtl(tmp_path / "epoch.jtl", 500))
+    expired = Deadline(expires_at=time.time() - 1)
+
+    with pytest.raises(DeadlineExceeded):
+        read_jtl_file(path, deadline=expired)
+    assert aggregate_jtl_file(path, 100, deadline=expired).rows == 0
+    assert len(read_jtl_file(path, deadline=Deadline(60))) == 500
+
+def test_parallel_workers_terminated(tmp_path, test_logger, monkeypatch):
+    """Test workers stuck past the deadline are killed instead of waited for"""
+    monkeypatch.setattr(deadline_module, 'WORKER_GRACE_SECONDS', 0)
+    loader = JTLDataLoader(tmp_path, test_logger, max_workers=2)
+    fast, stuck = str(tmp_path / 'fast'), str(tmp_path / 'stuck')
+
+    started = time.time()
+    results = loader._run_parallel(slow_read, [fast, stuck], True, "Reading", Deadline(1.5), 60)
+    assert results == [fast]
+    assert time.time() - started < 30
+    assert_terminated(tmp_path / 'stuck')
+
+def test_plot_workers_get_grace_then_terminated(tmp_path, test_logger, monkeypatch):
+    """Test plots finishing within the grace period are kept, queued ones skipped and stuck ones killed"""
+    monkeypatch.setattr(deadline_module, 'WORKER_GRACE_SECONDS', 2)
+    plotter = JMeterPlotter(tmp_path, test_logger, max_workers=2)
+    late, stuck, queued = (tmp_path / name for name in ['late.png', 'stuck.png', 'queued.png'])
+    jobs = [(slow_render, (str(late), 2)), (slow_render, (str(stuck), 60)), (slow_render, (str(queued), 0))]
+
+    started = time.time()
+    assert plotter.render_jobs(jobs, deadline=Deadline(1)) == [str(late)]
+    assert time.time() - started < 30
+    assert not queued.exists()
+    assert_terminated(stuck)
+
+def test_cli_writes_partial_report(tmp_path, write_epoch_jtl):
+    """Test a stage timeout yields a report marked partial and a distinct exit code"""
+    (tmp_path / 'data').mkdir()
+    write_epoch_jtl(tmp_path / 'data' / 'epoch.jtl', 2000)
+    env = {'PYTHONPATH': str(ROOT), 'PATH': '', 'JUTIX_ANALYSIS__STAGE_TIMEOUTS__PLOTS': '0.001'}
+    result = subprocess.run([sys.executable, '-m', 'jutix.main', '-i', 'data', '-o', 'out'],
+                            cwd=tmp_path, capture_output=True, text=True, env=env)
+
+    assert result.returncode == 2, result.stderr
+    reports = list(tmp_path.glob('analysis_output/*/reports'))
+    report = (reports[0] / 'performance_report.html').read_text()
+    assert 'Partial report' in report and 'plots stage timeout' in report
+    assert 'Performance Statistics by Test File' in report
+    assert 'response_time_boxplot.png' not in report
+    metrics = json.loads((reports[0] / 'run_metrics.json').read_text())
+    assert metrics['partial']
+
+def test_large_file_keeps_rows_read_before_deadline(tmp_path, test_logger, monkeypatch, write_epoch_jtl):
+    """Test a single file still being read at the deadline contributes its first chunks"""
+    write_epoch_jtl(tmp_path / "epoch.jtl", 2000)
+    monkeypatch.setattr(data_loader, 'DEADLINE_BATCH_ROWS', 500)
+    deadline = Deadline(60)
+    iter_raw_jtl = data_loader.iter_raw_jtl
+
+    def expire_after_first_chunk(*args):
+        for chunk in iter_raw_jtl(*args):
+            deadline.expires_at = time.time() - 1
+            yield chunk
+
+    monkeypatch.setattr(data_loader, 'iter_raw_jtl', expire_after_first_chunk)
+    loader = JTLDataLoader(tmp_path, test_logger)
+    df = loader.load_jtl_files(['*.jtl'], deadline=deadline)
+
+    assert len(df) == 500
+    assert loader.truncated_files == ['epoch.jtl']
+
+def test_merge_past_deadline_keeps_tables(tmp_path, write_epoch_jtl):
+    """Test tables of finished aggregates are reported even once the run's timeout has passed"""
+    path = write_epoch_jtl(tmp_path / "epoch.jtl", 2000)
+    save_partial(tmp_path / 'node.npz', aggregate_jtl_file(str(path), 500))
+    env = {'PYTHONPATH': str(ROOT), 'PATH': '', 'JUTIX_ANALYSIS__TIMEOUT': '0.001'}
+    result = subprocess.run([sys.executable, '-m', 'jutix.main', 'merge', 'node.npz'],
+                            cwd=tmp_path, capture_output=True, text=True, env=env)
+
+    assert result.returncode == 2, result.stderr
+    report = next(tmp_path.glob('analysis_output/*/reports/performance_report.html')).read_text()
+    assert 'Partial report' in report and 'before the plots stage' in report
+    for section in ['Performance Statistics by Test File', 'Performance Statistics by Label',
+                    'Top Error Signatures']:
+        assert section in report
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from jutix.core import errors as errors_module
+from jutix.core.errors import ErrorAggregator, normalize_message, signature_id
+
+def make_failures(messages, labels, codes, start=1_700_000_000_000, step_ms=1000):
+    rows = len(messages)
+    return pd.DataFrame({
+        'timeStamp': pd.to_datetime(start + np.arange(rows) * step_ms, unit='ms'),
+        'file': pd.Categorical(['run.jtl'] * rows),
+        'label': pd.Categorical(labels),
+        'responseCode': pd.Categorical(codes),
+        'responseMessage': pd.Categorical(['Gateway Timeout' if c == '504' else 'OK' for c in codes]),
+        'failureMessage': pd.Categorical(messages),
+        'success': [c == '200' and not m for c, m in zip(codes, messages)],
+    })
+
+def test_normalize_message():
+    """Test ids, addresses and numbers collapse to placeholders"""
+    message = ("Timeout  after 3012 ms for 1f0e3dad-9908-4f3c-8a47-0fb9c2f1a9d1 "
+               "at 10.0.0.12:8080 (0xdeadbeef)")
+    assert normalize_message(message) == "Timeout after <n> ms for <uuid> at <ip> (<hex>)"
+    assert normalize_message(None) == ''
+    assert len(normalize_message('x' * 1000)) == 200
+    assert signature_id('500', 'a') == signature_id('500', 'a') != signature_id('504', 'a')
+
+def test_signatures_per_label_and_time():
+    """Test distinct messages differing only in numbers share one signature"""
+    messages = [f"Timeout after {i} ms" for i in range(6)] + ['', '', 'Assertion failed']
+    labels = ['login'] * 4 + ['search'] * 5
+    codes = ['504'] * 6 + ['504', '200', '200']
+    errors = ErrorAggregator.from_frame(make_failures(messages, labels, codes, step_ms=20_000))
+
+    top = errors.top_signatures()
+    assert errors.errors == 8
+    assert list(top['message']) == ['Timeout after <n> ms', 'Gateway Timeout', 'Assertion failed']
+    assert list(top['count']) == [6, 1, 1]
+    assert top['labels'].iloc[0] == 2
+
+    by_label = errors.top_by_label(1)
+    assert list(by_label['label']) == ['login', 'search']
+    assert list(by_label['count']) == [4, 2]
+    by_time = errors.top_by_time()
+    assert by_time['count'].sum() == 8
+    assert by_time['time'].nunique() == 4  # 22:13:20 to 22:16:00
+
+def test_merge_equals_single_pass():
+    """Test merging chunk aggregators equals aggregating everything at once"""
+    rng = np.random.default_rng(3)
+    rows = 400
+    df = make_failures(
+        [f"error {i % 7} in step {i}" for i in range(rows)],
+        rng.choice(['a', 'b', 'c'], rows),
+        rng.choice(['500', '503'], rows),
+    )
+    single = ErrorAggregator.from_frame(df)
+    merged = ErrorAggregator()
+    for start in range(0, rows, 64):
+        merged.merge(ErrorAggregator.from_frame(df.iloc[start:start + 64]))
+
+    pd.testing.assert_frame_equal(merged.top_signatures(), single.top_signatures())
+    pd.testing.assert_series_equal(merged.by_time.sort_index(), single.by_time.sort_index())
+    assert len(single.signatures) == 2
+
+def test_messages_normalized_once_across_chunks(monkeypatch):
+    """Test only messages not seen in earlier chunks are normalized again"""
+    normalized = []
+    original = errors_module.normalize_messages
+    monkeypatch.setattr(errors_module, 'normalize_messages',
+                        lambda messages: normalized.extend(messages) or original(messages))
+    messages = [f"Timeout after {i % 3} ms" for i in range(30)]
+    df = make_failures(messages, ['login'] * 30, ['504'] * 30)
+
+    streamed = ErrorAggregator()
+    for start in range(0, 30, 10):
+        streamed.update(df.iloc[start:start + 10])
+
+    assert sorted(normalized) == sorted(set(messages) | {'Gateway Timeout'})
+    pd.testing.assert_frame_equal(streamed.top_signatures(), ErrorAggregator.from_frame(df).top_signatures())
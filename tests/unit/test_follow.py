@@ -0,0 +1,51 @@
+import pytest
+from jutix.core.data_loader import JTLDataLoader
+from jutix.core.follow import JTLFollower, JTLTailReader
+from jutix.core.report_generator import ReportGenerator
+from jutix.visualization.plotter import JMeterPlotter
+
+@pytest.fixture
+def sample_lines(sample_jtl_file):
+    return sample_jtl_file.read_text().splitlines()
+
+def test_tail_reader_reads_only_complete_new_lines(tmp_path, sample_lines):
+    """Test partial lines wait for the next read and old lines are not re-read"""
+    path = tmp_path / 'live.jtl'
+    partial = sample_lines[3][:20]
+    path.write_text('\n'.join(sample_lines[:3]) + '\n' + partial)
+
+    reader = JTLTailReader(str(path))
+    assert sum(len(c) for c in reader.read_new()) == 2
+    assert reader.read_new() == []
+
+    with open(path, 'a') as f:
+        f.write(sample_lines[3][20:] + '\n' + sample_lines[1] + '\n')
+    chunks = reader.read_new()
+    assert sum(len(c) for c in chunks) == 2
+    assert chunks[0]['elapsed'].iloc[0] == 963
+    assert reader.offset == path.stat().st_size
+
+def test_follower_aggregates_and_refreshes(tmp_path, sample_lines, test_logger):
+    """Test polling accumulates rows and refresh writes the report"""
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    path = input_dir / 'live.jtl'
+    path.write_text('\n'.join(sample_lines[:2]) + '\n')
+
+    follower = JTLFollower(JTLDataLoader(input_dir, test_logger), ReportGenerator(tmp_path, test_logger),
+                           JMeterPlotter(tmp_path, test_logger), test_logger, percentiles=[50, 99])
+
+    assert follower.poll(['*.jtl']) == 1
+    with open(path, 'a') as f:
+        f.write('\n'.join(sample_lines[2:]) + '\n')
+    assert follower.poll(['*.jtl']) == 2
+    assert follower.poll(['*.jtl']) == 0
+    assert follower.aggregator.rows == 3
+
+    report = follower.refresh()
+    assert 'P99 RT' in open(report).read()
+    assert (tmp_path / 'throughput_over_time.png').exists()
+
+    path.write_text('\n'.join(sample_lines[:2]) + '\n')
+    assert follower.poll(['*.jtl']) == 1
+    assert follower.aggregator.rows == 1
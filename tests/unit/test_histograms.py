@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+import pandas as pd
+from jutix.core.histograms import log_histograms, sketch_histograms, violin_stats
+from jutix.core.percentiles import PercentileSketch
+
+@pytest.fixture
+def latency_df():
+    rng = np.random.default_rng(5)
+    rows = 20000
+    return pd.DataFrame({
+        'file': pd.Categorical(rng.choice(['a.jtl', 'b.jtl'], rows)),
+        'label': pd.Categorical(['login'] * rows),
+        'elapsed': np.r_[rng.lognormal(4, 0.5, rows - 10), np.zeros(10)].astype('int32'),
+    })
+
+def test_log_histograms_count_every_row(latency_df):
+    """Test histograms keep every row, including zero response times"""
+    edges, counts = log_histograms(latency_df, bins=50)
+
+    assert counts.shape == (2, 50)
+    assert counts.to_numpy().sum() == len(latency_df)
+    assert np.all(np.diff(np.log(edges)) == pytest.approx(np.log(edges[1] / edges[0])))
+
+def test_sketch_histograms_match_raw(latency_df):
+    """Test histograms rebinned from a sketch agree with raw-row histograms"""
+    sketch = PercentileSketch()
+    sketch.update(latency_df)
+    _, from_sketch = sketch_histograms(sketch, bins=20)
+    _, from_rows = log_histograms(latency_df, bins=20)
+
+    assert from_sketch.to_numpy().sum() == len(latency_df)
+    assert list(from_sketch.index) == list(from_rows.index)
+    share = from_sketch.div(from_sketch.sum(axis=1), axis=0) - from_rows.div(from_rows.sum(axis=1), axis=0)
+    assert share.abs().to_numpy().max() < 0.05
+
+def test_violin_stats(latency_df):
+    """Test violin statistics are derived from the binned counts"""
+    edges, counts = log_histograms(latency_df)
+    stats = violin_stats(edges, counts)
+
+    assert len(stats) == 2
+    for entry in stats:
+        assert len(entry['coords']) == len(entry['vals']) == 100
+        assert entry['vals'].max() == pytest.approx(1)
+        assert entry['min'] <= entry['median'] <= entry['max']
+        assert entry['median'] == pytest.approx(np.exp(4), rel=0.1)
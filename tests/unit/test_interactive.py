@@ -0,0 +1,53 @@
+import json
+import numpy as np
+import pandas as pd
+from jutix.core.data_loader import prepare_jtl_frame
+from jutix.core.downsample import lttb
+from jutix.core.interactive import interactive_series, series_html
+from jutix.core.report_generator import ReportGenerator
+from jutix.core.rollup import TimeRollup
+
+def test_lttb_keeps_shape():
+    """Test LTTB keeps the endpoints and isolated spikes"""
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000)
+    y = rng.random(10_000)
+    y[4321] = 100
+    indices = lttb(x, y, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert 4321 in indices
+    assert np.all(np.diff(indices) > 0)
+    assert len(lttb(x[:50], y[:50], 200)) == 50
+
+def test_series_respect_point_budget():
+    """Test every embedded series is downsampled to the point budget"""
+    rows = 200_000
+    rng = np.random.default_rng(1)
+    df = prepare_jtl_frame(pd.DataFrame({
+        'timeStamp': 1_700_000_000_000 + np.sort(rng.integers(0, 6 * 3_600_000, rows)),
+        'elapsed': rng.integers(1, 500, rows).astype('int32'),
+        'label': pd.Categorical(['login'] * rows),
+        'responseCode': pd.Categorical(rng.choice(['200', '500'], rows)),
+    }), 'long.jtl')
+    series = interactive_series(TimeRollup.from_frame(df), max_points=300)
+
+    assert {s['metric'] for s in series['series']} == {m['key'] for m in series['metrics']}
+    for s in series['series']:
+        assert len(s['t']) == len(s['v']) <= 300
+    throughput = next(s for s in series['series'] if s['metric'] == 'throughput')
+    assert throughput['t'][0] == 0
+    assert len(json.dumps(series)) < 100_000
+
+def test_report_embeds_series_without_external_scripts(tmp_path, test_logger):
+    """Test the interactive section is self-contained and escapes the data"""
+    series = {'start': 0, 'metrics': [{'key': 'throughput', 'title': 'T', 'unit': 'req/s'}],
+              'series': [{'metric': 'throughput', 'name': '</script>.jtl', 't': [0, 1], 'v': [1, 2]}]}
+    assert '</script>.jtl' not in series_html(series)
+
+    report = ReportGenerator(tmp_path, test_logger)
+    html = open(report.generate_html_report(pd.DataFrame({'a': [1]}), plots=[], series=series)).read()
+    assert 'Interactive Time Series' in html
+    assert 'jutix-series' in html
+    assert '<script src' not in html
@@ -0,0 +1,98 @@
+import re
+import sys
+import subprocess
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from jutix.core import metrics
+from jutix.core.aggregates import StreamingAggregator, reduce_groups
+from jutix.core.data_loader import prepare_jtl_frame
+from jutix.core.metrics import Metric, build_metrics, metric_statistics, register_metric
+from jutix.core.schema import METRIC_COLUMNS, columns_for_metrics
+
+ROOT = Path(__file__).parents[2]
+
+def make_frame(seed, rows=4000):
+    rng = np.random.default_rng(seed)
+    return prepare_jtl_frame(pd.DataFrame({
+        'timeStamp': 1_700_000_000_000 + np.sort(rng.integers(0, 120_000, rows)),
+        'elapsed': rng.lognormal(6, 0.8, rows).astype('int32'),
+        'label': pd.Categorical(rng.choice(['login', 'search'], rows)),
+        'responseCode': pd.Categorical(rng.choice(['200', '500'], rows, p=[0.9, 0.1])),
+        'Latency': rng.integers(0, 300, rows).astype('int32'),
+    }), 'run.jtl')
+
+def test_apdex_and_sla_match_row_by_row_definitions():
+    """Test the registry's fused reduce gives the textbook Apdex and SLA breach rate per label"""
+    df = make_frame(1)
+    groups = reduce_groups(df, metrics=build_metrics(['apdex', 'sla'], {'apdex': {'threshold_ms': 400}}))
+    stats = metric_statistics(groups).droplevel('file')
+
+    for label, rows in df.groupby('label', observed=True):
+        ok = rows['success']
+        satisfied = (ok & (rows['elapsed'] <= 400)).sum()
+        tolerating = (ok & (rows['elapsed'] > 400) & (rows['elapsed'] <= 1600)).sum()
+        assert np.isclose(stats.loc[label, 'Apdex'], (satisfied + tolerating / 2) / len(rows))
+        breaches = (~ok | (rows['elapsed'] > 1000)).sum()
+        assert np.isclose(stats.loc[label, 'SLA Breach %'], breaches / len(rows) * 100)
+    assert 'Mean Latency' not in stats.columns
+
+def test_chunked_metrics_merge_exactly():
+    """Test metric partials of chunks and aggregators merge to the single-pass result"""
+    df = make_frame(2)
+    enabled = build_metrics(['latency', 'apdex'])
+    expected = reduce_groups(df, metrics=enabled)
+    aggregator = StreamingAggregator(metrics=enabled)
+    for start in range(0, len(df), 700):
+        aggregator.update(df.iloc[start:start + 700])
+    merged = aggregator.merge(StreamingAggregator(metrics=enabled))
+
+    pd.testing.assert_frame_equal(merged.groups.sort_index(), expected.sort_index(), check_dtype=False)
+    assert list(metric_statistics(merged.by_file()).columns) == ['Mean Latency', 'Max Latency', 'Apdex']
+
+def test_custom_metric(monkeypatch):
+    """Test a registered metric is enabled by name, reads its columns and reaches the report"""
+    monkeypatch.setattr(metrics, 'METRICS', dict(metrics.METRICS))
+    monkeypatch.setitem(METRIC_COLUMNS, 'bigResponses', [])
+
+    @register_metric
+    class BigResponses(Metric):
+        name = 'bigResponses'
+        columns = ['bytes']
+        aggregations = {'big_responses': 'sum'}
+
+        def reduce(self, chunk, codes, size):
+            return {'big_responses': np.bincount(codes, chunk['bytes'].to_numpy() > 1500, minlength=size)}
+
+        def finalize(self, groups):
+            return pd.DataFrame({'Big Responses': groups['big_responses']}, index=groups.index)
+
+    assert 'bytes' in columns_for_metrics(['bigResponses'])
+    assert [metric.name for metric in build_metrics(['bigResponses', 'throughput', 'responseTime'])] == \
+        ['responseTime', 'errorCount', 'bigResponses']
+    df = make_frame(3).assign(bytes=np.arange(4000))
+    groups = reduce_groups(df, metrics=build_metrics(['bigResponses']))
+    assert metric_statistics(groups)['Big Responses'].sum() == 4000 - 1501
+
+def test_metrics_setting_adds_report_columns(tmp_path, write_epoch_jtl):
+    """Test metrics and their options from the settings reach the statistics tables"""
+    (tmp_path / 'data').mkdir()
+    write_epoch_jtl(tmp_path / 'data' / 'epoch.jtl', 2000)
+    env = {'PYTHONPATH': str(ROOT), 'PATH': '',
+           'JUTIX_METRICS': '["apdex", "sla", "apdex"]',
+           'JUTIX_METRIC_OPTIONS__SLA__MAX_RESPONSE_MS': '500'}
+    for stream in [[], ['--stream']]:
+        result = subprocess.run([sys.executable, '-m', 'jutix.main', '-i', 'data', '-o', 'out', '--stats-only',
+                                 *stream], cwd=tmp_path, capture_output=True, text=True, env=env)
+        assert result.returncode == 0, result.stderr
+
+    for reports in tmp_path.glob('analysis_output/*/reports'):
+        report = (reports / 'performance_report.html').read_text()
+        assert 'Apdex' in report and 'SLA Breach %' in report and 'Mean Latency' in report
+        # The first table is the per-file one: its header cells, then the row of epoch.jtl
+        table = report[report.index('<table'):report.index('</table>')]
+        columns = re.findall(r'<th>([^<]*)</th>', table[:table.index('</tr>')])[1:]
+        values = re.findall(r'<td>([^<]*)</td>', table)
+        # Every 7th sample failed and 500 of each 1000 succeeded ones took over 500 ms
+        breached = sum(i % 7 == 0 or i % 1000 + 1 > 500 for i in range(2000)) / 2000 * 100
+        assert np.isclose(float(values[columns.index('SLA Breach %')]), breached, atol=0.01)
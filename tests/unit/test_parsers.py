@@ -0,0 +1,87 @@
+import pytest
+import pandas as pd
+import numpy as np
+from jutix.core import fastparse, parsers
+from jutix.core.data_loader import iter_jtl_chunks, read_jtl_file
+from jutix.core.parsers import resolve_parser
+from jutix.core.schema import concat_frames
+
+def test_resolve_parser_fallbacks(monkeypatch, test_logger):
+    """Test unknown or unavailable engines fall back to the C parser"""
+    assert resolve_parser(None) == 'c'
+    assert resolve_parser('fortran', test_logger) == 'c'
+
+    monkeypatch.setattr(parsers, 'pyarrow_available', lambda: False)
+    assert resolve_parser('pyarrow', test_logger) == 'c'
+
+def test_pyarrow_matches_c_engine(sample_jtl_file):
+    """Test both engines produce the same frame"""
+    pytest.importorskip('pyarrow')
+    c_df = read_jtl_file(str(sample_jtl_file), parser='c')
+    arrow_df = read_jtl_file(str(sample_jtl_file), parser='pyarrow')
+
+    assert list(arrow_df.columns) == list(c_df.columns)
+    assert isinstance(arrow_df['label'].dtype, pd.CategoricalDtype)
+    assert arrow_df['elapsed'].dtype == 'int32'
+    assert list(arrow_df['success']) == list(c_df['success'])
+    assert list(arrow_df['responseCode'].astype(str)) == list(c_df['responseCode'].astype(str))
+    pd.testing.assert_series_equal(arrow_df['timeStamp'], c_df['timeStamp'], check_dtype=False)
+
+def test_pyarrow_chunks(sample_jtl_file):
+    """Test the streaming pyarrow reader yields every row"""
+    pytest.importorskip('pyarrow')
+    chunks = list(iter_jtl_chunks(str(sample_jtl_file), 2, parser='pyarrow'))
+    assert sum(len(chunk) for chunk in chunks) == 3
+
+def test_mmap_matches_c_engine(tmp_path, write_epoch_jtl):
+    """Test the NumPy fast path reads the same frame as the C engine"""
+    path = write_epoch_jtl(tmp_path / "epoch.jtl", 500)
+    c_df = read_jtl_file(str(path), parser='c')
+    mmap_df = read_jtl_file(str(path), parser='mmap')
+
+    assert list(mmap_df.columns) == list(c_df.columns)
+    assert isinstance(mmap_df['label'].dtype, pd.CategoricalDtype)
+    assert mmap_df['elapsed'].dtype == 'int32'
+    pd.testing.assert_frame_equal(mmap_df, c_df, check_categorical=False)
+
+    # Small blocks split the file into several chunks with a continuous index
+    chunks = list(iter_jtl_chunks(str(path), 40, parser='mmap'))
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(concat_frames(chunks), c_df, check_categorical=False)
+
+def test_mmap_hash_collisions(tmp_path, monkeypatch, write_epoch_jtl):
+    """Test distinct strings sharing a hash stay distinct"""
+    path = write_epoch_jtl(tmp_path / "collide.jtl", 200)
+    lines = path.read_text().splitlines()
+    for i in range(1, len(lines)):
+        fields = lines[i].split(",")
+        fields[2] = "RequestaSamplerL" if i % 2 else "RequestbSamplera"
+        lines[i] = ",".join(fields)
+    path.write_text("\n".join(lines) + "\n")
+    c_df = read_jtl_file(str(path), parser='c')
+    pd.testing.assert_frame_equal(read_jtl_file(str(path), parser='mmap'), c_df, check_categorical=False)
+
+    # Every value of every column colliding, long failure messages included
+    monkeypatch.setattr(fastparse, '_hash_strings', lambda block, starts, ends: np.zeros(len(starts), dtype=np.uint64))
+    mmap_df = read_jtl_file(str(path), parser='mmap')
+    assert mmap_df['label'].value_counts().to_dict() == {'RequestaSamplerL': 100, 'RequestbSamplera': 100}
+    pd.testing.assert_frame_equal(mmap_df, c_df, check_categorical=False)
+
+def test_mmap_falls_back_to_c_engine(tmp_path, sample_jtl_file, write_epoch_jtl):
+    """Test quoted fields and unknown columns are read by the C engine instead"""
+    quoted = write_epoch_jtl(tmp_path / "quoted.jtl", 3)
+    quoted.write_text(quoted.read_text().replace("Sampler 1", '"Sampler, 1"'))
+    for path in [quoted, sample_jtl_file]:
+        pd.testing.assert_frame_equal(
+            read_jtl_file(str(path), parser='mmap'), read_jtl_file(str(path), parser='c')
+        )
+    assert read_jtl_file(str(quoted), parser='mmap')['label'].iloc[1] == 'Sampler, 1'
+
+def test_mmap_chunks_resume_after_unsupported_block(tmp_path, write_epoch_jtl):
+    """Test rows the fast path cannot parse are resumed with the C engine"""
+    path = write_epoch_jtl(tmp_path / "gap.jtl", 400, tail=[
+        "1700000099000,,Sampler 9,200,OK,Thread Group 1-1,true,,10,http://example.com/api/9,,"
+    ])
+    chunks = list(iter_jtl_chunks(str(path), 50, parser='mmap'))
+    assert sum(len(chunk) for chunk in chunks) == 401
+    assert list(pd.concat(chunks)['label'].astype(str))[-1] == 'Sampler 9'
@@ -0,0 +1,95 @@
+import sys
+import subprocess
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from jutix.core.aggregates import StreamingAggregator
+from jutix.core.data_loader import prepare_jtl_frame
+from jutix.core.partials import PARTIAL_VERSION, load_partial, merge_partials, save_partial
+from jutix.core.schema import timestamp_millis
+
+ROOT = Path(__file__).parent.parent.parent
+
+def make_frame(seed, file_name, rows=3000):
+    rng = np.random.default_rng(seed)
+    codes = rng.choice(['200', '500'], rows, p=[0.9, 0.1])
+    return prepare_jtl_frame(pd.DataFrame({
+        'timeStamp': 1_700_000_000_000 + np.sort(rng.integers(0, 120_000, rows)),
+        'elapsed': rng.lognormal(5, 0.5, rows).astype('int32'),
+        'label': pd.Categorical(rng.choice(['login', 'search'], rows)),
+        'responseCode': pd.Categorical(codes),
+        'failureMessage': pd.Categorical(np.where(codes == '500', 'Timeout after 30 ms', '')),
+        'bytes': rng.integers(100, 5000, rows),
+    }), file_name)
+
+def flat(data):
+    """Aggregates as a plain frame sorted by key, whatever the index level types"""
+    frame = data.reset_index()
+    keys = list(data.index.names)
+    frame[keys] = frame[keys].astype(str)
+    return frame.sort_values(keys).reset_index(drop=True).astype({c: 'float64' for c in frame.columns if c not in keys})
+
+def test_merged_partials_match_single_aggregation(tmp_path):
+    """Test merging saved partials is exact for counts, sums, min/max, sketches and errors"""
+    frames = [make_frame(1, 'node1.jtl'), make_frame(2, 'node2.jtl'), make_frame(3, 'node1.jtl')]
+    paths = [save_partial(tmp_path / f"part{i}", StreamingAggregator.from_frame(df))
+             for i, df in enumerate(frames)]
+    assert all(path.suffix == '.npz' for path in paths)
+
+    merged, sources = merge_partials(paths)
+    expected = StreamingAggregator()
+    for df in frames:
+        expected.update(df)
+
+    assert merged.rows == expected.rows == 9000
+    assert [source['rows'] for source in sources] == [3000, 3000, 3000]
+    for attribute in ['groups', 'sketch.counts', 'rollup.frame', 'concurrency.frame', 'errors.by_label', 'errors.by_time']:
+        first, second = attribute.split('.') if '.' in attribute else (attribute, None)
+        left, right = getattr(merged, first), getattr(expected, first)
+        if second:
+            left, right = getattr(left, second), getattr(right, second)
+        pd.testing.assert_frame_equal(flat(left), flat(right))
+    assert merged.errors.errors == expected.errors.errors
+    pd.testing.assert_frame_equal(merged.errors.top_signatures(), expected.errors.top_signatures(),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(
+        merged.sketch.percentiles([50, 99], by=['label']), expected.sketch.percentiles([50, 99], by=['label'])
+    )
+
+def test_partial_version_and_metadata(tmp_path):
+    """Test metadata round-trips and partials of another layout are rejected"""
+    path = save_partial(tmp_path / 'node.npz', StreamingAggregator.from_frame(make_frame(1, 'a.jtl')),
+                        {'files': ['a.jtl']})
+    aggregator, metadata = load_partial(path)
+    assert metadata['files'] == ['a.jtl'] and metadata['rows'] == aggregator.rows == 3000
+
+    with np.load(path) as archive:
+        arrays = dict(archive)
+    arrays['metadata'] = np.array(str(arrays['metadata']).replace(f'"version": {PARTIAL_VERSION}', '"version": 0'))
+    np.savez_compressed(tmp_path / 'old.npz', **arrays)
+    with pytest.raises(ValueError, match="version 0"):
+        load_partial(tmp_path / 'old.npz')
+
+def test_partial_and_merge_commands(tmp_path):
+    """Test jutix partial on two injectors and jutix merge into one report"""
+    for node in ['node1', 'node2']:
+        (tmp_path / node).mkdir()
+        frame = make_frame(int(node[-1]), 'results.jtl')
+        frame.assign(timeStamp=timestamp_millis(frame['timeStamp']))[
+            ['timeStamp', 'elapsed', 'label', 'responseCode', 'success', 'failureMessage', 'bytes']
+        ].to_csv(tmp_path / node / 'results.jtl', index=False)
+
+    def jutix(*args):
+        return subprocess.run([sys.executable, '-m', 'jutix.main', *args], cwd=tmp_path,
+                              capture_output=True, text=True, env={'PYTHONPATH': str(ROOT), 'PATH': ''})
+
+    for node in ['node1', 'node2']:
+        result = jutix('partial', '-i', node, '-o', f"{node}.npz")
+        assert result.returncode == 0, result.stderr
+    result = jutix('merge', 'node1.npz', 'node2.npz', '--stats-only')
+    assert result.returncode == 0, result.stderr
+
+    report, = (tmp_path / 'analysis_output').glob('*/reports/performance_report.html')
+    assert 'results.jtl' in report.read_text()
+    assert jutix('merge', 'missing.npz').returncode == 1
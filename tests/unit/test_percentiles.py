@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import pandas as pd
+from jutix.core.percentiles import PercentileSketch, compute_percentiles, exact_percentiles
+
+def make_frame(values, files=('a.jtl',), seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'file': pd.Categorical(rng.choice(list(files), len(values))),
+        'label': pd.Categorical(['login'] * len(values)),
+        'elapsed': values,
+    })
+
+@pytest.mark.parametrize('accuracy', [0.01, 0.05])
+@pytest.mark.parametrize('distribution', ['lognormal', 'uniform', 'bimodal'])
+def test_sketch_error_bound(accuracy, distribution):
+    """Test every estimate is within the documented relative error"""
+    rng = np.random.default_rng(42)
+    values = {
+        'lognormal': rng.lognormal(5, 1.2, 20000),
+        'uniform': rng.uniform(1, 5000, 20000),
+        'bimodal': np.r_[rng.normal(50, 5, 10000), rng.normal(3000, 200, 10000)],
+    }[distribution].clip(1).astype(int)
+
+    percentiles = [1, 25, 50, 75, 90, 95, 99, 99.9]
+    sketch = PercentileSketch(accuracy)
+    sketch.update(make_frame(values))
+    estimates = sketch.percentiles(percentiles).iloc[0].to_numpy()
+
+    ordered = np.sort(values)
+    truth = ordered[np.floor(np.array(percentiles) / 100 * (len(values) - 1)).astype(int)]
+    assert np.all(np.abs(estimates - truth) <= accuracy * truth + 1e-9)
+
+def test_sketch_merge_is_exact():
+    """Test merged sketches equal a sketch built in one pass"""
+    values = np.random.default_rng(3).lognormal(4, 1, 5000).astype(int)
+    df = make_frame(values, files=('a.jtl', 'b.jtl'))
+
+    single = PercentileSketch()
+    single.update(df)
+    merged = PercentileSketch()
+    for chunk in np.array_split(np.arange(len(df)), 7):
+        part = PercentileSketch()
+        part.update(df.iloc[chunk])
+        merged.merge(part)
+
+    pd.testing.assert_frame_equal(merged.percentiles([50, 99]), single.percentiles([50, 99]))
+    assert merged.counts.sum() == 5000
+
+def test_sketch_zero_values():
+    """Test zero response times are kept and estimated as zero"""
+    sketch = PercentileSketch()
+    sketch.update(make_frame(np.array([0, 0, 0, 100])))
+    table = sketch.percentiles([50, 100])
+    assert table['P50'].iloc[0] == 0
+    assert table['P100'].iloc[0] == pytest.approx(100, rel=0.01)
+
+def test_merge_rejects_different_accuracy():
+    """Test sketches with different bounds cannot be merged"""
+    with pytest.raises(ValueError):
+        PercentileSketch(0.01).merge(PercentileSketch(0.02))
+
+def test_compute_percentiles_modes():
+    """Test auto mode is exact for small inputs and sketches above the limit"""
+    df = make_frame(np.arange(1, 1001))
+    exact = exact_percentiles(df, [50, 90])
+
+    pd.testing.assert_frame_equal(compute_percentiles(df, [50, 90]), exact)
+    sketched = compute_percentiles(df, [50, 90], max_exact_rows=10)
+    assert list(sketched.columns) == ['P50', 'P90']
+    assert np.allclose(sketched.to_numpy(), exact.to_numpy(), rtol=0.01, atol=1)
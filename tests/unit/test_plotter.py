@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+import pandas as pd
+import matplotlib
+from jutix.core.data_loader import prepare_jtl_frame
+from jutix.visualization.plotter import JMeterPlotter
+
+PLOTS = ['response_time_boxplot.png', 'response_time_violin.png', 'throughput_over_time.png',
+         'concurrency_over_time.png', 'response_time_percentiles.png']
+
+@pytest.fixture
+def jtl_df():
+    rng = np.random.default_rng(5)
+    frames = []
+    for name in ['a.jtl', 'b.jtl']:
+        rows = 2000
+        frames.append(prepare_jtl_frame(pd.DataFrame({
+            'timeStamp': 1_700_000_000_000 + np.sort(rng.integers(0, 120_000, rows)),
+            'elapsed': rng.lognormal(5, 0.5, rows).astype('int32'),
+            'label': pd.Categorical(rng.choice(['login', 'search'], rows)),
+            'responseCode': pd.Categorical(rng.choice(['200', '500'], rows, p=[0.95, 0.05])),
+        }), name))
+    return pd.concat(frames, ignore_index=True)
+
+def broken_render(output_path):
+    raise ValueError("no data")
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_generate_all_plots(tmp_path, test_logger, jtl_df, max_workers):
+    """Test every plot is rendered, serially and in a worker pool"""
+    plotter = JMeterPlotter(tmp_path, test_logger, max_workers=max_workers)
+    rendered = plotter.generate_all_plots(jtl_df)
+
+    assert sorted(rendered) == sorted(str(tmp_path / name) for name in PLOTS)
+    for name in PLOTS:
+        assert (tmp_path / name).stat().st_size > 0
+
+def test_rendering_leaves_global_state_alone(tmp_path, test_logger, jtl_df):
+    """Test plots neither change rcParams nor leave pyplot figures open"""
+    import matplotlib.pyplot as plt
+
+    before = dict(matplotlib.rcParams)
+    figures = plt.get_fignums()
+    plotter = JMeterPlotter(tmp_path, test_logger)
+    plotter.generate_all_plots(jtl_df, parallel=False)
+
+    assert dict(matplotlib.rcParams) == before
+    assert plt.get_fignums() == figures
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_failed_plot_is_logged_and_skipped(tmp_path, test_logger, jtl_df, monkeypatch, parallel):
+    """Test a plot that fails to render is logged and the others are still rendered"""
+    errors = []
+    monkeypatch.setattr(test_logger, 'error', errors.append)
+    plotter = JMeterPlotter(tmp_path, test_logger, max_workers=2)
+    broken = str(tmp_path / "broken.png")
+    rendered = plotter.render_jobs([(broken_render, (broken,)), plotter.boxplot_job(jtl_df)], parallel=parallel)
+
+    assert rendered == [str(tmp_path / 'response_time_boxplot.png')]
+    assert errors == [f"Error rendering {broken}: no data"]
@@ -0,0 +1,59 @@
+import json
+import pytest
+import pandas as pd
+from jutix.core.data_loader import JTLDataLoader
+from jutix.core.profiler import StageProfiler, count_rows, measure_call
+from jutix.core.report_generator import ReportGenerator
+
+def test_stage_records_measurements(test_logger):
+    """Test a stage records wall/CPU time, rows and throughput"""
+    profiler = StageProfiler(test_logger)
+    with profiler.stage('sum') as stage:
+        stage['rows'] = len(list(range(100_000)))
+
+    record = profiler.stages[0]
+    assert record['stage'] == 'sum'
+    assert record['rows'] == 100_000
+    assert record['wall_seconds'] >= 0
+    assert record['cpu_seconds'] >= 0
+    assert record['rows_per_sec'] > 0
+
+def test_stage_recorded_on_error(test_logger):
+    """Test a failing stage is still recorded"""
+    profiler = StageProfiler(test_logger)
+    with pytest.raises(ValueError):
+        with profiler.stage('broken', rows=10):
+            raise ValueError("boom")
+    assert [s['stage'] for s in profiler.stages] == ['broken']
+
+def test_measure_call_counts_rows():
+    """Test results are measured with their row count"""
+    result, measurements = measure_call(pd.DataFrame, {'a': [1, 2, 3]})
+    assert len(result) == 3
+    assert measurements['rows'] == 3
+    assert count_rows(None) is None
+
+def test_loader_records_each_file(test_data_dir, test_logger):
+    """Test the loader records one stage per loaded file"""
+    profiler = StageProfiler(test_logger)
+    loader = JTLDataLoader(test_data_dir, test_logger, profiler=profiler)
+    df = loader.load_jtl_files(['sample_jtl.csv'])
+
+    assert [(s['stage'], s['file'], s['rows']) for s in profiler.stages] == \
+        [('read_jtl_file', 'sample_jtl.csv', len(df))]
+
+def test_summary_json_and_report_section(tmp_path, test_logger):
+    """Test run metrics are written as JSON and rendered in the report"""
+    profiler = StageProfiler(test_logger)
+    with profiler.stage('load', rows=5):
+        pass
+    path = profiler.write_json(tmp_path / 'run_metrics.json')
+    summary = json.loads(open(path).read())
+    assert summary['stages'][0]['stage'] == 'load'
+    assert 'wall_seconds' in summary['total']
+
+    report = ReportGenerator(tmp_path, test_logger)
+    report_path = report.generate_html_report(pd.DataFrame({'a': [1]}), plots=[], performance=profiler.stages)
+    html = open(report_path).read()
+    assert 'Pipeline performance' in html
+    assert 'Rows/s' in html
@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+import pandas as pd
+from jutix.core.rollup import TimeRollup
+
+@pytest.fixture
+def two_hour_df():
+    """Two hours of traffic at 2 requests per second with 10% errors"""
+    rows = 2 * 3600 * 2
+    start = pd.Timestamp('2025-03-16 02:00:00')
+    return pd.DataFrame({
+        'timeStamp': start + pd.to_timedelta(np.arange(rows) * 500, unit='ms'),
+        'file': pd.Categorical(['run.jtl'] * rows),
+        'label': pd.Categorical(np.where(np.arange(rows) % 2, 'login', 'search')),
+        'elapsed': np.arange(rows, dtype='int32') % 100,
+        'success': np.arange(rows) % 10 != 0,
+        'bytes': np.full(rows, 10, dtype='uint32'),
+    })
+
+def test_buckets_do_not_wrap(two_hour_df):
+    """Test a 2-hour run yields 7200 one-second buckets, not 60"""
+    table = TimeRollup.from_frame(two_hour_df).table('1s')
+
+    assert len(table) == 7200
+    assert (table['count'] == 2).all()
+    assert table['time'].iloc[0] == pd.Timestamp('2025-03-16 02:00:00')
+
+def test_coarser_resolutions(two_hour_df):
+    """Test 10s and 1m tables are derived consistently from 1s buckets"""
+    rollup = TimeRollup.from_frame(two_hour_df)
+    ten_seconds = rollup.table('10s')
+    minutes = rollup.table('1m', by=['file', 'label'])
+
+    assert len(ten_seconds) == 720 and (ten_seconds['count'] == 20).all()
+    assert len(minutes) == 240 and (minutes['count'] == 60).all()
+    assert ten_seconds['errors'].sum() == len(two_hour_df) // 10
+    assert ten_seconds['bytes'].sum() == 10 * len(two_hour_df)
+    assert ten_seconds['elapsed_max'].max() == 99
+    assert rollup.auto_resolution(max_points=1000) == '10s'
+
+def test_merge_matches_single_pass(two_hour_df):
+    """Test rollups of separate chunks merge to the single-pass result"""
+    single = TimeRollup.from_frame(two_hour_df)
+    merged = TimeRollup()
+    for chunk in np.array_split(np.arange(len(two_hour_df)), 5):
+        merged.merge(TimeRollup.from_frame(two_hour_df.iloc[chunk]))
+
+    pd.testing.assert_frame_equal(merged.table('1s'), single.table('1s'), check_dtype=False)
+    throughput = single.throughput()
+    assert throughput.loc['run.jtl', 'throughput'] == 2
+    assert throughput.loc['run.jtl', 'peak_throughput'] == 2
+
+def test_missing_bytes_stay_unknown(two_hour_df):
+    """Test received bytes are NaN, not 0, when the bytes column was not loaded"""
+    df = two_hour_df.drop(columns=['bytes'])
+    rollup = TimeRollup()
+    for chunk in np.array_split(np.arange(len(df)), 5):
+        rollup.merge(TimeRollup.from_frame(df.iloc[chunk]))
+
+    assert rollup.frame['bytes'].isna().all()
+    assert rollup.table('1m')['bytes'].isna().all()
+    throughput = rollup.label_throughput()
+    assert throughput['bytes_per_sec'].isna().all() and throughput['avg_bytes'].isna().all()
+    assert (throughput['throughput'] == 1).all()
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import pandas as pd
+from jutix.core.aggregates import StreamingAggregator
+from jutix.core.data_loader import prepare_jtl_frame
+from jutix.core.run_store import RunStore, compare_runs
+
+def make_frame(seed, scale=1.0, rows=5000):
+    rng = np.random.default_rng(seed)
+    return prepare_jtl_frame(pd.DataFrame({
+        'timeStamp': 1_700_000_000_000 + np.sort(rng.integers(0, 60_000, rows)),
+        'elapsed': (rng.lognormal(5, 0.5, rows) * scale).astype('int32'),
+        'label': pd.Categorical(rng.choice(['login', 'search'], rows)),
+        'responseCode': pd.Categorical(rng.choice(['200', '500'], rows, p=[0.9, 0.1])),
+    }), 'run.jtl')
+
+@pytest.fixture
+def store(tmp_path):
+    with RunStore(tmp_path / 'history.sqlite') as store:
+        store.save_run('20240101_000000', StreamingAggregator.from_frame(make_frame(1)), 'jtl_data')
+        store.save_run('20240102_000000', StreamingAggregator.from_frame(make_frame(1, scale=2.0)), 'jtl_data')
+        yield store
+
+def test_label_summary_matches_aggregator(store):
+    """Test stored aggregates reproduce the in-memory sketch and counts"""
+    df = make_frame(1)
+    aggregator = StreamingAggregator.from_frame(df)
+    expected = aggregator.sketch.percentiles([50, 95], by=['label'])
+    summary = store.label_summary('20240101_000000', [50, 95])
+
+    for label in ['login', 'search']:
+        rows = df[df['label'] == label]
+        assert summary[label]['requests'] == len(rows)
+        assert summary[label]['mean'] == pytest.approx(rows['elapsed'].mean())
+        assert summary[label]['error_rate'] == pytest.approx(100 * (1 - rows['success'].mean()))
+        assert summary[label]['P50'] == pytest.approx(expected.loc[label, 'P50'])
+        assert summary[label]['P95'] == pytest.approx(expected.loc[label, 'P95'])
+
+def test_resolve_aliases(store):
+    """Test runs resolve by id, prefix and alias"""
+    assert store.resolve('latest') == '20240102_000000'
+    assert store.resolve('previous') == '20240101_000000'
+    assert store.resolve('-2') == '20240101_000000'
+    assert store.resolve('20240102') == '20240102_000000'
+    with pytest.raises(KeyError):
+        store.resolve('2024')
+    with pytest.raises(KeyError):
+        store.resolve('-3')
+
+def test_compare_runs(store):
+    """Test the comparison reports relative changes per label"""
+    rows = compare_runs(store, '20240101_000000', '20240102_000000', [95])
+    assert [row['label'] for row in rows] == ['login', 'search']
+    for row in rows:
+        # Response times were doubled in the second run
+        assert row['P95_change'] == pytest.approx(100, abs=5)
+        assert row['mean_change'] == pytest.approx(100, abs=5)
+
+def test_save_replaces_run(store):
+    """Test saving a run id again replaces its aggregates"""
+    store.save_run('20240101_000000', StreamingAggregator.from_frame(make_frame(3, rows=100)))
+    assert len(store.list_runs()) == 2
+    assert sum(s['requests'] for s in store.label_summary('20240101_000000', [50]).values()) == 100
+
+def test_rollup_stored_per_file(store):
+    """Test the rollup is kept per file and second, not per label"""
+    buckets, requests = store.connection.execute(
+        "SELECT COUNT(*), SUM(count) FROM file_rollup WHERE run_id = '20240101_000000'"
+    ).fetchone()
+    assert buckets == 60
+    assert requests == 5000
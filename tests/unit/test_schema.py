@@ -0,0 +1,61 @@
+import pytest
+import pandas as pd
+from jutix.core.data_loader import read_jtl_file
+from jutix.core.schema import columns_for_metrics, concat_frames, success_flags, success_from_codes
+
+def test_schema_applied_at_read_time(sample_jtl_file):
+    """Test compact dtypes are used for JTL columns"""
+    df = read_jtl_file(str(sample_jtl_file))
+
+    for column in ['label', 'responseCode', 'threadName', 'dataType', 'failureMessage', 'file']:
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+    assert df['elapsed'].dtype == 'int32'
+    assert df['Latency'].dtype == 'int32'
+    assert df['bytes'].dtype == 'uint32'
+
+def test_metrics_projection(sample_jtl_file):
+    """Test only the columns needed by the configured metrics are read"""
+    df = read_jtl_file(str(sample_jtl_file), metrics=['responseTime'])
+
+    assert 'Latency' not in df.columns
+    assert 'URL' not in df.columns
+    assert set(columns_for_metrics(['responseTime'])) <= set(df.columns)
+    assert columns_for_metrics(None) is None
+
+def test_missing_numeric_values_fall_back_to_nullable(tmp_path, sample_jtl_file):
+    """Test files with empty integer fields still load"""
+    lines = sample_jtl_file.read_text().splitlines()
+    fields = lines[1].split(',')
+    fields[14] = ''  # Latency
+    lines[1] = ','.join(fields)
+    path = tmp_path / 'gaps.jtl'
+    path.write_text('\n'.join(lines) + '\n')
+
+    df = read_jtl_file(str(path))
+    assert df['Latency'].dtype == 'Int32'
+    assert df['Latency'].isna().sum() == 1
+
+def test_concat_keeps_categoricals():
+    """Test frames with different categories concatenate to a categorical"""
+    a = pd.DataFrame({'label': pd.Categorical(['x', 'y'])})
+    b = pd.DataFrame({'label': pd.Categorical(['z'])})
+    combined = concat_frames([a, b])
+
+    assert isinstance(combined['label'].dtype, pd.CategoricalDtype)
+    assert list(combined['label']) == ['x', 'y', 'z']
+
+def test_success_from_codes():
+    """Test the 2xx check on categorical and plain codes"""
+    codes = pd.Series(['200', '500', None, '204'], dtype='category')
+    assert list(success_from_codes(codes)) == [True, False, False, True]
+    assert list(success_from_codes(pd.Series([200, 404]))) == [True, False]
+
+def test_success_flags_prefer_native_column():
+    """Test JMeter's success column wins over the response code"""
+    codes = pd.Series(['200', '302', '500'], dtype='category')
+    native = pd.DataFrame({'responseCode': codes, 'success': [False, True, False]})
+    assert list(success_flags(native)) == [False, True, False]
+
+    text = pd.DataFrame({'responseCode': codes, 'success': ['true', None, 'FALSE']})
+    assert list(success_flags(text)) == [True, False, False]
+    assert list(success_flags(native.drop(columns='success'))) == [True, False, False]
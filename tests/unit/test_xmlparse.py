@@ -0,0 +1,71 @@
+import gzip
+import pytest
+import pandas as pd
+from xml.sax.saxutils import quoteattr
+from jutix.core.data_loader import iter_jtl_chunks, read_jtl_file
+from jutix.core.xmlparse import is_xml_jtl, read_jtl_xml
+
+def write_xml_jtl(path, rows, closed=True):
+    """Write the samples of ``write_epoch_jtl`` in JMeter's XML format"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<testResults version="1.2">']
+    for i in range(rows):
+        failed = i % 7 == 0
+        attributes = {
+            't': i % 1000 + 1, 'it': 0, 'lt': i % 1000, 'ct': i % 9, 'ts': 1700000000000 + 37 * i,
+            's': 'false' if failed else 'true', 'lb': f"Sampler {i % 5}", 'rc': 500 if failed else 200,
+            'rm': 'Internal Server Error' if failed else 'OK', 'tn': f"Thread Group 1-{i % 13}",
+            'by': 1000 + i,
+        }
+        lines.append('<httpSample ' + ' '.join(f'{k}={quoteattr(str(v))}' for k, v in attributes.items()) + '>')
+        if failed:
+            lines += ['  <assertionResult>', '    <name>Response Assertion</name>',
+                      '    <failure>true</failure>', '    <error>false</error>',
+                      f"    <failureMessage>{'x' * 300}{i % 3}</failureMessage>", '  </assertionResult>']
+        # Sub-results are nested and must not become rows
+        lines.append(f'  <httpSample t="1" ts="{1700000000000 + 37 * i}" lb="embedded" rc="200" s="true"/>')
+        lines.append(f'  <java.net.URL>http://example.com/api/{i % 5}</java.net.URL>')
+        lines.append('</httpSample>')
+    if closed:
+        lines.append('</testResults>')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+def test_xml_matches_csv(tmp_path, write_epoch_jtl):
+    """Test XML results read to the same frame as the CSV of the same samples"""
+    csv_df = read_jtl_file(str(write_epoch_jtl(tmp_path / "epoch.jtl", 1000)))
+    xml_df = read_jtl_file(str(write_xml_jtl(tmp_path / "epoch.xml.jtl", 1000)))
+
+    assert len(xml_df) == 1000
+    assert isinstance(xml_df['label'].dtype, pd.CategoricalDtype)
+    assert xml_df['elapsed'].dtype == 'int32'
+    for column in ['timeStamp', 'elapsed', 'Latency', 'Connect', 'bytes', 'success', 'second']:
+        assert list(xml_df[column]) == list(csv_df[column]), column
+    for column in ['label', 'responseCode', 'responseMessage', 'threadName', 'failureMessage', 'URL']:
+        assert list(xml_df[column].astype(object).fillna('')) == list(csv_df[column].astype(object).fillna('')), column
+
+def test_xml_chunks_and_projection(tmp_path):
+    """Test XML files stream in chunks and only read the configured metrics"""
+    path = write_xml_jtl(tmp_path / "results.jtl", 1000)
+    chunks = list(iter_jtl_chunks(str(path), 300, metrics=['responseTime']))
+
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    assert chunks[-1].index[0] == 900
+    assert list(chunks[0].columns[:4]) == ['timeStamp', 'elapsed', 'label', 'responseCode']
+    assert 'URL' not in chunks[0].columns
+
+def test_truncated_and_compressed_xml(tmp_path):
+    """Test a results file cut off mid-test keeps its complete samples, also when gzipped"""
+    path = write_xml_jtl(tmp_path / "results.jtl", 100, closed=False)
+    data = path.read_bytes()
+    path.write_bytes(data[:data.rfind(b'<httpSample t=') + 20])
+    assert len(read_jtl_xml(str(path))) == 99
+
+    archive = tmp_path / "results.jtl.gz"
+    archive.write_bytes(gzip.compress(data))
+    assert is_xml_jtl(archive)
+    assert len(read_jtl_file(str(archive))) == 100
+
+    broken = tmp_path / "broken.jtl"
+    broken.write_bytes(data.replace(b'</httpSample>', b'</sample>', 1))
+    with pytest.raises(Exception):
+        read_jtl_xml(str(broken))